@@ -0,0 +1,41 @@
+"""Measure random-engine attempts per second on a synthetic catalog.
+
+Usage: python benchmarks/bench_meat_index.py [--recipes 10000] [--attempts 2000]
+
+`max_overlap=-1` makes every attempt miss, so the planner always spends the
+full attempt budget and the timing reflects the attempt loop itself.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from eat_what.planner import WeeklyPlanner
+from synthetic import synthetic_recipes
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=10_000)
+    parser.add_argument("--attempts", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    recipes = synthetic_recipes(args.recipes)
+    best = float("inf")
+    for run in range(args.repeat):
+        planner = WeeklyPlanner(recipes, seed=run)
+        start = time.perf_counter()
+        planner.plan(max_overlap=-1, veg_dishes=0, max_attempts=args.attempts)
+        best = min(best, time.perf_counter() - start)
+
+    print(
+        f"{args.recipes} recipes, {args.attempts} attempts: "
+        f"{args.attempts / best:,.0f} attempts/s (best of {args.repeat})"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,56 @@
+"""Report memory held by loaded recipe catalogs.
+
+Usage: python benchmarks/bench_memory.py [--recipes 100000]
+
+Writes a synthetic catalog to a temporary CSV and measures, with
+tracemalloc, the memory retained by the list `load_recipes` returns, both
+from a fresh parse and from the compiled cache.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+from pathlib import Path
+import tempfile
+import tracemalloc
+
+from eat_what.storage import load_recipes, save_recipes
+from synthetic import synthetic_recipes
+
+
+def _retained_bytes(path: Path, *, use_cache: bool) -> int:
+    """Return bytes still allocated after loading `path`."""
+    gc.collect()
+    tracemalloc.start()
+    recipes = load_recipes(path, use_cache=use_cache)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del recipes
+    return size
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "recipes.csv"
+        save_recipes(path, synthetic_recipes(args.recipes))
+        load_recipes(path)  # warm the compiled cache
+
+        per_100k = 100_000 / args.recipes
+        for label, use_cache in (("parsed", False), ("cached", True)):
+            size = _retained_bytes(path, use_cache=use_cache)
+            print(
+                f"{label}: {size / 2**20:7.1f} MiB for {args.recipes} recipes "
+                f"({size * per_100k / 2**20:.1f} MiB per 100k, "
+                f"{size / args.recipes:.0f} B/recipe)"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,46 @@
+"""Measure weekly-plan throughput on a synthetic catalog.
+
+Usage: python benchmarks/bench_plan_many.py [--recipes 10000] [--plans 500]
+
+Compares repeated `plan()` calls with one streaming `plan_many()` call on
+the same planner, both with loose constraints so every plan succeeds.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from eat_what.planner import WeeklyPlanner
+from synthetic import synthetic_recipes
+
+PLAN_KWARGS = {"max_total_time_per_dish": 90, "max_weekly_time": None}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=10_000)
+    parser.add_argument("--plans", type=int, default=500)
+    args = parser.parse_args()
+
+    recipes = synthetic_recipes(args.recipes)
+
+    planner = WeeklyPlanner(recipes, seed=0)
+    start = time.perf_counter()
+    for _ in range(args.plans):
+        planner.plan(**PLAN_KWARGS)
+    elapsed = time.perf_counter() - start
+    print(f"plan() x {args.plans}: {args.plans / elapsed:,.0f} plans/s")
+
+    if hasattr(planner, "plan_many"):
+        planner = WeeklyPlanner(recipes, seed=0)
+        start = time.perf_counter()
+        for _ in planner.plan_many(args.plans, distinct=True, **PLAN_KWARGS):
+            pass
+        elapsed = time.perf_counter() - start
+        print(f"plan_many({args.plans}): {args.plans / elapsed:,.0f} plans/s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,110 @@
+"""Time terminal rendering of a large shopping list and selection menu.
+
+Usage: python benchmarks/bench_render.py [--ingredients 10000] [--options 5000]
+
+Renders `print_plan` for a plan whose shopping list has `--ingredients`
+distinct entries (mixed Chinese/English names, some colored), and the
+`select_from` menu for `--options` items (plus the same plan as ndjson), into a line-buffered text stream
+(like a terminal's stdout) over a sink that counts the raw writes. Reports
+total time, time until the first write and the number of writes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from unittest import mock
+
+from eat_what.cli import print_plan
+from eat_what.ingredients_vegatable import INGREDIENT_VEGATABLE
+from eat_what.planner import PlanResult
+from eat_what.records import write_plans
+from eat_what.selection import select_from
+from eat_what.storage import Recipe
+
+
+def _shopping_plan(count: int) -> PlanResult:
+    """Plan with `count` distinct ingredients spread over ten-item recipes."""
+    known = sorted(INGREDIENT_VEGATABLE)
+    names = known + [f"食材{idx}" for idx in range(count - len(known))]
+    recipes = tuple(
+        Recipe(f"菜{idx}", tuple(names[idx : idx + 10]), 5, 20 + idx % 60, False, False)
+        for idx in range(0, count, 10)
+    )
+    return PlanResult(recipes, sum(r.total_time for r in recipes), 0)
+
+
+class _CountingSink(io.RawIOBase):
+    """Discards bytes, recording how many writes arrive and when the first did."""
+    def __init__(self) -> None:
+        self.writes = 0
+        self.first_write: float | None = None
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        if self.first_write is None:
+            self.first_write = time.perf_counter()
+        self.writes += 1
+        return len(data)
+
+
+def _best_of(repeat: int, render) -> tuple[float, float, int]:
+    """Return (total s, s to first write, writes) of the fastest run."""
+    best = (float("inf"), 0.0, 0)
+    for _ in range(repeat):
+        sink = _CountingSink()
+        stream = io.TextIOWrapper(
+            io.BufferedWriter(sink), encoding="utf-8", line_buffering=True
+        )
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(stream):
+            render()
+            stream.flush()
+        elapsed = time.perf_counter() - start
+        if elapsed < best[0]:
+            best = (elapsed, sink.first_write - start, sink.writes)
+    return best
+
+
+def _report(label: str, result: tuple[float, float, int]) -> None:
+    elapsed, first, writes = result
+    print(
+        f"{label:<34} {elapsed * 1000:7.1f} ms total, "
+        f"{first * 1000:6.1f} ms to first write, {writes} writes"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ingredients", type=int, default=10_000)
+    parser.add_argument("--options", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    plan = _shopping_plan(args.ingredients)
+    _report(
+        f"print_plan, {args.ingredients} ingredients:",
+        _best_of(args.repeat, lambda: print_plan(plan)),
+    )
+
+    _report(
+        f"ndjson, {args.ingredients} ingredients:",
+        _best_of(args.repeat, lambda: write_plans([plan], sys.stdout, "ndjson")),
+    )
+
+    options = {f"ingredient_{idx}": f"食材{idx}" for idx in range(args.options)}
+    with mock.patch("builtins.input", return_value=""):
+        _report(
+            f"select_from, {args.options} options:",
+            _best_of(args.repeat, lambda: select_from(options, "选择食材：")),
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,89 @@
+"""Compare plan latency from a warm `eat-what serve` with cold CLI runs.
+
+Usage: python benchmarks/bench_serve.py [--recipes 10000] [--requests 500]
+
+Writes a synthetic catalog, starts `eat-what serve` on a free port and sends
+`--requests` keep-alive `GET /plan` requests, reporting client-side latency
+percentiles, then times a few cold `python -m eat_what.cli --format ndjson`
+runs on the same catalog.
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+from pathlib import Path
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+from eat_what.server import percentiles
+from eat_what.storage import save_recipes
+from synthetic import synthetic_recipes
+
+
+def _start_server(csv_path: Path) -> tuple[subprocess.Popen, int]:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "eat_what.cli", "serve", "--recipes", str(csv_path),
+         "--port", "0"],
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    for line in proc.stderr:
+        match = re.search(r"http://[\d.]+:(\d+)", line)
+        if match:
+            return proc, int(match.group(1))
+    raise RuntimeError("server exited before listening")
+
+
+def _report(label: str, samples: list[float]) -> None:
+    stats = ", ".join(
+        f"{name} {value * 1000:.2f} ms" for name, value in percentiles(samples).items()
+    )
+    print(f"{label:>6}: {stats} ({len(samples)} runs)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--cold-runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "recipes.csv"
+        save_recipes(csv_path, synthetic_recipes(args.recipes))
+
+        proc, port = _start_server(csv_path)
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port)
+            samples = []
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                conn.request("GET", "/plan?max_time=90")
+                conn.getresponse().read()
+                samples.append(time.perf_counter() - start)
+            conn.close()
+        finally:
+            proc.terminate()
+            proc.wait()
+        _report("warm", samples)
+
+        samples = []
+        for _ in range(args.cold_runs):
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-m", "eat_what.cli", "--recipes", str(csv_path),
+                 "--max-time", "90", "--format", "ndjson"],
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+            samples.append(time.perf_counter() - start)
+        _report("cold", samples)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
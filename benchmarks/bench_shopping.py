@@ -0,0 +1,66 @@
+"""Time merging the shopping lists of many households' plans.
+
+Usage: python benchmarks/bench_shopping.py [--recipes 2000] [--households 500]
+
+Each household gets its own weekly plan (10 dishes) from a synthetic
+catalog. The merged list is built once by counting every plan's
+ingredients into one `Counter` (what `print_plan` used to do per plan) and
+once with `ShoppingList`, which counts dishes and expands each distinct
+recipe's ingredients once.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+import time
+
+from eat_what.planner import WeeklyPlanner
+from eat_what.shopping import ShoppingList
+from synthetic import synthetic_recipes
+
+
+def _naive(plans) -> list[tuple[str, int]]:
+    counts: Counter = Counter()
+    for plan in plans:
+        for recipe in plan.recipes:
+            counts.update(recipe.ingredients)
+    return counts.most_common()
+
+
+def _best_of(repeat: int, func) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=2_000)
+    parser.add_argument("--households", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    planner = WeeklyPlanner(synthetic_recipes(args.recipes), seed=0)
+    plans = list(planner.plan_many(args.households))
+    dishes = sum(len(plan.recipes) for plan in plans)
+
+    naive = _best_of(args.repeat, lambda: _naive(plans))
+    merged = _best_of(
+        args.repeat, lambda: ShoppingList.from_plans(plans).items()
+    )
+    items = ShoppingList.from_plans(plans).items()
+    assert [(item.ingredient, item.count) for item in items] == _naive(plans)
+    print(
+        f"{args.households} plans, {dishes} dishes: "
+        f"Counter per dish {naive * 1000:.2f} ms, "
+        f"ShoppingList {merged * 1000:.2f} ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,69 @@
+"""Compare per-worker catalog setup: compiled cache vs mapped snapshot.
+
+Usage: python benchmarks/bench_snapshot.py [--recipes 100000]
+
+For each source, measures the time and the private (tracemalloc) memory a
+worker spends getting from a file on disk to a warm plan pool: loading the
+`Recipe` list from the compiled cache, or mapping a columnar snapshot and
+building the pool from its columns.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+from pathlib import Path
+import tempfile
+import time
+import tracemalloc
+
+from eat_what.planner import PlanPool
+from eat_what.snapshot import RecipeSnapshot, write_snapshot
+from eat_what.storage import load_recipes, save_recipes
+from synthetic import synthetic_recipes
+
+
+def _measure(setup) -> tuple[float, int]:
+    """Return (seconds, retained bytes) for `setup()`."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    held = setup()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return elapsed, size
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "recipes.csv"
+        save_recipes(csv_path, synthetic_recipes(args.recipes))
+        snap_path = write_snapshot(Path(tmp) / "recipes.snap", load_recipes(csv_path))
+
+        def from_cache():
+            recipes = load_recipes(csv_path)
+            return recipes, PlanPool(recipes)
+
+        def from_snapshot():
+            snapshot = RecipeSnapshot(snap_path)
+            return snapshot, snapshot.plan_pool(None)
+
+        print(f"snapshot file: {snap_path.stat().st_size / 2**20:.1f} MiB (shared)")
+        for label, setup in (("cache", from_cache), ("snapshot", from_snapshot)):
+            elapsed, size = _measure(setup)
+            print(
+                f"{label:>8}: {elapsed * 1000:7.1f} ms, "
+                f"{size / 2**20:6.1f} MiB private for {args.recipes} recipes"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
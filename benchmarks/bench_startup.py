@@ -0,0 +1,47 @@
+"""Measure wall-clock startup time of the three CLI entry points.
+
+Usage: python benchmarks/bench_startup.py [--runs 10]
+
+Each entry point is launched as `python -m <module> --help` in a fresh
+interpreter, which imports the full CLI module graph and exits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+ENTRY_POINTS = {
+    "eat-what": "eat_what.cli",
+    "eat-what-pick": "eat_what.pick_cli",
+    "eat-what-recipe": "eat_what.recipe_cli",
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    for command, module in ENTRY_POINTS.items():
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-m", module, "--help"],
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+            timings.append(time.perf_counter() - start)
+        print(
+            f"{command:16} median {statistics.median(timings) * 1000:7.1f} ms  "
+            f"min {min(timings) * 1000:7.1f} ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
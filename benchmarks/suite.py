@@ -0,0 +1,255 @@
+"""Benchmark suite: time the hot paths over synthetic catalogs, write JSON.
+
+Usage:
+    python benchmarks/suite.py [--sizes 25,1000,10000,100000] [--output FILE]
+    python benchmarks/suite.py --compare BASELINE.json [--fail-above 1.25]
+
+For every catalog size the suite times:
+
+- `load_recipes` from CSV, cold (no compiled cache) and warm (cache hit);
+- `WeeklyPlanner.plan` at three constraint levels (`loose`, `medium`,
+  `tight`), with a fresh planner per run so pool building is included;
+- the `tight` plan again with `LocalSearch(moves=2000)` swap moves;
+- `find_remaining_meat` against one meat dish;
+- ingredient matching as `eat-what-pick` does it (`IngredientIndex`
+  construction, `covered_by` and `missing_at_most`);
+- `print_plan` of one weekly plan into an in-memory stream.
+
+Each case reports the best and median of `--repeat` runs in seconds. The
+results, with the commit and interpreter they were measured on, go to
+`--output` (default stdout) as JSON. `--compare` runs the suite and prints
+each case's best time against the same case in a saved result file;
+`--fail-above` turns slowdowns beyond that ratio into a non-zero exit.
+Pass `--sizes 1000000` for the million-recipe catalog (slow to generate).
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from eat_what.cli import print_plan
+from eat_what.ingredient_index import IngredientIndex
+from eat_what.local_search import LocalSearch
+from eat_what.planner import WeeklyPlanner, find_remaining_meat
+from eat_what.render import Renderer
+from eat_what.storage import load_recipes, save_recipes
+from synthetic import synthetic_recipes
+
+DEFAULT_SIZES = (25, 1_000, 10_000, 100_000)
+
+# name -> WeeklyPlanner.plan keyword arguments
+PLAN_LEVELS = {
+    "loose": {"max_overlap": 6, "max_attempts": 200},
+    "medium": {"max_overlap": 2, "max_weekly_time": 450, "max_attempts": 200},
+    "tight": {
+        "max_overlap": 0,
+        "max_weekly_time": 300,
+        "max_total_time_per_dish": 60,
+        "max_attempts": 200,
+    },
+}
+
+
+def _git_commit() -> str | None:
+    try:
+        done = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return done.stdout.strip()
+
+
+def _time(func: Callable[[], object], repeat: int) -> dict:
+    """Return best/median seconds of `repeat` calls."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {"best_s": min(timings), "median_s": statistics.median(timings)}
+
+
+def _plan_or_none(recipes, seed: int, level: dict):
+    try:
+        return WeeklyPlanner(recipes, seed=seed).plan(**level)
+    except ValueError:
+        return None
+
+
+def _meets(plan, level: dict) -> bool:
+    """Whether a plan satisfies the weekly limits of a constraint level."""
+    if plan is None or plan.ingredient_overlap > level["max_overlap"]:
+        return False
+    limit = level.get("max_weekly_time")
+    return limit is None or plan.total_time <= limit
+
+
+def run_size(size: int, repeat: int, workdir: Path) -> list[dict]:
+    """Run every case on a catalog of `size` synthetic recipes."""
+    recipes = synthetic_recipes(size)
+    results: list[dict] = []
+
+    def record(case: str, timing: dict, **params: object) -> None:
+        results.append({"case": case, "size": size, "params": params, **timing})
+
+    csv_path = workdir / f"recipes_{size}.csv"
+    save_recipes(csv_path, recipes)
+    record(
+        "load_recipes",
+        _time(lambda: load_recipes(csv_path, use_cache=False), repeat),
+        cache="cold",
+    )
+    load_recipes(csv_path)  # build the compiled cache
+    record("load_recipes", _time(lambda: load_recipes(csv_path), repeat), cache="warm")
+
+    for level, kwargs in PLAN_LEVELS.items():
+        seeds = iter(range(repeat))
+        outcome = _plan_or_none(recipes, -1, kwargs)
+        record(
+            "plan",
+            _time(lambda: _plan_or_none(recipes, next(seeds), kwargs), repeat),
+            level=level,
+            feasible=_meets(outcome, kwargs),
+        )
+
+    improve = dict(PLAN_LEVELS["tight"], local_search=LocalSearch(moves=2000))
+    seeds = iter(range(repeat))
+    outcome = _plan_or_none(recipes, -1, improve)
+    record(
+        "local_search",
+        _time(lambda: _plan_or_none(recipes, next(seeds), improve), repeat),
+        level="tight",
+        moves=2000,
+        feasible=_meets(outcome, improve),
+    )
+
+    selected = [next(recipe for recipe in recipes if recipe.has_meat)]
+    record(
+        "find_remaining_meat",
+        _time(lambda: find_remaining_meat(recipes, selected), repeat),
+    )
+
+    rng = random.Random(size)
+    pantry = sorted({i for r in rng.sample(recipes, min(size, 5)) for i in r.ingredients})
+    record("pick_index", _time(lambda: IngredientIndex(recipes), repeat))
+    index = IngredientIndex(recipes)
+    record("pick_covered_by", _time(lambda: index.covered_by(pantry), repeat))
+    record(
+        "pick_missing_at_most",
+        _time(lambda: index.missing_at_most(pantry, 1), repeat),
+        max_missing=1,
+    )
+
+    plan = _plan_or_none(recipes, 0, PLAN_LEVELS["loose"])
+    if plan is not None:
+        def render() -> None:
+            with Renderer(io.StringIO(), color=True) as out:
+                print_plan(plan, out)
+
+        record("print_plan", _time(render, repeat), dishes=len(plan.recipes))
+    return results
+
+
+def run_suite(sizes: list[int], repeat: int) -> dict:
+    """Run all sizes and return the JSON-ready report."""
+    with tempfile.TemporaryDirectory() as tmp:
+        results = []
+        for size in sizes:
+            print(f"benchmarking {size} recipes ...", file=sys.stderr)
+            results.extend(run_size(size, repeat, Path(tmp)))
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def _case_key(result: dict) -> tuple:
+    return (
+        result["case"],
+        result["size"],
+        json.dumps(
+            {k: v for k, v in result["params"].items() if k != "feasible"},
+            sort_keys=True,
+        ),
+    )
+
+
+def compare(baseline: dict, current: dict, stream=sys.stdout) -> float:
+    """Print current/baseline best-time ratios; return the worst ratio."""
+    base = {_case_key(result): result for result in baseline["results"]}
+    worst = 0.0
+    stream.write(
+        f"baseline {baseline.get('commit')} -> current {current.get('commit')}\n"
+    )
+    for result in current["results"]:
+        key = _case_key(result)
+        old = base.get(key)
+        label = f"{key[0]} {key[2] if key[2] != '{}' else ''}".strip()
+        if old is None:
+            stream.write(f"{result['size']:>9} {label:<48} (new)\n")
+            continue
+        ratio = result["best_s"] / old["best_s"] if old["best_s"] else float("inf")
+        worst = max(worst, ratio)
+        stream.write(
+            f"{result['size']:>9} {label:<48} "
+            f"{old['best_s'] * 1000:10.3f} -> {result['best_s'] * 1000:10.3f} ms"
+            f"  x{ratio:.2f}\n"
+        )
+    return worst
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default=",".join(map(str, DEFAULT_SIZES)),
+        help="Comma-separated catalog sizes.",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the JSON report here.")
+    parser.add_argument("--compare", help="Baseline JSON report to compare with.")
+    parser.add_argument(
+        "--fail-above",
+        type=float,
+        help="With --compare, exit 1 if any case is slower than this ratio.",
+    )
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    report = run_suite(sizes, args.repeat)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    elif not args.compare:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        worst = compare(baseline, report)
+        if args.fail_above is not None and worst > args.fail_above:
+            print(f"slowest case x{worst:.2f} > {args.fail_above}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,39 @@
+"""Synthetic recipe catalogs for benchmarks."""
+
+from __future__ import annotations
+
+import random
+
+from eat_what.ingredients_meat import INGREDIENT_MEAT
+from eat_what.ingredients_vegatable import INGREDIENT_VEGATABLE
+from eat_what.storage import Recipe
+
+
+def synthetic_recipes(count: int, *, seed: int = 0) -> list[Recipe]:
+    """Build `count` random recipes from the known ingredient dictionaries.
+
+    Roughly 60% of recipes contain meat (one or two meat ingredients) and 10%
+    are spicy; every recipe has one to three veg ingredients.
+    """
+    rng = random.Random(seed)
+    meat_names = sorted(INGREDIENT_MEAT)
+    veg_names = sorted(INGREDIENT_VEGATABLE)
+
+    recipes: list[Recipe] = []
+    for idx in range(count):
+        has_meat = rng.random() < 0.6
+        ingredients: list[str] = []
+        if has_meat:
+            ingredients.extend(rng.sample(meat_names, rng.randint(1, 2)))
+        ingredients.extend(rng.sample(veg_names, rng.randint(1, 3)))
+        recipes.append(
+            Recipe(
+                name=f"dish_{idx}",
+                ingredients=tuple(ingredients),
+                prep_time=rng.randint(5, 30),
+                cook_time=rng.randint(5, 90),
+                has_meat=has_meat,
+                spicy=rng.random() < 0.1,
+            )
+        )
+    return recipes
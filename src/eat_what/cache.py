@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+"""Compiled on-disk caches for data files.
+
+A cache lives next to its source file (`.<name>.cache`, or
+`.<name>.<tag>.cache` for extra caches of the same file) and stores a
+`marshal`-encoded payload together with the source size, mtime and SHA-256.
+Size and mtime are checked first; if only the mtime moved (e.g. the file was
+touched or copied) the content hash decides whether the payload is reused.
+Writers that just changed the source and know the new payload record it
+with `store_cached` instead of letting the next load rebuild it.
+Payloads must be built from marshal-able builtins (tuples, lists, dicts,
+str, int, bool), which keeps loading fast and never executes code.
+"""
+
+import hashlib
+import logging
+import marshal
+import os
+from pathlib import Path
+import tempfile
+from typing import Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT = 1
+
+T = TypeVar("T")
+
+
+def cache_path_for(source: str | Path, tag: str = "") -> Path:
+    """Return the cache file path used for a source file."""
+    source = Path(source)
+    suffix = f".{tag}.cache" if tag else ".cache"
+    return source.with_name(f".{source.name}{suffix}")
+
+
+def _file_digest(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_cache(cache_path: Path) -> dict | None:
+    """Read a cache file, returning None when missing or unreadable."""
+    try:
+        data = marshal.loads(cache_path.read_bytes())
+    except (OSError, EOFError, ValueError, TypeError) as exc:
+        if cache_path.exists():
+            logger.debug("Ignoring unreadable cache %s: %s", cache_path, exc)
+        return None
+    if not isinstance(data, dict) or data.get("format") != CACHE_FORMAT:
+        return None
+    return data
+
+
+def _write_cache(cache_path: Path, data: dict, source_mode: int) -> None:
+    """Atomically write a cache file; failures only disable caching.
+
+    The cache gets the source's read/write permission bits, so everyone who
+    can read (or rewrite) a shared catalog can use (or refresh) its cache;
+    `mkstemp` alone would leave it private to the writer.
+    """
+    try:
+        fd, tmp_name = tempfile.mkstemp(
+            prefix=cache_path.name, suffix=".tmp", dir=cache_path.parent
+        )
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(marshal.dumps(data))
+            os.chmod(tmp_name, source_mode & 0o666)
+            os.replace(tmp_name, cache_path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+    except OSError as exc:
+        logger.debug("Unable to write cache %s: %s", cache_path, exc)
+
+
+def load_cached(
+    source: str | Path,
+    build: Callable[[], T],
+    *,
+    key: str = "",
+    tag: str = "",
+) -> T:
+    """Return `build()` for `source`, served from the compiled cache if fresh.
+
+    `key` identifies anything else the payload depends on (for example the
+    ingredient dictionaries); a different key forces a rebuild. `tag` names
+    a separate cache file for another payload of the same source.
+    """
+    source = Path(source)
+    cache_path = cache_path_for(source, tag)
+    stat = source.stat()
+
+    cached = _read_cache(cache_path)
+    if cached is not None and cached.get("key") == key:
+        if cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["payload"]
+        if cached["size"] == stat.st_size and cached["sha256"] == _file_digest(source):
+            cached["mtime_ns"] = stat.st_mtime_ns
+            _write_cache(cache_path, cached, stat.st_mode)
+            return cached["payload"]
+
+    digest = _file_digest(source)
+    payload = build()
+    _write_cache(
+        cache_path,
+        {
+            "format": CACHE_FORMAT,
+            "key": key,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest,
+            "payload": payload,
+        },
+        stat.st_mode,
+    )
+    return payload
+
+
+def store_cached(
+    source: str | Path, payload: object, *, key: str = "", tag: str = ""
+) -> None:
+    """Record `payload` as the cache of `source` in its current state.
+
+    For writers that just changed `source` and know the new payload. The
+    file is not hashed, so a later change that keeps the size but moves the
+    mtime rebuilds the payload instead of reusing it.
+    """
+    source = Path(source)
+    stat = source.stat()
+    _write_cache(
+        cache_path_for(source, tag),
+        {
+            "format": CACHE_FORMAT,
+            "key": key,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": "",
+            "payload": payload,
+        },
+        stat.st_mode,
+    )
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+"""Ingredient catalogs: JSON Lines data files instead of Python literals.
+
+The built-in catalog ships with the package as `data/ingredients.jsonl`. A
+user catalog (`$EAT_WHAT_INGREDIENTS`, default
+`$XDG_DATA_HOME/eat-what/ingredients.jsonl`) extends it and wins on
+duplicate names, so new ingredients never touch the installed package. One
+object per line:
+
+    {"name": "pork belly", "cn": "五花肉", "kind": "pork"}
+
+`kind` is a `MeatKind` value or "veg". The user catalog is parsed through
+the compiled cache (`cache.load_cached`); the small built-in one is parsed
+directly, since its cache would be written into the installed package.
+`append_ingredient` adds one line to
+the user catalog with a single `O_APPEND` write under the same sidecar
+lock `storage.append_recipe` uses; existing lines are never rewritten.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+
+from .cache import load_cached
+from .ingredients_meat import MeatKind
+
+logger = logging.getLogger(__name__)
+
+VEG_KIND = "veg"
+KINDS = frozenset([kind.value for kind in MeatKind] + [VEG_KIND])
+
+_CATALOG_CACHE_VERSION = 1
+
+
+def builtin_catalog_path() -> Path:
+    """Return the catalog shipped with the package."""
+    return Path(__file__).resolve().with_name("data") / "ingredients.jsonl"
+
+
+def user_catalog_path() -> Path:
+    """Return the user catalog path (it may not exist yet)."""
+    configured = os.environ.get("EAT_WHAT_INGREDIENTS")
+    if configured:
+        return Path(configured).expanduser()
+    data_home = os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share"
+    return Path(data_home) / "eat-what" / "ingredients.jsonl"
+
+
+def _entry(record: object) -> tuple[str, str, str]:
+    """Validate one decoded line into (name, cn, kind)."""
+    if not isinstance(record, dict):
+        raise ValueError("Expected a JSON object")
+    name = str(record.get("name") or "").strip()
+    cn = str(record.get("cn") or "").strip()
+    kind = str(record.get("kind") or "").strip()
+    if not name:
+        raise ValueError("Missing ingredient name")
+    if not cn:
+        raise ValueError(f"Missing Chinese name for {name}")
+    if kind not in KINDS:
+        raise ValueError(f"Unknown kind for {name}: {kind!r}")
+    return name, cn, kind
+
+
+def _parse_catalog(path: Path) -> list[tuple[str, str, str]]:
+    """Parse a catalog file; invalid lines are logged and skipped."""
+    entries = []
+    with path.open(encoding="utf-8-sig") as handle:
+        for lineno, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                entries.append(_entry(json.loads(line)))
+            except ValueError as exc:
+                logger.warning("Invalid ingredient at %s:%s: %s", path, lineno, exc)
+    return entries
+
+
+def load_catalog(path: str | Path) -> list[tuple[str, str, str]]:
+    """Return the (name, cn, kind) entries of one catalog file, in file order.
+
+    A missing file is an empty catalog.
+    """
+    path = Path(path)
+    if not path.exists():
+        return []
+    if path.resolve() == builtin_catalog_path():
+        return _parse_catalog(path)
+    return load_cached(
+        path,
+        lambda: _parse_catalog(path),
+        key=f"ingredients-v{_CATALOG_CACHE_VERSION}",
+    )
+
+
+def catalog_entries() -> dict[str, tuple[str, str]]:
+    """Return name -> (cn, kind) over the built-in and user catalogs."""
+    entries: dict[str, tuple[str, str]] = {}
+    for path in (builtin_catalog_path(), user_catalog_path()):
+        for name, cn, kind in load_catalog(path):
+            entries[name] = (cn, kind)
+    return entries
+
+
+def append_ingredient(
+    name: str, cn: str, kind: str, path: str | Path | None = None
+) -> Path:
+    """Append one ingredient to a catalog (default: the user catalog).
+
+    Returns the catalog path. Raises ValueError for an invalid entry or a
+    name the catalog already lists.
+    """
+    from .storage import _locked
+
+    name, cn, kind = _entry({"name": name, "cn": cn, "kind": kind})
+    path = user_catalog_path() if path is None else Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    line = json.dumps({"name": name, "cn": cn, "kind": kind}, ensure_ascii=False)
+    with _locked(path):
+        if any(entry[0] == name for entry in load_catalog(path)):
+            raise ValueError(f"Ingredient already exists: {name}")
+        prefix = ""
+        if path.exists() and path.stat().st_size > 0:
+            with path.open("rb") as handle:
+                handle.seek(-1, os.SEEK_END)
+                prefix = "" if handle.read(1) in (b"\n", b"\r") else "\n"
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, f"{prefix}{line}\n".encode("utf-8"))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    return path
@@ -3,21 +3,34 @@ from __future__ import annotations
 """CLI for generating a weekly meal plan and shopping list."""
 
 import argparse
-from collections import Counter
+from contextlib import ExitStack
 from pathlib import Path
+import sys
+from typing import Iterable, Iterator
 
-from .ingredients_meat import INGREDIENT_MEAT
-from .ingredients_vegatable import INGREDIENT_VEGATABLE
-from .planner import WeeklyPlanner
-from .storage import default_recipes_path, load_recipes
-from .text_format import color_code, display_width, ljust_display
+from .ingredients_meat import MEAT_KIND_BITS, MeatKind
+from .local_search import LocalSearch
+from .planner import (
+    DEFAULT_MAX_WEEKLY_TIME,
+    SEARCH_ENGINES,
+    PlanResult,
+    PlanStats,
+    WeeklyPlanner,
+)
+from .records import RECORD_FORMATS, write_plans
+from .render import Renderer
+from .rolling import plan_weeks
+from .sampling import load_ratings
+from .shopping import DEFAULT_UNIT, ShoppingItem, ShoppingList, load_quantities
+from .storage import default_recipes_path, is_sqlite_path, load_recipes
 
 COLOR_ORANGE = "\x1b[38;5;208m"
 COLOR_GREEN = "\x1b[32m"
 COLOR_BLUE = "\x1b[34m"
 COLOR_PURPLE = "\x1b[35m"
 COLOR_RED = "\x1b[31m"
-COLOR_RESET = "\x1b[0m"
+
+FISH_BIT = MEAT_KIND_BITS[MeatKind.FISH]
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -26,7 +39,12 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--recipes",
         default=default_recipes_path(),
-        help="Path to recipes CSV.",
+        help="Path to recipes CSV or SQLite store (.db).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always re-parse the recipes CSV instead of using its compiled cache.",
     )
     parser.add_argument(
         "--max-time",
@@ -39,7 +57,7 @@ def build_parser() -> argparse.ArgumentParser:
         "--max-weekly-time",
         "-m",
         type=int,
-        default=400,
+        default=DEFAULT_MAX_WEEKLY_TIME,
         help="Max total minutes for the week.",
     )
     parser.add_argument(
@@ -69,108 +87,327 @@ def build_parser() -> argparse.ArgumentParser:
         default=None,
         help="Random seed for reproducibility.",
     )
+    parser.add_argument(
+        "--count",
+        "-n",
+        type=int,
+        default=1,
+        help="Number of weekly plans to generate.",
+    )
+    parser.add_argument(
+        "--distinct",
+        action="store_true",
+        help="With --count, never repeat the same set of dishes.",
+    )
+    parser.add_argument(
+        "--weeks",
+        type=int,
+        default=1,
+        help="Plan this many consecutive weeks without repeating recent dishes.",
+    )
+    parser.add_argument(
+        "--no-repeat-weeks",
+        type=int,
+        default=1,
+        help="With --weeks, how many past weeks' dishes are kept out of the pool.",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=1,
+        help="Worker processes for the random search (use with large --max-attempts).",
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=200,
+        help="Random samples to try before falling back to the best candidate.",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=SEARCH_ENGINES,
+        default="random",
+        help=(
+            "Meat-plan search engine; 'exact' always finds a plan if one exists, "
+            "'vectorized' scores random samples in NumPy batches."
+        ),
+    )
+    parser.add_argument(
+        "--local-search",
+        type=int,
+        default=0,
+        metavar="MOVES",
+        help=(
+            "Improve each plan with up to this many swap moves (simulated "
+            "annealing); repairs near misses over --max-overlap."
+        ),
+    )
+    parser.add_argument(
+        "--local-search-time",
+        type=float,
+        metavar="SECONDS",
+        help="Wall-time budget per plan for --local-search.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("text",) + RECORD_FORMATS,
+        default="text",
+        help=(
+            "Output format: aligned text, a JSON array of plans, or one JSON "
+            "plan per line (ndjson)."
+        ),
+    )
+    parser.add_argument(
+        "--plain",
+        action="store_true",
+        help="Print without ANSI colors (default when output is not a terminal).",
+    )
+    parser.add_argument(
+        "--portions",
+        help=(
+            "CSV (ingredient,quantity,unit) with the amount of each ingredient "
+            "one dish needs; default 1 份."
+        ),
+    )
+    parser.add_argument(
+        "--pantry",
+        help="CSV (ingredient,quantity,unit) of stock to take off the shopping list.",
+    )
+    parser.add_argument(
+        "--ratings",
+        help=(
+            "CSV (name,rating) of recipe ratings; dishes are drawn in proportion "
+            "to them (unrated recipes count 1)."
+        ),
+    )
+    parser.add_argument(
+        "--combined",
+        action="store_true",
+        help="With --count/--weeks, also print one shopping list for all plans.",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print search counters and phase timings of each plan to stderr.",
+    )
     return parser
 
 
-def print_plan(result) -> None:
+def format_stats(stats: PlanStats) -> str:
+    """Return a one-line summary of a plan's search stats."""
+    bounds = [
+        f"{value} {unit}"
+        for value, unit in ((stats.bound_time, "min"), (stats.bound_overlap, "overlap"))
+        if value is not None
+    ]
+    return (
+        f"[stats] {stats.engine}: {stats.attempts} attempts, rejected "
+        f"{stats.rejected_time} time / {stats.rejected_overlap} overlap / "
+        f"{stats.rejected_fish} fish, fallback {'yes' if stats.fallback else 'no'}"
+        + (f", bounds >= {' / '.join(bounds)}" if bounds else "")
+        + (
+            f", {stats.moves} moves / {stats.accepted_moves} accepted"
+            if stats.moves
+            else ""
+        )
+        + f" | filter {stats.filter_s * 1000:.2f} ms, "
+        f"partition {stats.partition_s * 1000:.2f} ms, "
+        f"search {stats.search_s * 1000:.2f} ms, "
+        + (
+            f"local search {stats.local_search_s * 1000:.2f} ms, "
+            if stats.moves
+            else ""
+        )
+        + f"add-ons {stats.add_ons_s * 1000:.2f} ms"
+    )
+
+
+def _with_stats(results: Iterable[PlanResult]) -> Iterator[PlanResult]:
+    """Pass plans through, printing each one's stats once it was consumed."""
+    for result in results:
+        yield result
+        if result.stats is not None:
+            print(format_stats(result.stats), file=sys.stderr)
+
+
+def print_plan(
+    result, out: Renderer | None = None, *, shopping: ShoppingList | None = None
+) -> None:
     """Pretty print the planned menu and shopping list in CN/EN.
      - CN support so that multi-column display is aligned properly
        with Chinese characters
-     - Color code
+     - Color code (unless `out` renders plain text)
        - vegatable are COLOR_GREEN
        - dishes taking more than 1 hr are colored COLOR_RED
+    Output goes through `out` (a buffered `Renderer`); without one, a
+    renderer on stdout is flushed at the end. `shopping` replaces the
+    plan's own one-portion-per-dish list (e.g. with portions or a pantry).
     """
-    print("\n这周将就吃：")
-    print("-")
+    if out is None:
+        with Renderer() as out:
+            print_plan(result, out, shopping=shopping)
+        return
+
+    out.line("\n这周将就吃：")
+    out.line("-")
     dish_items = []
-    fish_names = {
-        name for name, item in INGREDIENT_MEAT.items() if item.kind.value == "fish"
-    }
 
     # Print recipe for the week
     for idx, recipe in enumerate(result.recipes, start=1):
-        is_fish = any(ing in fish_names for ing in recipe.ingredients)
         if recipe.spicy:
-            name = color_code(recipe.name, COLOR_PURPLE, COLOR_RESET)
-        elif is_fish:
-            name = color_code(recipe.name, COLOR_BLUE, COLOR_RESET)
+            name = out.paint(recipe.name, COLOR_PURPLE)
+        elif recipe.meat_mask & FISH_BIT:
+            name = out.paint(recipe.name, COLOR_BLUE)
         elif not recipe.has_meat:
-            name = color_code(recipe.name, COLOR_GREEN, COLOR_RESET)
+            name = out.paint(recipe.name, COLOR_GREEN)
         else:
             name = recipe.name
         time_label = f"{recipe.total_time} min"
         if recipe.total_time > 60:
-            time_label = color_code(time_label, COLOR_RED, COLOR_RESET)
+            time_label = out.paint(time_label, COLOR_RED)
         dish_items.append(
-            f"{color_code(f'{idx}.', COLOR_ORANGE, COLOR_RESET)} "
+            f"{out.paint(f'{idx}.', COLOR_ORANGE)} "
             f"{name} | {time_label} | "
             f"{'meat' if recipe.has_meat else 'veg'}"
         )
-    if dish_items:
-        per_line = 2
-        col_width = max(display_width(item) for item in dish_items)
-        for start in range(0, len(dish_items), per_line):
-            row = dish_items[start : start + per_line]
-            padded = [ljust_display(item, col_width) for item in row]
-            print("   ".join(padded))
-
-    print("-")
-    print(f"你在做饭上浪费的时间: {result.total_time} min")
-    print(f"肉类重复次数: {result.ingredient_overlap}")
-
-    # Extract ingredients from all recipe and display the total as
-    # the shopping list
-    ingredients = Counter()
-    for recipe in result.recipes:
-        ingredients.update(recipe.ingredients)
-
-    print("\n跑腿清单")
-    print("-")
-    ingredient_cn = {
-        **{name: item.cn for name, item in INGREDIENT_MEAT.items()},
-        **{name: item.cn for name, item in INGREDIENT_VEGATABLE.items()},
-    }
-    veg_names = set(INGREDIENT_VEGATABLE)
-    fish_names = {
-        name for name, item in INGREDIENT_MEAT.items() if item.kind.value == "fish"
-    }
+    out.columns(dish_items, per_line=2)
+
+    out.line("-")
+    out.line(f"你在做饭上浪费的时间: {result.total_time} min")
+    out.line(f"肉类重复次数: {result.ingredient_overlap}")
+    # Show the menu before the shopping list is aggregated.
+    out.flush()
+
+    if shopping is None:
+        shopping = ShoppingList.from_plans([result])
+    print_shopping(shopping.items(), out)
+
+
+def print_shopping(
+    items: Iterable[ShoppingItem], out: Renderer, title: str = "\n跑腿清单"
+) -> None:
+    """Print shopping-list lines in columns: fish blue, vegetables green."""
+    out.line(title)
+    out.line("-")
     display_items: list[str] = []
-    for ingredient, count in ingredients.most_common():
-        cn_name = ingredient_cn.get(ingredient)
-        display_name = f"{cn_name} ({ingredient})" if cn_name else ingredient
-        if ingredient in fish_names:
-            display_name = color_code(display_name, COLOR_BLUE, COLOR_RESET)
-        elif ingredient in veg_names:
-            display_name = color_code(display_name, COLOR_GREEN, COLOR_RESET)
-        display_items.append(f"{display_name} x{count}")
-
-    if display_items:
-        per_line = 3
-        col_width = max(display_width(item) for item in display_items)
-        for start in range(0, len(display_items), per_line):
-            row = display_items[start : start + per_line]
-            padded = [ljust_display(item, col_width) for item in row]
-            print("   ".join(padded))
+    for item in items:
+        display_name = f"{item.cn} ({item.ingredient})" if item.cn else item.ingredient
+        if item.kind == "fish":
+            display_name = out.paint(display_name, COLOR_BLUE)
+        elif item.kind == "veg":
+            display_name = out.paint(display_name, COLOR_GREEN)
+        quantity = item.quantity
+        if isinstance(quantity, float):
+            quantity = f"{quantity:g}"
+        amount = (
+            f"x{quantity}" if item.unit == DEFAULT_UNIT else f"{quantity} {item.unit}"
+        )
+        display_items.append(f"{display_name} {amount}")
+    out.columns(display_items, per_line=3)
 
 
 def main() -> int:
-    """Entry point for the meal planner CLI."""
+    """Entry point for the meal planner CLI (`eat-what serve` runs the server)."""
+    if sys.argv[1:2] == ["serve"]:
+        from .server import main as serve_main
+
+        return serve_main(sys.argv[2:])
     parser = build_parser()
     args = parser.parse_args()
+    if args.weeks > 1 and args.count > 1:
+        parser.error("--weeks and --count cannot be combined.")
+    try:
+        local_search = (
+            LocalSearch(moves=args.local_search, time_limit_s=args.local_search_time)
+            if args.local_search > 0
+            else None
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
 
     recipes_path = Path(args.recipes)
-    recipes = load_recipes(recipes_path)
-    planner = WeeklyPlanner(recipes, seed=args.seed)
+    weights = load_ratings(args.ratings) if args.ratings else None
+    stack = ExitStack()
+    if is_sqlite_path(recipes_path):
+        if args.workers > 1:
+            parser.error("--workers needs a CSV recipes file.")
+        if not recipes_path.exists():
+            raise FileNotFoundError(f"Recipes file not found: {recipes_path}")
+        from .sqlite_store import SqliteRecipeStore
 
-    result = planner.plan(
+        store = stack.enter_context(SqliteRecipeStore(recipes_path))
+        planner = WeeklyPlanner.from_source(store, seed=args.seed, weights=weights)
+    else:
+        recipes = load_recipes(recipes_path, use_cache=not args.no_cache)
+        planner = WeeklyPlanner(
+            recipes, seed=args.seed, workers=args.workers, weights=weights
+        )
+    portions = load_quantities(args.portions) if args.portions else None
+    pantry = load_quantities(args.pantry) if args.pantry else None
+    plan_options = dict(
         max_total_time_per_dish=args.max_time,
         max_weekly_time=args.max_weekly_time,
         max_overlap=args.max_overlap,
         veg_dishes=args.veg_dishes,
         spicy_dishes=args.spicy_dishes,
+        max_attempts=args.max_attempts,
+        engine=args.engine,
+        local_search=local_search,
     )
-
-    print_plan(result)
+    with stack, planner:
+        if args.weeks > 1:
+            results = plan_weeks(
+                planner,
+                args.weeks,
+                no_repeat_weeks=args.no_repeat_weeks,
+                **plan_options,
+            )
+            header = "第 {idx}/{total} 周"
+            total = args.weeks
+        else:
+            results = planner.plan_many(
+                args.count, distinct=args.distinct, **plan_options
+            )
+            header = "第 {idx}/{total} 套"
+            total = args.count
+        if args.stats:
+            results = _with_stats(results)
+        combined = ShoppingList(portions) if args.combined else None
+        if combined is not None and pantry:
+            combined.subtract(pantry)
+        try:
+            if args.format != "text":
+                write_plans(
+                    results,
+                    sys.stdout,
+                    args.format,
+                    portions=portions,
+                    pantry=pantry,
+                    combined=combined,
+                )
+                return 0
+            out = Renderer(color=False if args.plain else None)
+            for idx, result in enumerate(results, start=1):
+                if total > 1:
+                    out.line(f"\n===== {header.format(idx=idx, total=total)} =====")
+                print_plan(
+                    result,
+                    out,
+                    shopping=ShoppingList.from_plans(
+                        [result], portions=portions, pantry=pantry
+                    ),
+                )
+                if combined is not None:
+                    combined.add_plan(result)
+                out.flush()
+            if combined is not None:
+                print_shopping(combined.items(), out, "\n===== 合计跑腿清单 =====")
+                out.flush()
+        except ValueError:
+            if args.stats and planner.last_stats is not None:
+                print(format_stats(planner.last_stats), file=sys.stderr)
+            raise
     return 0
 
 
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+"""CLI for converting between recipes CSV files and SQLite stores."""
+
+import argparse
+
+from .sqlite_store import SqliteRecipeStore
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the recipe store CLI."""
+    parser = argparse.ArgumentParser(
+        description="Import or export a SQLite recipe store."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_cmd = commands.add_parser(
+        "import", help="Add recipes from a CSV file to a SQLite store."
+    )
+    import_cmd.add_argument("csv", help="Source recipes CSV.")
+    import_cmd.add_argument("db", help="SQLite store (created if missing).")
+    export_cmd = commands.add_parser(
+        "export", help="Write every recipe in a SQLite store to a CSV file."
+    )
+    export_cmd.add_argument("db", help="Source SQLite store.")
+    export_cmd.add_argument("csv", help="Destination recipes CSV.")
+    return parser
+
+
+def main() -> int:
+    """Entry point for the recipe store CLI."""
+    args = build_parser().parse_args()
+    with SqliteRecipeStore(args.db) as store:
+        if args.command == "import":
+            added = store.import_csv(args.csv)
+            print(f"Imported {added} recipe(s) into {args.db} ({len(store)} total).")
+        else:
+            written = store.export_csv(args.csv)
+            print(f"Exported {written} recipe(s) to {args.csv}.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
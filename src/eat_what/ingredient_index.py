@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+"""Inverted ingredient index for "what can I cook with these" queries.
+
+Each ingredient maps to the ids of the recipes that use it. A query only
+walks the posting lists of the selected ingredients and counts hits per
+recipe; a recipe is covered when its hit count equals its number of distinct
+ingredients. Query cost therefore depends on how many recipes use the
+selected ingredients, not on the catalog size.
+"""
+
+from collections import Counter
+from typing import Iterable
+
+from .storage import Recipe
+
+
+class IngredientIndex:
+    """Ingredient -> recipe-id posting lists built once from a catalog."""
+    def __init__(self, recipes: Iterable[Recipe]) -> None:
+        self._recipes = tuple(recipes)
+        self._needed: list[int] = []
+        self._no_ingredients: list[int] = []
+        postings: dict[str, list[int]] = {}
+        for recipe_id, recipe in enumerate(self._recipes):
+            distinct = set(recipe.ingredients)
+            self._needed.append(len(distinct))
+            if not distinct:
+                self._no_ingredients.append(recipe_id)
+            for ingredient in distinct:
+                postings.setdefault(ingredient, []).append(recipe_id)
+        self._postings = {name: tuple(ids) for name, ids in postings.items()}
+
+    @property
+    def recipes(self) -> tuple[Recipe, ...]:
+        """Indexed recipes; recipe ids are positions in this tuple."""
+        return self._recipes
+
+    def recipe_ids(self, ingredient: str) -> tuple[int, ...]:
+        """Return ids of recipes using `ingredient`, in catalog order."""
+        return self._postings.get(ingredient, ())
+
+    def _hits(self, ingredients: Iterable[str]) -> Counter:
+        """Count selected ingredients per recipe that uses any of them."""
+        hits: Counter = Counter()
+        for ingredient in set(ingredients):
+            hits.update(self._postings.get(ingredient, ()))
+        return hits
+
+    def covered_by(self, ingredients: Iterable[str]) -> list[Recipe]:
+        """Return recipes whose ingredients are all in `ingredients`."""
+        hits = self._hits(ingredients)
+        ids = [rid for rid, count in hits.items() if count == self._needed[rid]]
+        ids.extend(self._no_ingredients)
+        return [self._recipes[rid] for rid in sorted(ids)]
+
+    def missing_at_most(
+        self, ingredients: Iterable[str], max_missing: int
+    ) -> list[tuple[Recipe, tuple[str, ...]]]:
+        """Return recipes missing at most `max_missing` ingredients.
+
+        Only recipes that use at least one selected ingredient are considered.
+        Results are (recipe, missing ingredients) pairs ranked by the number
+        of missing ingredients, then catalog order.
+        """
+        if max_missing < 0:
+            raise ValueError("max_missing must be non-negative.")
+        selected = set(ingredients)
+        hits = self._hits(selected)
+        ranked = [
+            (self._needed[rid] - count, rid)
+            for rid, count in hits.items()
+            if self._needed[rid] - count <= max_missing
+        ]
+        ranked.extend((0, rid) for rid in self._no_ingredients)
+        ranked.sort()
+
+        results: list[tuple[Recipe, tuple[str, ...]]] = []
+        for _, rid in ranked:
+            recipe = self._recipes[rid]
+            missing = tuple(
+                dict.fromkeys(ing for ing in recipe.ingredients if ing not in selected)
+            )
+            results.append((recipe, missing))
+        return results
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+"""Ingredient registry: one precomputed, read-only view of all ingredients.
+
+`INGREDIENT_MEAT` and `INGREDIENT_VEGATABLE` (loaded from the ingredient
+catalogs) stay the editable source dictionaries; `registry()` returns an
+`IngredientRegistry` built lazily from them on first use, holding
+per-ingredient integer ids, Chinese names, kinds and meat-kind bits, plus
+the groupings callers used to rebuild per call (CN menus, fish and veg name
+sets, ingredients per meat kind, mask decoding). `refresh_registry()`
+rebuilds it after the dictionaries change, e.g. when `eat-what-recipe` adds
+an ingredient.
+"""
+
+import hashlib
+from types import MappingProxyType
+from typing import Iterable, Mapping, NamedTuple
+
+from .catalog import VEG_KIND
+from .ingredients_meat import MEAT_KIND_BITS, MeatKind, meat_ingredients
+from .ingredients_vegatable import vegatable_ingredients
+
+
+class IngredientInfo(NamedTuple):
+    """Registry entry of one ingredient."""
+    id: int
+    name: str
+    cn: str
+    kind: str  # a `MeatKind` value, or "veg"
+    bit: int  # meat-kind bit (see `MEAT_KIND_BITS`), 0 for veg
+    is_meat: bool
+    is_fish: bool
+    is_veg: bool
+
+
+class IngredientRegistry:
+    """Immutable lookups over a snapshot of the ingredient dictionaries.
+
+    Ids are dense, meat ingredients first, both groups in dictionary order.
+    """
+    def __init__(
+        self,
+        meat: Mapping[str, object] | None = None,
+        veg: Mapping[str, object] | None = None,
+    ) -> None:
+        meat = meat_ingredients() if meat is None else meat
+        veg = vegatable_ingredients() if veg is None else veg
+        fish_bit = MEAT_KIND_BITS[MeatKind.FISH]
+        entries: list[IngredientInfo] = []
+        for name, item in meat.items():
+            bit = MEAT_KIND_BITS[item.kind]
+            entries.append(
+                IngredientInfo(
+                    len(entries), name, item.cn, item.kind.value, bit,
+                    True, bit == fish_bit, False,
+                )
+            )
+        for name, item in veg.items():
+            if name in meat:
+                continue
+            entries.append(
+                IngredientInfo(
+                    len(entries), name, item.cn, VEG_KIND, 0, False, False, True
+                )
+            )
+
+        self.entries: tuple[IngredientInfo, ...] = tuple(entries)
+        self._by_name = MappingProxyType({info.name: info for info in entries})
+        # name -> (Chinese name, kind), the shopping-list and record labels.
+        self.labels = MappingProxyType(
+            {info.name: (info.cn, info.kind) for info in entries}
+        )
+        # name -> Chinese name per group, for the selection menus.
+        self.meat_cn = MappingProxyType(
+            {info.name: info.cn for info in entries if info.is_meat}
+        )
+        self.veg_cn = MappingProxyType(
+            {info.name: info.cn for info in entries if info.is_veg}
+        )
+        self.fish_names = frozenset(info.name for info in entries if info.is_fish)
+        self.veg_names = frozenset(self.veg_cn)
+        self.kind_groups = MappingProxyType(
+            {
+                kind: frozenset(
+                    info.name for info in entries if info.kind == kind.value
+                )
+                for kind in MeatKind
+            }
+        )
+        # Every meat-kind mask decoded once: mask -> kinds in enum order.
+        self._mask_kinds = tuple(
+            tuple(kind for kind, bit in MEAT_KIND_BITS.items() if mask & bit)
+            for mask in range(1 << len(MeatKind))
+        )
+        meat_kinds = sorted((info.name, info.kind) for info in entries if info.is_meat)
+        self.meat_digest = hashlib.sha256(
+            repr(([kind.value for kind in MeatKind], meat_kinds)).encode("utf-8")
+        ).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._by_name
+
+    def __getitem__(self, name: str) -> IngredientInfo:
+        return self._by_name[name]
+
+    def get(self, name: str) -> IngredientInfo | None:
+        """Return the entry of `name`, or None if it is not registered."""
+        return self._by_name.get(name)
+
+    def ids(self, names: Iterable[str]) -> tuple[int, ...]:
+        """Return the ids of the registered names, in order; others are skipped."""
+        by_name = self._by_name
+        return tuple(by_name[name].id for name in names if name in by_name)
+
+    def kinds(self, mask: int) -> tuple[MeatKind, ...]:
+        """Return the meat kinds set in a meat-kind bitmask."""
+        return self._mask_kinds[mask]
+
+
+_registry: IngredientRegistry | None = None
+
+
+def registry() -> IngredientRegistry:
+    """Return the current ingredient registry, building it on first use."""
+    if _registry is None:
+        return refresh_registry()
+    return _registry
+
+
+def refresh_registry() -> IngredientRegistry:
+    """Rebuild the registry from the ingredient dictionaries and return it."""
+    global _registry
+    _registry = IngredientRegistry()
+    return _registry
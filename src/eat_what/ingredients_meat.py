@@ -1,7 +1,13 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
 from enum import Enum
+from typing import Iterable
+
+"""Meat ingredient metadata (EN name, CN name, and kind).
 
-"""Meat ingredient metadata (EN name, CN name, and kind)."""
+The entries come from the ingredient catalogs (see `catalog`).
+"""
 
 
 class MeatKind(Enum):
@@ -23,27 +29,45 @@ class MeatIngredient:
     cn: str
 
 
-INGREDIENT_MEAT = {
-    "bacon": MeatIngredient(MeatKind.PORK, "培根"),
-    "beef brisket": MeatIngredient(MeatKind.BEEF, "牛腩"),
-    "beef steak": MeatIngredient(MeatKind.BEEF, "牛排"),
-    "chicken breast": MeatIngredient(MeatKind.CHICKEN, "鸡胸肉"),
-    "chicken drumstick": MeatIngredient(MeatKind.CHICKEN, "鸡腿"),
-    "chicken thigh": MeatIngredient(MeatKind.CHICKEN, "鸡腿肉"),
-    "chicken wings": MeatIngredient(MeatKind.CHICKEN, "鸡翅"),
-    "duck breast": MeatIngredient(MeatKind.DUCK, "鸭胸"),
-    "ground beef": MeatIngredient(MeatKind.BEEF, "牛肉末"),
-    "lamb chops": MeatIngredient(MeatKind.LAMB, "羊排"),
-    "pork belly": MeatIngredient(MeatKind.PORK, "五花肉"),
-    "pork ribs": MeatIngredient(MeatKind.PORK, "排骨"),
-    "pork shoulder": MeatIngredient(MeatKind.PORK, "猪肩肉"),
-    "salmon": MeatIngredient(MeatKind.FISH, "三文鱼"),
-    "beef piece": MeatIngredient(MeatKind.BEEF, "火锅牛肉片"),
-    "mussel": MeatIngredient(MeatKind.SHELL, "青口"),
-    "shrimp": MeatIngredient(MeatKind.SHRIMP, "虾"),
-    "beef tendon": MeatIngredient(MeatKind.BEEF, "牛筋"),
-    "meatball": MeatIngredient(MeatKind.PORK, "肉丸"),
-    "beef roast": MeatIngredient(MeatKind.BEEF, "炖牛肉的肉"),
-    "whole chicken": MeatIngredient(MeatKind.CHICKEN, "整鸡鸡块"),
-
-}
+_meat: dict[str, MeatIngredient] | None = None
+
+
+def meat_ingredients() -> dict[str, MeatIngredient]:
+    """Return the meat ingredients, loading the catalogs on first use."""
+    global _meat
+    if _meat is None:
+        from .catalog import VEG_KIND, catalog_entries
+
+        _meat = {
+            name: MeatIngredient(MeatKind(kind), cn)
+            for name, (cn, kind) in catalog_entries().items()
+            if kind != VEG_KIND
+        }
+    return _meat
+
+
+def __getattr__(name: str) -> object:
+    # `INGREDIENT_MEAT` is the `meat_ingredients()` dict, loaded lazily.
+    if name == "INGREDIENT_MEAT":
+        return meat_ingredients()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+MEAT_KIND_BITS = {kind: 1 << idx for idx, kind in enumerate(MeatKind)}
+
+
+def meat_signature(ingredients: Iterable[str]) -> tuple[int, int]:
+    """Return (meat-kind bitmask, meat ingredient count) for ingredients.
+
+    Overlap across a set of recipes is then the summed counts minus the
+    number of bits set in the OR of their masks.
+    """
+    table = meat_ingredients()
+    mask = 0
+    count = 0
+    for ingredient in ingredients:
+        meat = table.get(ingredient)
+        if meat is not None:
+            mask |= MEAT_KIND_BITS[meat.kind]
+            count += 1
+    return mask, count
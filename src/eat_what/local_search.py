@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+"""Local-search stage that improves a meat plan with swap moves.
+
+Starting from the engine's plan (or, when no sample fit the weekly cap, the
+fastest dishes with the fastest fish dish), simulated annealing replaces
+one dish at a time with another meat recipe of the pool. The planner's
+fish rule is kept: when the pool has fish recipes, the plan holds exactly
+one fish dish, swapped only for another fish dish sharing no meat kind
+with the rest of the plan, and the other dishes are drawn from
+`pool.remaining_meat(fish.meat_mask)`.
+
+A move is scored in O(1): total time changes by the two dishes' times,
+and overlap (`sum(meat_count) - popcount(OR of meat_mask)`) is kept as
+the meat count plus the number of plan dishes covering each meat kind, so
+only the kinds of the two swapped dishes are looked at. The objective is
+minimized (see `LocalSearch`); worse moves are accepted with probability
+`exp(-delta / temperature)`, the temperature falling geometrically over
+the move or time budget, and the best plan seen is returned.
+"""
+
+from dataclasses import dataclass
+import math
+import random
+import time
+from typing import TYPE_CHECKING
+
+from .ingredients_meat import MEAT_KIND_BITS, MeatKind
+from .storage import Recipe
+
+if TYPE_CHECKING:
+    from .planner import PlanPool, PlanStats
+
+_FISH_BIT = MEAT_KIND_BITS[MeatKind.FISH]
+# mask -> bit positions set in it
+_MASK_BITS = tuple(
+    tuple(bit for bit in range(len(MeatKind)) if mask >> bit & 1)
+    for mask in range(1 << len(MeatKind))
+)
+# Moves between checks of the wall-clock budget.
+_CLOCK_EVERY = 256
+
+
+@dataclass(frozen=True)
+class LocalSearch:
+    """Budget and objective of the local-search stage.
+
+    The search stops after `moves` swap moves or `time_limit_s` seconds,
+    whichever comes first. It minimizes, in minutes-equivalent,
+
+        time_weight * total_time + overlap_weight * overlap
+        + time_penalty * (minutes over max_weekly_time)
+        + overlap_penalty * (overlap over max_overlap)
+
+    so by default it first removes constraint violations and then shortens
+    the plan. `start_temperature`/`end_temperature` bound the annealing
+    schedule, in the same units.
+    """
+    moves: int = 2000
+    time_limit_s: float | None = None
+    time_weight: float = 1.0
+    overlap_weight: float = 0.0
+    time_penalty: float = 10.0
+    overlap_penalty: float = 100.0
+    start_temperature: float = 10.0
+    end_temperature: float = 0.05
+
+    def __post_init__(self) -> None:
+        if self.moves < 0:
+            raise ValueError("Local search moves must be non-negative.")
+        if self.time_limit_s is not None and not self.time_limit_s > 0:
+            raise ValueError("Local search time_limit_s must be positive.")
+        if not 0 < self.end_temperature <= self.start_temperature:
+            raise ValueError(
+                "Local search temperatures need 0 < end_temperature <= start_temperature."
+            )
+
+    def score(
+        self,
+        total_time: int,
+        overlap: int,
+        max_weekly_time: int | None,
+        max_overlap: int,
+    ) -> float:
+        """Objective value of a meat plan (lower is better)."""
+        score = self.time_weight * total_time + self.overlap_weight * overlap
+        if overlap > max_overlap:
+            score += self.overlap_penalty * (overlap - max_overlap)
+        if max_weekly_time is not None and total_time > max_weekly_time:
+            score += self.time_penalty * (total_time - max_weekly_time)
+        return score
+
+
+def _start_plan(pool: PlanPool, meat_target: int) -> list[Recipe] | None:
+    """The fastest dishes; with fish recipes, the fastest fish dish that
+    leaves enough meat, and the fastest dishes sharing no kind with it."""
+    by_time = sorted(pool.meat, key=lambda recipe: recipe.total_time)
+    if not pool.fish:
+        return by_time[:meat_target]
+    for fish in sorted(pool.fish, key=lambda recipe: recipe.total_time):
+        remaining = pool.remaining_meat(fish.meat_mask)
+        if len(remaining) >= meat_target - 1:
+            rest = sorted(remaining, key=lambda recipe: recipe.total_time)
+            return [fish] + rest[: meat_target - 1]
+    return None
+
+
+def improve_meat_plan(
+    pool: PlanPool,
+    selection: list[Recipe] | None,
+    rng: random.Random,
+    settings: LocalSearch,
+    *,
+    meat_target: int,
+    max_weekly_time: int | None,
+    max_overlap: int,
+    stats: PlanStats | None = None,
+) -> tuple[list[Recipe], int, int] | None:
+    """Anneal a meat plan; see module docstring.
+
+    `selection` is the engine's plan, or None to start from the fastest
+    dishes. Returns (selection, total_time, overlap) of the best plan seen,
+    or None if the pool holds no plan meeting the fish rule.
+    """
+    fish_pool = pool.fish
+    if len(pool.meat) < meat_target:
+        return None
+    plan = list(selection) if selection is not None else _start_plan(pool, meat_target)
+    if plan is None:
+        return None
+
+    total_time = 0
+    meat_count = 0
+    covering = [0] * len(MeatKind)
+    fish_pos = None
+    for pos, recipe in enumerate(plan):
+        total_time += recipe.total_time
+        meat_count += recipe.meat_count
+        for bit in _MASK_BITS[recipe.meat_mask]:
+            covering[bit] += 1
+        if recipe.meat_mask & _FISH_BIT:
+            fish_pos = pos
+    # Non-fish dishes are drawn from here (all meat without fish recipes).
+    if fish_pos is None:
+        others = pool.meat
+    else:
+        others = pool.remaining_meat(plan[fish_pos].meat_mask)
+    kinds = sum(1 for dishes in covering if dishes)
+    in_plan = {id(recipe) for recipe in plan}
+
+    def score(total: int, overlap: int) -> float:
+        return settings.score(total, overlap, max_weekly_time, max_overlap)
+
+    current = score(total_time, meat_count - kinds)
+    best = (current, list(plan), total_time, meat_count - kinds)
+    start = settings.start_temperature
+    ratio = settings.end_temperature / start
+    temperature = start
+    cooling = ratio ** (1.0 / max(settings.moves, 1))
+    started = time.perf_counter()
+    rand = rng.random
+    moves = accepted = 0
+    for moves in range(1, settings.moves + 1):
+        temperature *= cooling
+        if settings.time_limit_s is not None and moves % _CLOCK_EVERY == 0:
+            # Cool by whichever budget is further along.
+            elapsed = (time.perf_counter() - started) / settings.time_limit_s
+            if elapsed >= 1.0:
+                moves -= 1
+                break
+            temperature = min(temperature, start * ratio ** elapsed)
+        pos = int(rand() * len(plan))
+        out = plan[pos]
+        out_mask = out.meat_mask
+        swap_fish = pos == fish_pos
+        # The fish dish only makes way for another fish dish; the others
+        # only for dishes sharing no kind with it.
+        candidates = fish_pool if swap_fish else others
+        if not candidates:
+            continue
+        new = candidates[int(rand() * len(candidates))]
+        if id(new) in in_plan:
+            continue
+
+        new_mask = new.meat_mask
+        if swap_fish and any(
+            covering[bit] > (out_mask >> bit & 1) for bit in _MASK_BITS[new_mask]
+        ):
+            # The new fish dish shares a kind with the rest of the plan.
+            continue
+        lost = sum(1 for bit in _MASK_BITS[out_mask] if covering[bit] == 1)
+        gained = sum(
+            1
+            for bit in _MASK_BITS[new_mask]
+            if covering[bit] == (1 if out_mask >> bit & 1 else 0)
+        )
+        new_total = total_time - out.total_time + new.total_time
+        new_count = meat_count - out.meat_count + new.meat_count
+        new_overlap = new_count - (kinds - lost + gained)
+        candidate = score(new_total, new_overlap)
+        delta = candidate - current
+        if delta > 0 and rand() >= math.exp(-delta / temperature):
+            continue
+
+        accepted += 1
+        for bit in _MASK_BITS[out_mask]:
+            covering[bit] -= 1
+        for bit in _MASK_BITS[new_mask]:
+            covering[bit] += 1
+        kinds += gained - lost
+        if swap_fish:
+            others = pool.remaining_meat(new_mask)
+        in_plan.discard(id(out))
+        in_plan.add(id(new))
+        plan[pos] = new
+        total_time = new_total
+        meat_count = new_count
+        current = candidate
+        if current < best[0]:
+            best = (current, list(plan), total_time, new_overlap)
+
+    if stats is not None:
+        stats.moves += moves
+        stats.accepted_moves += accepted
+    _, plan, total_time, overlap = best
+    return plan, total_time, overlap
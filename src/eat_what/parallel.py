@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+"""Process-pool fan-out for the random meat-plan search.
+
+The catalog is written once to a columnar snapshot (see `snapshot.py`) that
+every worker memory-maps, so workers share its pages instead of each
+unpickling and holding their own `Recipe` objects. A search splits the
+attempt budget into one chunk per worker; every chunk runs the regular
+random engine over the snapshot's pools on its own `random.Random` seeded
+from the planner's RNG, and returns snapshot row indices. Recipe weights
+reach the workers once, keyed by row index; meat dishes a narrowed parent
+pool left out travel with each chunk as row indices, and each worker moves
+only the rows that changed since its previous chunk in and out of a cached
+narrowed pool. The parent keeps
+the first feasible chunk in chunk order, else the fastest fallback, so
+results are deterministic for a given planner seed.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import operator
+import os
+from pathlib import Path
+import random
+import tempfile
+from typing import Iterable, Mapping
+
+from .planner import PlanPool, PlanStats, WeeklyPlanner
+from .rolling import _HandleTable, _RollingPool
+from .snapshot import RecipeSnapshot, write_snapshot
+from .storage import Recipe
+
+_worker_planner: WeeklyPlanner | None = None
+# Per time limit: the narrowed pool, row index -> pool key, excluded rows.
+_worker_narrowed: dict[
+    int | None, tuple[_RollingPool, dict[int, int], frozenset[int]]
+] = {}
+
+
+def _init_worker(
+    snapshot_path: str, days: int, row_weights: dict[int, float] | None
+) -> None:
+    """Map the catalog snapshot and keep a planner with warm pools."""
+    global _worker_planner
+    _worker_narrowed.clear()
+    _worker_planner = WeeklyPlanner.from_source(
+        RecipeSnapshot(snapshot_path), days=days, weights=row_weights
+    )
+    # Snapshot rows carry no names; weights are keyed by row index.
+    _worker_planner._weight_key = operator.attrgetter("index")
+
+
+def _search_chunk(
+    seed: int,
+    attempts: int,
+    max_total_time_per_dish: int | None,
+    max_weekly_time: int | None,
+    max_overlap: int,
+    excluded: tuple[int, ...] = (),
+) -> tuple[tuple[list[int], int, int] | None, PlanStats]:
+    """Run `attempts` random draws in a worker; return row indices and stats.
+
+    Rows in `excluded` are left out of the pool for this chunk.
+    """
+    planner = _worker_planner
+    planner._random = random.Random(seed)
+    pool = _narrowed_pool(planner, max_total_time_per_dish, frozenset(excluded))
+    stats = PlanStats()
+    result = planner._find_best_meat_plan(
+        pool,
+        meat_target=planner._days,
+        max_weekly_time=max_weekly_time,
+        max_overlap=max_overlap,
+        max_attempts=attempts,
+        stats=stats,
+    )
+    if result is None:
+        return None, stats
+    selection, total_time, overlap = result
+    return ([row.index for row in selection], total_time, overlap), stats
+
+
+def _narrowed_pool(
+    planner: WeeklyPlanner, limit: int | None, excluded: frozenset[int]
+) -> PlanPool:
+    """Return the worker's pool for `limit` without the `excluded` rows.
+
+    The narrowed pool is kept per time limit and, like the parent's rolling
+    pool, only the rows excluded or released since the previous chunk are
+    moved, instead of rescanning the snapshot.
+    """
+    cached = _worker_narrowed.get(limit)
+    if cached is None:
+        if not excluded:
+            return planner._pool(limit)
+        table = _HandleTable(planner._pool(limit))
+        keys = {handle.index: key for key, handle in enumerate(table.handles)}
+        cached = (_RollingPool(table), keys, frozenset())
+    pool, keys, before = cached
+    for row in before - excluded:
+        if row in keys:
+            pool.restore(keys[row])
+    for row in excluded - before:
+        if row in keys:
+            pool.discard(keys[row])
+    _worker_narrowed[limit] = (pool, keys, excluded)
+    return pool
+
+
+def _row_weights(
+    recipes: list[Recipe], weights: Mapping[str, float] | None
+) -> dict[int, float] | None:
+    """Translate name-keyed weights to snapshot row indices."""
+    if not weights:
+        return None
+    # Empty when no recipe is weighted: workers then sample uniformly.
+    return {
+        idx: weights[recipe.name]
+        for idx, recipe in enumerate(recipes)
+        if recipe.name in weights
+    }
+
+
+class ParallelSearch:
+    """Process pool that runs random meat-plan searches over one catalog."""
+    def __init__(
+        self,
+        recipes: list[Recipe],
+        *,
+        days: int,
+        workers: int,
+        weights: Mapping[str, float] | None = None,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be positive.")
+        self._recipes = recipes
+        self._rows: dict[int, int] | None = None
+        self._workers = workers
+        fd, snapshot_path = tempfile.mkstemp(prefix="eat-what-", suffix=".snap")
+        os.close(fd)
+        self._snapshot_path = Path(snapshot_path)
+        try:
+            write_snapshot(self._snapshot_path, recipes)
+        except BaseException:
+            self._snapshot_path.unlink()
+            raise
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(snapshot_path, days, _row_weights(recipes, weights)),
+        )
+
+    def search(
+        self,
+        rng: random.Random,
+        *,
+        max_attempts: int,
+        max_total_time_per_dish: int | None,
+        max_weekly_time: int | None,
+        max_overlap: int,
+        excluded: Iterable[Recipe] = (),
+        stats: PlanStats | None = None,
+    ) -> tuple[list[Recipe], int, int] | None:
+        """Split `max_attempts` across workers and reduce to the best plan.
+
+        Recipes in `excluded` are not drawn. Counters of the chunks that
+        were collected are added to `stats`.
+        """
+        excluded_rows = self._row_indices(excluded)
+        chunks = [
+            max_attempts // self._workers + (1 if idx < max_attempts % self._workers else 0)
+            for idx in range(self._workers)
+        ]
+        futures = [
+            self._executor.submit(
+                _search_chunk,
+                rng.getrandbits(64),
+                attempts,
+                max_total_time_per_dish,
+                max_weekly_time,
+                max_overlap,
+                excluded_rows,
+            )
+            for attempts in chunks
+            if attempts > 0
+        ]
+
+        best: tuple[list[int], int, int] | None = None
+        for future in futures:
+            result, chunk_stats = future.result()
+            if stats is not None:
+                stats.add_counts(chunk_stats)
+            if result is None:
+                continue
+            if result[2] <= max_overlap:
+                best = result
+                break
+            if best is None or result[1] < best[1]:
+                best = result
+        for future in futures:
+            future.cancel()
+
+        if best is None:
+            return None
+        indices, total_time, overlap = best
+        return [self._recipes[idx] for idx in indices], total_time, overlap
+
+    def _row_indices(self, recipes: Iterable[Recipe]) -> tuple[int, ...]:
+        """Return the snapshot rows of catalog recipes, sorted."""
+        recipes = list(recipes)
+        if not recipes:
+            return ()
+        if self._rows is None:
+            self._rows = {id(recipe): idx for idx, recipe in enumerate(self._recipes)}
+        return tuple(sorted(self._rows[id(recipe)] for recipe in recipes))
+
+    def close(self) -> None:
+        """Shut down the worker processes and remove the snapshot."""
+        self._executor.shutdown(cancel_futures=True)
+        self._snapshot_path.unlink(missing_ok=True)
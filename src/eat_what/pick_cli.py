@@ -3,12 +3,13 @@ from __future__ import annotations
 """CLI for listing recipes that match selected ingredients."""
 
 import argparse
+from contextlib import ExitStack
 from pathlib import Path
 
-from .ingredients_meat import INGREDIENT_MEAT
-from .ingredients_vegatable import INGREDIENT_VEGATABLE
+from .ingredient_index import IngredientIndex
+from .ingredients import registry
 from .selection import select_from
-from .storage import default_recipes_path, load_recipes
+from .storage import default_recipes_path, is_sqlite_path, load_recipes
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -19,7 +20,19 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--recipes",
         default=default_recipes_path(),
-        help="Path to recipes CSV.",
+        help="Path to recipes CSV or SQLite store (.db).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always re-parse the recipes CSV instead of using its compiled cache.",
+    )
+    parser.add_argument(
+        "--missing",
+        "-k",
+        type=int,
+        default=0,
+        help="Also list recipes missing at most this many ingredients.",
     )
     return parser
 
@@ -29,34 +42,53 @@ def main() -> int:
     parser = build_parser()
     args = parser.parse_args()
 
-    meat_cn = {name: item.cn for name, item in INGREDIENT_MEAT.items()}
-    veg_cn = {name: item.cn for name, item in INGREDIENT_VEGATABLE.items()}
-
+    ingredients = registry()
     selected: list[str] = []
-    selected.extend(select_from(meat_cn, "Select meat ingredients:"))
-    selected.extend(select_from(veg_cn, "Select veg ingredients:"))
+    selected.extend(select_from(ingredients.meat_cn, "Select meat ingredients:"))
+    selected.extend(select_from(ingredients.veg_cn, "Select veg ingredients:"))
 
     if not selected:
         print("No ingredients selected.")
         return 1
 
-    selected_set = set(selected)
-    recipes = load_recipes(Path(args.recipes))
-    matches = [
-        recipe
-        for recipe in recipes
-        if all(ing in selected_set for ing in recipe.ingredients)
-    ]
-
-    print("\nMatching Recipes")
-    print("-")
-    if not matches:
-        print("No recipes match the selected ingredients.")
-        return 0
+    recipes_path = Path(args.recipes)
+    stack = ExitStack()
+    if is_sqlite_path(recipes_path):
+        if not recipes_path.exists():
+            raise FileNotFoundError(f"Recipes file not found: {recipes_path}")
+        from .sqlite_store import SqliteRecipeStore
+
+        # Same lookup interface as IngredientIndex, answered by SQL.
+        index = stack.enter_context(SqliteRecipeStore(recipes_path))
+    else:
+        recipes = load_recipes(recipes_path, use_cache=not args.no_cache)
+        index = IngredientIndex(recipes)
+    with stack:
+        matches = index.covered_by(selected)
 
-    for recipe in matches:
-        print(f"{recipe.name} | {recipe.total_time} min")
-    return 0
+        print("\nMatching Recipes")
+        print("-")
+        if not matches:
+            print("No recipes match the selected ingredients.")
+        for recipe in matches:
+            print(f"{recipe.name} | {recipe.total_time} min")
+
+        if args.missing > 0:
+            near = [
+                (recipe, missing)
+                for recipe, missing in index.missing_at_most(selected, args.missing)
+                if missing
+            ]
+            print(f"\nMissing at most {args.missing} ingredient(s)")
+            print("-")
+            if not near:
+                print("No other recipes are within reach.")
+            for recipe, missing in near:
+                print(
+                    f"{recipe.name} | {recipe.total_time} min | "
+                    f"missing: {', '.join(missing)}"
+                )
+        return 0
 
 
 if __name__ == "__main__":
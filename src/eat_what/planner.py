@@ -8,18 +8,101 @@ Overall logic:
 - If any fish recipes exist, force at least one fish dish in the meat plan.
 - Append configurable non-spicy veg dishes (with replacement) as a best-effort add-on.
 - Append configurable spicy dishes from spicy recipes only as best effort.
+
+The meat plan is searched by a pluggable engine (see `SEARCH_ENGINES`):
+- "random": rejection sampling bounded by `max_attempts` (default).
+- "exact": branch-and-bound over interchangeable recipe groups that returns
+  a feasible plan whenever one exists.
+- "vectorized": the random search drawn and scored in NumPy batches (see
+  `vectorized.py`; needs the `numpy` extra).
+
+Before searching, lower bounds on a plan's total time and meat overlap
+(see `_PlanBounds`) reject provably infeasible constraints with a precise
+reason, and let the random engine drop a fish pick whose fastest possible
+completion is already over the weekly cap.
+
+Dishes are drawn uniformly, or in proportion to per-recipe weights (e.g.
+household ratings, see `sampling.load_ratings`) given to the planner;
+weighted draws use tables cached per pool partition (see `sampling.py`).
+
+An optional local-search stage (`local_search=LocalSearch(...)`, see
+`local_search.py`) then anneals the engine's plan with swap moves scored
+incrementally, to repair near misses and minimize a configurable objective.
+
+Every plan records a `PlanStats` (search counters and phase timings) on
+`PlanResult.stats`; `WeeklyPlanner.last_stats` also keeps it when the
+search fails.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import partial, reduce
+import heapq
 import logging
-from typing import Iterable
+import operator
+import time
+from typing import TYPE_CHECKING, Iterable, Iterator, Mapping
 import random
+import weakref
 
-from .ingredients_meat import INGREDIENT_MEAT, MeatKind
+from .ingredients_meat import MEAT_KIND_BITS, MeatKind
+from .sampling import WeightedSampler, check_weights
 from .storage import Recipe
 
+if TYPE_CHECKING:
+    from .local_search import LocalSearch
+
 logger = logging.getLogger(__name__)
 
+SEARCH_ENGINES = ("random", "exact", "vectorized")
+# Weekly time budget (minutes) of `eat-what` and the server's `/plan`.
+DEFAULT_MAX_WEEKLY_TIME = 400
+# Overlap rejections after which the random engine checks whether
+# `max_overlap` can be met at all.
+_OVERLAP_CHECK_AFTER = 16
+_FISH_BIT = MEAT_KIND_BITS[MeatKind.FISH]
+
+
+@dataclass
+class PlanStats:
+    """Counters and wall times (seconds) of one plan's search.
+
+    `attempts` counts candidate meat plans drawn by the "random" and
+    "vectorized" engines; each failed draw counts toward one `rejected_*`
+    reason: `rejected_fish` when too little meat remained that shares no
+    kind with the forced fish dish, `rejected_time` when over
+    `max_weekly_time`, `rejected_overlap` when over `max_overlap` (the
+    "vectorized" engine counts only the candidates it scored).
+    `fallback` means no candidate met `max_overlap` and the fastest one
+    within the time cap was used. `filter_s`/`partition_s` are zero when
+    the plan reused a cached pool; store-built pools report their whole
+    build as `filter_s`. `bound_time`/`bound_overlap` are the pool's lower
+    bounds on any meat plan, None unless the search needed them (see
+    `_PlanBounds`). `moves`/`accepted_moves` count the local-search stage's
+    swap moves, timed in `local_search_s`.
+    """
+    engine: str = "random"
+    attempts: int = 0
+    rejected_fish: int = 0
+    rejected_time: int = 0
+    rejected_overlap: int = 0
+    fallback: bool = False
+    bound_time: int | None = None
+    bound_overlap: int | None = None
+    moves: int = 0
+    accepted_moves: int = 0
+    filter_s: float = 0.0
+    partition_s: float = 0.0
+    search_s: float = 0.0
+    local_search_s: float = 0.0
+    add_ons_s: float = 0.0
+
+    def add_counts(self, other: PlanStats) -> None:
+        """Add another search's counters (e.g. a worker chunk's) to these."""
+        self.attempts += other.attempts
+        self.rejected_fish += other.rejected_fish
+        self.rejected_time += other.rejected_time
+        self.rejected_overlap += other.rejected_overlap
+
 
 @dataclass(frozen=True)
 class PlanResult:
@@ -27,6 +110,7 @@ class PlanResult:
     recipes: tuple[Recipe, ...]
     total_time: int
     ingredient_overlap: int
+    stats: PlanStats | None = field(default=None, compare=False, repr=False)
 
 
 def find_remaining_meat(
@@ -34,25 +118,260 @@ def find_remaining_meat(
     selected_recipes: list[Recipe],
 ) -> list[Recipe]:
     """Return recipes whose meat kinds do not overlap with selected recipes."""
-    selected_meat_kinds = set()
+    selected_mask = 0
     for recipe in selected_recipes:
-        for ingredient in recipe.ingredients:
-            meat = INGREDIENT_MEAT.get(ingredient)
-            if meat is not None:
-                selected_meat_kinds.add(meat.kind)
+        selected_mask |= recipe.meat_mask
+    return [recipe for recipe in all_recipes if not recipe.meat_mask & selected_mask]
+
+
+def _popcount(mask: int) -> int:
+    """Count set bits (int.bit_count needs Python 3.10)."""
+    return bin(mask).count("1")
+
+
+@dataclass(frozen=True)
+class _RecipeGroup:
+    """Recipes that are interchangeable for the plan constraints."""
+    total_time: int
+    mask: int
+    count: int
+    recipes: tuple[Recipe, ...]
+
+
+def _group_recipes(
+    recipes: list[Recipe], rng: random.Random
+) -> list[_RecipeGroup]:
+    """Group recipes by (total_time, meat signature), fastest groups first.
+
+    Ties between groups of equal time are broken by the seeded RNG so the
+    exact engine does not always favour the same dishes.
+    """
+    grouped: dict[tuple[int, int, int], list[Recipe]] = {}
+    for recipe in recipes:
+        key = (recipe.total_time, recipe.meat_mask, recipe.meat_count)
+        grouped.setdefault(key, []).append(recipe)
+
+    groups = [
+        _RecipeGroup(total_time, mask, count, tuple(members))
+        for (total_time, mask, count), members in grouped.items()
+    ]
+    rng.shuffle(groups)
+    groups.sort(key=lambda group: group.total_time)
+    return groups
+
+
+def _search_groups(
+    groups: list[_RecipeGroup],
+    dishes: int,
+    time_budget: int | None,
+    mask: int,
+    overlap: int,
+    max_overlap: int | None,
+) -> list[tuple[int, int]] | None:
+    """Pick `dishes` recipes from `groups` under the time and overlap limits.
+
+    Depth-first branch-and-bound: groups are sorted by time, so the cheapest
+    way to finish from group `j` is a prefix of the flattened time list, which
+    bounds the weekly time; overlap never decreases when adding dishes, and
+    every dish with a known meat beyond the meat kinds still unused in
+    groups `j..` adds at least one, which bounds the overlap. Failed states
+    are memoized, which turns the search into a DP over (group, dishes left,
+    time used, meat kinds, overlap).
+    Returns (group index, number of recipes) pairs, or None if infeasible.
+    """
+    offsets = [0]
+    prefix = [0]
+    for group in groups:
+        offsets.append(offsets[-1] + len(group.recipes))
+        for _ in group.recipes:
+            prefix.append(prefix[-1] + group.total_time)
+    # Meat kinds, and recipes without a known meat, of groups[j:], for the
+    # overlap bound.
+    suffix_masks = [0] * (len(groups) + 1)
+    suffix_unknown = [0] * (len(groups) + 1)
+    for idx in range(len(groups) - 1, -1, -1):
+        group = groups[idx]
+        suffix_masks[idx] = suffix_masks[idx + 1] | group.mask
+        suffix_unknown[idx] = suffix_unknown[idx + 1] + (
+            0 if group.count else len(group.recipes)
+        )
+
+    def min_time(start: int, remaining: int) -> int | None:
+        first = offsets[start]
+        if first + remaining > offsets[-1]:
+            return None
+        return prefix[first + remaining] - prefix[first]
+
+    failed: set[tuple[int, int, int | None, int, int]] = set()
+
+    def visit(
+        start: int, remaining: int, used_time: int, used_mask: int, used_overlap: int
+    ) -> list[tuple[int, int]] | None:
+        if remaining == 0:
+            return []
+        key = (
+            start,
+            remaining,
+            used_time if time_budget is not None else None,
+            used_mask,
+            used_overlap,
+        )
+        if key in failed:
+            return None
 
-    remaining: list[Recipe] = []
-    for recipe in all_recipes:
-        recipe_meat_kinds = set()
-        for ingredient in recipe.ingredients:
-            meat = INGREDIENT_MEAT.get(ingredient)
-            if meat is not None:
-                recipe_meat_kinds.add(meat.kind)
+        for idx in range(start, len(groups)):
+            cheapest = min_time(idx, remaining)
+            if cheapest is None:
+                break
+            if time_budget is not None and used_time + cheapest > time_budget:
+                break
+            if max_overlap is not None and (
+                used_overlap
+                + remaining
+                - suffix_unknown[idx]
+                - _popcount(suffix_masks[idx] & ~used_mask)
+                > max_overlap
+            ):
+                break
+            group = groups[idx]
+            merged = used_mask | group.mask
+            for taken in range(min(len(group.recipes), remaining), 0, -1):
+                new_overlap = (
+                    used_overlap
+                    + taken * group.count
+                    - (_popcount(merged) - _popcount(used_mask))
+                )
+                if max_overlap is not None and new_overlap > max_overlap:
+                    continue
+                new_time = used_time + taken * group.total_time
+                if time_budget is not None and new_time > time_budget:
+                    continue
+                rest = visit(idx + 1, remaining - taken, new_time, merged, new_overlap)
+                if rest is not None:
+                    return [(idx, taken)] + rest
+
+        failed.add(key)
+        return None
+
+    return visit(0, dishes, 0, mask, overlap)
+
+
+class PlanPool:
+    """Recipes within a per-dish time limit, partitioned by plan role.
+
+    Built once per time limit and shared by every plan drawn from it.
+    """
+    # Bumped by pools whose partitions change, so derived tables are rebuilt.
+    version = 0
+
+    def __init__(self, recipes: Iterable[Recipe]) -> None:
+        self.spicy: list[Recipe] = []
+        self.meat: list[Recipe] = []
+        self.fish: list[Recipe] = []
+        self.veg: list[Recipe] = []
+        for recipe in recipes:
+            for role in self.roles(recipe):
+                getattr(self, role).append(recipe)
+        self._remaining: dict[int, list[Recipe]] = {}
+
+    @staticmethod
+    def roles(recipe: Recipe) -> tuple[str, ...]:
+        """Return the partitions ("spicy", "meat", "fish", "veg") a recipe joins."""
+        if recipe.spicy:
+            return ("spicy",)
+        if not recipe.has_meat:
+            return ("veg",)
+        if recipe.meat_mask & _FISH_BIT:
+            return ("meat", "fish")
+        return ("meat",)
+
+    def remaining_meat(self, mask: int) -> list[Recipe]:
+        """Return meat recipes sharing no meat kind with `mask` (memoized)."""
+        remaining = self._remaining.get(mask)
+        if remaining is None:
+            remaining = [r for r in self.meat if not r.meat_mask & mask]
+            self._remaining[mask] = remaining
+        return remaining
+
+    def resolve(self, items: list[Recipe]) -> list[Recipe]:
+        """Return the recipes for partition items; pools that keep lighter
+        row handles (see `snapshot.py`) build `Recipe`s here."""
+        return items
+
+
+class _PlanBounds:
+    """Lower bounds on the meat plans of one pool, for prechecks and pruning.
+
+    A plan is `days` distinct meat recipes, so the sum of the `days`
+    smallest times bounds its total time, and the `days - 1` smallest bound
+    the dishes drawn next to a forced fish dish. Overlap is at least the
+    `days` smallest meat counts minus every meat kind in the pool. Each
+    bound is computed on first use, so plans that never need one don't pay
+    for it.
+    """
+    def __init__(self, pool: PlanPool, days: int) -> None:
+        self._pool = pool
+        self._days = days
+        # Bounds computed so far (None until first use).
+        self.computed_min_time: int | None = None
+        self.computed_min_overlap: int | None = None
+        self._smallest_times: list[int] | None = None
+
+    def infeasible(self, max_weekly_time: int | None) -> str | None:
+        """Return why no meat plan can be built, or None if one may exist."""
+        pool = self._pool
+        if pool.fish and len(pool.meat) - len(pool.fish) < self._days - 1:
+            return (
+                f"only {len(pool.meat) - len(pool.fish)} meat dishes without fish, "
+                f"{self._days - 1} needed next to the fish dish"
+            )
+        if len(pool.meat) < self._days:
+            return f"only {len(pool.meat)} meat dishes, {self._days} needed"
+        if max_weekly_time is not None and self.min_time() > max_weekly_time:
+            return (
+                f"the {self._days} fastest meat dishes take {self.min_time()} min, "
+                f"over max_weekly_time {max_weekly_time}"
+            )
+        return None
+
+    def min_time(self) -> int:
+        """Smallest possible total time of a meat plan."""
+        if self._smallest_times is None:
+            self._smallest_times = heapq.nsmallest(
+                self._days, map(_total_time, self._pool.meat)
+            )
+            self.computed_min_time = sum(self._smallest_times)
+        return self.computed_min_time
 
-        if recipe_meat_kinds.isdisjoint(selected_meat_kinds):
-            remaining.append(recipe)
+    def min_overlap(self) -> int:
+        """Smallest possible meat overlap of a plan."""
+        if self.computed_min_overlap is None:
+            meat = self._pool.meat
+            counts = sum(heapq.nsmallest(self._days, map(_meat_count, meat)))
+            kinds = reduce(operator.or_, map(_meat_mask, meat), 0)
+            self.computed_min_overlap = max(0, counts - _popcount(kinds))
+        return self.computed_min_overlap
 
-    return remaining
+    def rest_time(self) -> int:
+        """Smallest total time of the dishes drawn next to a fish dish."""
+        self.min_time()
+        return sum(self._smallest_times[: self._days - 1])
+
+
+_recipe_name = operator.attrgetter("name")
+_total_time = operator.attrgetter("total_time")
+_meat_count = operator.attrgetter("meat_count")
+_meat_mask = operator.attrgetter("meat_mask")
+
+_bounds: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _plan_bounds(pool: PlanPool, days: int) -> _PlanBounds:
+    """Return the bounds of `pool` for `days`, rebuilt when the pool changes."""
+    cached = _bounds.get(pool)
+    if cached is None or cached[:2] != (pool.version, days):
+        cached = _bounds[pool] = (pool.version, days, _PlanBounds(pool, days))
+    return cached[2]
 
 
 class WeeklyPlanner:
@@ -63,10 +382,56 @@ class WeeklyPlanner:
         *,
         days: int = 7,
         seed: int | None = None,
+        workers: int = 1,
+        weights: Mapping[str, float] | None = None,
     ) -> None:
+        """`workers > 1` runs the random engine's attempts in a process pool;
+        call `close()` (or use the planner as a context manager) when done.
+
+        `weights` maps recipe names to positive sampling weights (default 1);
+        dishes are then drawn in proportion to them instead of uniformly.
+        """
+        if workers < 1:
+            raise ValueError("workers must be positive.")
         self._recipes = list(recipes)
         self._days = days
         self._random = random.Random(seed)
+        self._pools: dict[int | None, PlanPool] = {}
+        self._workers = workers
+        self._parallel = None
+        self._source = None
+        self._weights = check_weights(weights) if weights else None
+        self._weight_key = _recipe_name
+        # pool -> (pool.version, {id(partition): (partition, sampler)})
+        self._samplers: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self.last_stats: PlanStats | None = None
+
+    @classmethod
+    def from_source(
+        cls,
+        source,
+        *,
+        days: int = 7,
+        seed: int | None = None,
+        weights: Mapping[str, float] | None = None,
+    ) -> WeeklyPlanner:
+        """Plan from a store that builds its own `PlanPool`s, e.g. a
+        `SqliteRecipeStore`, so filtering runs in the store's queries."""
+        planner = cls((), days=days, seed=seed, weights=weights)
+        planner._source = source
+        return planner
+
+    def __enter__(self) -> WeeklyPlanner:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release worker processes started for parallel search, if any."""
+        if self._parallel is not None:
+            self._parallel.close()
+            self._parallel = None
 
     def plan(
         self,
@@ -77,126 +442,482 @@ class WeeklyPlanner:
         veg_dishes: int = 3,
         spicy_dishes: int = 0,
         max_attempts: int = 200,
+        engine: str = "random",
+        local_search: LocalSearch | None = None,
     ) -> PlanResult:
-        """Build a weekly plan and append extra veg dishes if possible."""
+        """Build a weekly plan and append extra veg dishes if possible.
+
+        `engine` selects the meat-plan search, one of `SEARCH_ENGINES`.
+        `max_attempts` applies to the "random" and "vectorized" engines.
+        `local_search` enables the swap-move optimizer on the engine's plan.
+        """
+        self._validate(veg_dishes, spicy_dishes, engine)
+        stats = self.last_stats = PlanStats(engine=engine)
+        pool = self._pool(max_total_time_per_dish, stats)
+        return self._plan_from_pool(
+            pool,
+            stats=stats,
+            max_total_time_per_dish=max_total_time_per_dish,
+            max_weekly_time=max_weekly_time,
+            max_overlap=max_overlap,
+            veg_dishes=veg_dishes,
+            spicy_dishes=spicy_dishes,
+            max_attempts=max_attempts,
+            engine=engine,
+            local_search=local_search,
+        )
+
+    def plan_many(
+        self,
+        count: int,
+        *,
+        distinct: bool = False,
+        max_total_time_per_dish: int | None = None,
+        max_weekly_time: int | None = None,
+        max_overlap: int = 6,
+        veg_dishes: int = 3,
+        spicy_dishes: int = 0,
+        max_attempts: int = 200,
+        engine: str = "random",
+        local_search: LocalSearch | None = None,
+    ) -> Iterator[PlanResult]:
+        """Yield `count` plans that share filtering and partitioning work.
+
+        With `distinct`, no two plans have the same dish multiset; each plan
+        gets up to `max_attempts` redraws before a ValueError is raised.
+        The first plan's stats include building the pool.
+        """
+        if count < 0:
+            raise ValueError("count must be non-negative.")
+        self._validate(veg_dishes, spicy_dishes, engine)
+        pool_stats = self.last_stats = PlanStats(engine=engine)
+        pool = self._pool(max_total_time_per_dish, pool_stats)
+        if not pool.meat:
+            raise ValueError("No meat recipes available to plan.")
+
+        seen: set[tuple[str, ...]] = set()
+        for _ in range(count):
+            for _ in range(max_attempts if distinct else 1):
+                result = self._plan_from_pool(
+                    pool,
+                    stats=pool_stats,
+                    max_total_time_per_dish=max_total_time_per_dish,
+                    max_weekly_time=max_weekly_time,
+                    max_overlap=max_overlap,
+                    veg_dishes=veg_dishes,
+                    spicy_dishes=spicy_dishes,
+                    max_attempts=max_attempts,
+                    engine=engine,
+                    local_search=local_search,
+                )
+                key = tuple(sorted(recipe.name for recipe in result.recipes))
+                pool_stats = None
+                if not distinct or key not in seen:
+                    break
+            else:
+                raise ValueError(
+                    f"Unable to build a distinct plan after {max_attempts} attempts."
+                )
+            seen.add(key)
+            yield result
 
-        # Recipe collection and validation
-        if not self._recipes:
-            raise ValueError("No recipes available to plan.")
+    @staticmethod
+    def _validate(veg_dishes: int, spicy_dishes: int, engine: str) -> None:
+        """Validate plan arguments shared by `plan` and `plan_many`."""
         if veg_dishes < 0:
             raise ValueError("veg_dishes must be non-negative.")
         if spicy_dishes < 0:
             raise ValueError("spicy_dishes must be non-negative.")
+        if engine not in SEARCH_ENGINES:
+            raise ValueError(
+                f"Unknown search engine: {engine}. Choose from {SEARCH_ENGINES}."
+            )
 
-        recipes = self._filter_by_time(self._recipes, max_total_time_per_dish)
-        if not recipes:
-            raise ValueError("No recipes fit the time constraints.")
-
-        meat_target = self._days
-
-        non_spicy_recipes = [r for r in recipes if not r.spicy]
-        spicy_recipes = [r for r in recipes if r.spicy]
-
-        meat_recipes = [r for r in non_spicy_recipes if r.has_meat]
-        fish_names = {
-            name for name, item in INGREDIENT_MEAT.items() if item.kind == MeatKind.FISH
-        }
-        fish_recipes = [
-            r for r in meat_recipes if any(ing in fish_names for ing in r.ingredients)
-        ]
-        veg_recipes = [r for r in non_spicy_recipes if not r.has_meat]
-
-        if not meat_recipes:
+    def _pool(
+        self, max_total_time_per_dish: int | None, stats: PlanStats | None = None
+    ) -> PlanPool:
+        """Return the cached candidate pool for a per-dish time limit.
+
+        Building a pool records its filter/partition times on `stats`.
+        """
+        pool = self._pools.get(max_total_time_per_dish)
+        if pool is None and self._source is not None:
+            start = time.perf_counter()
+            pool = self._source.plan_pool(max_total_time_per_dish)
+            if stats is not None:
+                stats.filter_s = time.perf_counter() - start
+            if not (pool.meat or pool.veg or pool.spicy):
+                raise ValueError("No recipes fit the time constraints.")
+            self._pools[max_total_time_per_dish] = pool
+        if pool is None:
+            if not self._recipes:
+                raise ValueError("No recipes available to plan.")
+            start = time.perf_counter()
+            recipes = self._filter_by_time(self._recipes, max_total_time_per_dish)
+            filtered = time.perf_counter()
+            if not recipes:
+                raise ValueError("No recipes fit the time constraints.")
+            pool = PlanPool(recipes)
+            if stats is not None:
+                stats.filter_s = filtered - start
+                stats.partition_s = time.perf_counter() - filtered
+            self._pools[max_total_time_per_dish] = pool
+        return pool
+
+    def _plan_from_pool(
+        self,
+        pool: PlanPool,
+        *,
+        max_total_time_per_dish: int | None,
+        max_weekly_time: int | None,
+        max_overlap: int,
+        veg_dishes: int,
+        spicy_dishes: int,
+        max_attempts: int,
+        engine: str,
+        local_search: LocalSearch | None = None,
+        stats: PlanStats | None = None,
+    ) -> PlanResult:
+        """Search the meat plan and add veg/spicy dishes from a prepared pool."""
+        if stats is None:
+            stats = PlanStats(engine=engine)
+        self.last_stats = stats
+        if not pool.meat:
             return None
 
-        best_result = self._find_best_meat_plan(
-            meat_recipes=meat_recipes,
-            fish_recipes=fish_recipes,
-            meat_target=meat_target,
-            max_weekly_time=max_weekly_time,
-            max_overlap=max_overlap,
-            max_attempts=max_attempts,
-        )
+        if self._workers > 1:
+            random_engine = partial(
+                self._find_parallel_meat_plan,
+                max_attempts=max_attempts,
+                max_total_time_per_dish=max_total_time_per_dish,
+            )
+        else:
+            random_engine = partial(self._find_best_meat_plan, max_attempts=max_attempts)
+        engines = {
+            "random": random_engine,
+            "exact": self._find_exact_meat_plan,
+            "vectorized": partial(
+                self._find_vectorized_meat_plan, max_attempts=max_attempts
+            ),
+        }
+        start = time.perf_counter()
+        bounds = _plan_bounds(pool, self._days)
+        reason = bounds.infeasible(max_weekly_time)
+        best_result = None
+        if reason is None:
+            best_result = engines[engine](
+                pool,
+                meat_target=self._days,
+                max_weekly_time=max_weekly_time,
+                max_overlap=max_overlap,
+                stats=stats,
+            )
+        searched = time.perf_counter()
+        stats.search_s = searched - start
+        stats.bound_time = bounds.computed_min_time
+        stats.bound_overlap = bounds.computed_min_overlap
+        if reason is not None:
+            raise ValueError(
+                f"Unable to build a weekly plan with given constraints: {reason}."
+            )
+        if local_search is not None:
+            from .local_search import improve_meat_plan
+
+            best_result = improve_meat_plan(
+                pool,
+                None if best_result is None else best_result[0],
+                self._random,
+                local_search,
+                meat_target=self._days,
+                max_weekly_time=max_weekly_time,
+                max_overlap=max_overlap,
+                stats=stats,
+            )
+            if (
+                best_result is not None
+                and max_weekly_time is not None
+                and best_result[1] > max_weekly_time
+            ):
+                best_result = None
+            improved = time.perf_counter()
+            stats.local_search_s = improved - searched
+            searched = improved
         if best_result is None:
             raise ValueError("Unable to build a weekly plan with given constraints.")
 
         best_meat, best_total_time, best_overlap = best_result
+        stats.fallback = best_overlap > max_overlap
 
         # Best effort to add configured non-spicy veg dishes
         veg_selection = (
-            self._sample_dishes(veg_recipes, veg_dishes, with_replacement=True)
-            if veg_dishes > 0 and veg_recipes
+            self._sample_dishes(pool.veg, veg_dishes, with_replacement=True, pool=pool)
+            if veg_dishes > 0 and pool.veg
             else []
         )
         spicy_selection = (
-            self._sample_dishes(spicy_recipes, spicy_dishes, with_replacement=True)
-            if spicy_dishes > 0 and spicy_recipes
+            self._sample_dishes(
+                pool.spicy, spicy_dishes, with_replacement=True, pool=pool
+            )
+            if spicy_dishes > 0 and pool.spicy
             else []
         )
-        if spicy_dishes > 0 and not spicy_recipes:
+        if spicy_dishes > 0 and not pool.spicy:
             logger.warning(
                 "No spicy recipes available; requested %s spicy dishes, returning best effort.",
                 spicy_dishes,
             )
 
-        result = PlanResult(
-            recipes=tuple(best_meat + veg_selection + spicy_selection),
+        recipes = tuple(pool.resolve(best_meat + veg_selection + spicy_selection))
+        stats.add_ons_s = time.perf_counter() - searched
+        return PlanResult(
+            recipes=recipes,
             total_time=best_total_time,
             ingredient_overlap=best_overlap,
+            stats=stats,
         )
-        return result
 
     def _find_best_meat_plan(
         self,
+        pool: PlanPool,
         *,
-        meat_recipes: list[Recipe],
-        fish_recipes: list[Recipe],
         meat_target: int,
         max_weekly_time: int | None,
         max_overlap: int,
         max_attempts: int,
+        stats: PlanStats | None = None,
     ) -> tuple[list[Recipe], int, int] | None:
         """Try multiple random samples and return the best meat-plan candidate."""
         best_meat: list[Recipe] | None = None
         best_total_time: int = 0
         best_overlap: int = 0
-
-        for _ in range(max_attempts):
+        meat_recipes = pool.meat
+        fish_recipes = pool.fish
+        attempts = rejected_fish = rejected_time = rejected_overlap = 0
+        bounds = _plan_bounds(pool, meat_target)
+        # Bounds are consulted once draws start failing: the time bound of
+        # the dishes next to a fish pick after the first time rejection
+        # (picks that can't fit are dropped before the rest is drawn),
+        # and after a few overlap
+        # rejections whether max_overlap is reachable at all. If it isn't,
+        # only the fastest plan matters and reaching the time bound ends
+        # the search.
+        fish_time_limit = None
+        overlap_bound_time = None
+
+        for attempts in range(1, max_attempts + 1):
             if fish_recipes:
-                fish_pick = self._sample_dishes(fish_recipes, 1)
+                fish_pick = self._sample_dishes(fish_recipes, 1, pool=pool)
                 if not fish_pick:
                     continue
-                remaining_meat = find_remaining_meat(meat_recipes, list(fish_pick))
+                if (
+                    fish_time_limit is not None
+                    and fish_pick[0].total_time > fish_time_limit
+                ):
+                    rejected_time += 1
+                    continue
+                remaining_meat = pool.remaining_meat(fish_pick[0].meat_mask)
                 if meat_target > 1 and len(remaining_meat) < meat_target - 1:
+                    rejected_fish += 1
                     continue
                 meat_selection = list(fish_pick)
                 if meat_target > 1:
-                    rest = self._sample_dishes(remaining_meat, meat_target - 1)
+                    rest = self._sample_dishes(
+                        remaining_meat, meat_target - 1, pool=pool
+                    )
                     if not rest:
                         continue
                     meat_selection.extend(rest)
                 self._random.shuffle(meat_selection)
             else:
-                meat_selection = self._sample_dishes(meat_recipes, meat_target)
+                meat_selection = self._sample_dishes(meat_recipes, meat_target, pool=pool)
             if not meat_selection:
                 continue
 
             total_time = sum(r.total_time for r in meat_selection)
             if max_weekly_time is not None and total_time > max_weekly_time:
+                rejected_time += 1
+                if fish_recipes and fish_time_limit is None:
+                    fish_time_limit = max_weekly_time - bounds.rest_time()
                 continue
 
             overlap = self._ingredient_meat_overlap(meat_selection)
             if overlap <= max_overlap:
-                return meat_selection, total_time, overlap
+                best_meat, best_total_time, best_overlap = (
+                    meat_selection, total_time, overlap
+                )
+                break
+            rejected_overlap += 1
+            if (
+                rejected_overlap == _OVERLAP_CHECK_AFTER
+                and bounds.min_overlap() > max_overlap
+            ):
+                overlap_bound_time = bounds.min_time()
             if best_meat is None or total_time < best_total_time:
                 best_meat = meat_selection
                 best_total_time = total_time
                 best_overlap = overlap
-
+            if best_total_time == overlap_bound_time:
+                break
+
+        if stats is not None:
+            stats.attempts += attempts
+            stats.rejected_fish += rejected_fish
+            stats.rejected_time += rejected_time
+            stats.rejected_overlap += rejected_overlap
         if best_meat is None:
             return None
         return best_meat, best_total_time, best_overlap
 
+    def _find_vectorized_meat_plan(
+        self,
+        pool: PlanPool,
+        *,
+        meat_target: int,
+        max_weekly_time: int | None,
+        max_overlap: int,
+        max_attempts: int,
+        stats: PlanStats | None = None,
+    ) -> tuple[list[Recipe], int, int] | None:
+        """Score random candidates in NumPy batches (see `vectorized.py`)."""
+        from .vectorized import find_vectorized_meat_plan
+
+        return find_vectorized_meat_plan(
+            pool,
+            self._random,
+            meat_target=meat_target,
+            max_weekly_time=max_weekly_time,
+            max_overlap=max_overlap,
+            max_attempts=max_attempts,
+            stats=stats,
+            weights=self._weights,
+            weight_key=self._weight_key,
+        )
+
+    def _find_parallel_meat_plan(
+        self,
+        pool: PlanPool,
+        *,
+        meat_target: int,
+        max_weekly_time: int | None,
+        max_overlap: int,
+        max_attempts: int,
+        max_total_time_per_dish: int | None,
+        stats: PlanStats | None = None,
+    ) -> tuple[list[Recipe], int, int] | None:
+        """Run the random engine across the worker pool (see `parallel.py`).
+
+        Workers plan from the full catalog; meat dishes missing from a
+        narrowed `pool` (e.g. the rolling no-repeat window) are sent along
+        so they skip them too.
+        """
+        base = self._pool(max_total_time_per_dish)
+        excluded: list[Recipe] = []
+        if pool is not base:
+            allowed = {id(recipe) for recipe in pool.meat}
+            excluded = [recipe for recipe in base.meat if id(recipe) not in allowed]
+        if self._parallel is None:
+            from .parallel import ParallelSearch
+
+            self._parallel = ParallelSearch(
+                self._recipes,
+                days=meat_target,
+                workers=self._workers,
+                weights=self._weights,
+            )
+        return self._parallel.search(
+            self._random,
+            max_attempts=max_attempts,
+            max_total_time_per_dish=max_total_time_per_dish,
+            max_weekly_time=max_weekly_time,
+            max_overlap=max_overlap,
+            excluded=excluded,
+            stats=stats,
+        )
+
+    def _find_exact_meat_plan(
+        self,
+        pool: PlanPool,
+        *,
+        meat_target: int,
+        max_weekly_time: int | None,
+        max_overlap: int,
+        stats: PlanStats | None = None,
+    ) -> tuple[list[Recipe], int, int] | None:
+        """Search exhaustively for a meat plan meeting the weekly constraints.
+
+        Mirrors the random engine: if fish recipes exist, one fish dish is
+        forced and the other dishes share no meat kind with it. When no plan
+        meets `max_overlap`, the fastest plan within `max_weekly_time` is
+        returned as the fallback; None means no plan fits the time budget.
+        It draws no candidates, so only `stats.fallback` applies.
+        """
+        if len(pool.meat) < meat_target:
+            return None
+
+        # One grouping (and one tie-breaking shuffle) of the meat dishes; the
+        # fish groups and the groups left next to each fish mask are
+        # filtered from it, the latter on first use and once per mask.
+        meat_groups = _group_recipes(pool.meat, self._random)
+        if pool.fish:
+            starts = [group for group in meat_groups if group.mask & _FISH_BIT]
+        else:
+            starts = [None]
+        remaining: dict[int, list[_RecipeGroup]] = {}
+
+        for limit in (max_overlap, None):
+            best: tuple[int, _RecipeGroup | None, list, list] | None = None
+            for fish_group in starts:
+                dishes = meat_target
+                budget = max_weekly_time
+                mask = 0
+                overlap = 0
+                groups = meat_groups
+                if fish_group is not None:
+                    dishes -= 1
+                    mask = fish_group.mask
+                    overlap = fish_group.count - _popcount(fish_group.mask)
+                    if budget is not None:
+                        budget -= fish_group.total_time
+                        if budget < 0:
+                            continue
+                    if limit is not None and overlap > limit:
+                        continue
+                    groups = remaining.get(mask)
+                    if groups is None:
+                        groups = remaining[mask] = [
+                            group for group in meat_groups if not group.mask & mask
+                        ]
+                picks = _search_groups(groups, dishes, budget, mask, overlap, limit)
+                if picks is None:
+                    continue
+                total_time = sum(groups[idx].total_time * taken for idx, taken in picks)
+                if fish_group is not None:
+                    total_time += fish_group.total_time
+                if limit is not None:
+                    best = (total_time, fish_group, groups, picks)
+                    break
+                if best is None or total_time < best[0]:
+                    best = (total_time, fish_group, groups, picks)
+            if best is not None:
+                break
+        else:
+            return None
+
+        total_time, fish_group, groups, picks = best
+        meat_selection: list[Recipe] = []
+        if fish_group is not None:
+            meat_selection.extend(self._sample_dishes(list(fish_group.recipes), 1))
+        for idx, taken in picks:
+            meat_selection.extend(
+                self._sample_dishes(list(groups[idx].recipes), taken)
+            )
+        self._random.shuffle(meat_selection)
+        return (
+            meat_selection,
+            total_time,
+            self._ingredient_meat_overlap(meat_selection),
+        )
+
     def _filter_by_time(
         self, recipes: list[Recipe], max_total_time_per_dish: int | None
     ) -> list[Recipe]:
@@ -209,25 +930,52 @@ class WeeklyPlanner:
         self,
         recipes: list[Recipe],
         num_dishes: int,
-        with_replacement=False
+        with_replacement=False,
+        pool: PlanPool | None = None,
     ) -> list[Recipe] | None:
-        """Sample dishes with or without replacement."""
-        if not with_replacement:
-            selection: list[Recipe] = self._random.sample(recipes, num_dishes)
+        """Sample dishes with or without replacement.
+
+        With weights, `recipes` should be a partition of `pool` (or one of
+        its `remaining_meat` lists) so its sampler is reused across calls.
+        """
+        if self._weights is not None:
+            sampler = self._sampler(recipes, pool)
+            draw = sampler.choices if with_replacement else sampler.sample
+            selection = [recipes[idx] for idx in draw(self._random, num_dishes)]
+        elif not with_replacement:
+            # Sample positions (the same draws as sampling `recipes`), so
+            # lazy partitions such as snapshot pools are never copied whole.
+            selection: list[Recipe] = [
+                recipes[idx]
+                for idx in self._random.sample(range(len(recipes)), num_dishes)
+            ]
         else:
             selection: list[Recipe] = self._random.choices(recipes, k=num_dishes)
         self._random.shuffle(selection)
         return selection
 
+    def _sampler(self, recipes: list[Recipe], pool: PlanPool | None) -> WeightedSampler:
+        """Return the weighted sampler of a recipe list, cached per pool
+        partition until the pool changes."""
+        get = self._weights.get
+        key = self._weight_key
+        if pool is None:
+            return WeightedSampler([get(key(recipe), 1.0) for recipe in recipes])
+        cached = self._samplers.get(pool)
+        if cached is None or cached[0] != pool.version:
+            cached = self._samplers[pool] = (pool.version, {})
+        entry = cached[1].get(id(recipes))
+        if entry is None or entry[0] is not recipes:
+            sampler = WeightedSampler([get(key(recipe), 1.0) for recipe in recipes])
+            entry = cached[1][id(recipes)] = (recipes, sampler)
+        return entry[1]
+
     @staticmethod
     def _ingredient_meat_overlap(recipes: Iterable[Recipe]) -> int:
         """Count repeated meat types across recipes."""
-        counts: dict[str, int] = {}
+        mask = 0
+        count = 0
         for recipe in recipes:
-            for ingredient in recipe.ingredients:
-                try:
-                    meat_type = INGREDIENT_MEAT.get(ingredient).kind
-                    counts[meat_type] = counts.get(meat_type, 0) + 1
-                except AttributeError:
-                    continue
-        return sum(count - 1 for count in counts.values() if count > 1)
+            mask |= recipe.meat_mask
+            count += recipe.meat_count
+        return count - _popcount(mask)
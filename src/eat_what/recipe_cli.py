@@ -3,12 +3,22 @@ from __future__ import annotations
 """Interactive CLI for adding recipes to the CSV store."""
 
 import argparse
+from contextlib import ExitStack
+from functools import partial
 from pathlib import Path
 
+from .catalog import VEG_KIND, append_ingredient
+from .ingredients import refresh_registry, registry
 from .ingredients_meat import INGREDIENT_MEAT, MeatIngredient, MeatKind
 from .ingredients_vegatable import INGREDIENT_VEGATABLE, VegatableIngredient
 from .selection import select_from
-from .storage import Recipe, default_recipes_path, load_recipes, save_recipes
+from .storage import (
+    Recipe,
+    append_recipe,
+    default_recipes_path,
+    is_sqlite_path,
+    load_recipe_names,
+)
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -17,7 +27,7 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--recipes",
         default=default_recipes_path(),
-        help="Path to recipes CSV.",
+        help="Path to recipes CSV or SQLite store (.db).",
     )
     return parser
 
@@ -70,21 +80,6 @@ def _prompt_bool(prompt: str) -> bool:
         print("Please enter y/n.")
 
 
-def _insert_into_dict(path: Path, dict_name: str, entry_line: str) -> None:
-    """Insert a new entry into a module-level dict in-place."""
-    text = path.read_text(encoding="utf-8")
-    marker = f"{dict_name} = {{"
-    start = text.find(marker)
-    if start == -1:
-        raise ValueError(f"Unable to find {dict_name} in {path}.")
-    end = text.find("\n}", start)
-    if end == -1:
-        raise ValueError(f"Unable to find end of {dict_name} in {path}.")
-
-    updated = text[:end] + entry_line + text[end:]
-    path.write_text(updated, encoding="utf-8")
-
-
 def _prompt_choice(prompt: str, options: list[str]) -> str:
     """Prompt for a choice from a fixed set by number."""
     print(prompt)
@@ -103,9 +98,9 @@ def _prompt_choice(prompt: str, options: list[str]) -> str:
 
 
 def _add_meat_ingredient() -> None:
-    """Interactively add a meat ingredient to the source list."""
+    """Interactively add a meat ingredient to the user catalog."""
     name = _prompt_non_empty("New meat ingredient (english): ")
-    if name in INGREDIENT_MEAT:
+    if name in registry():
         print("Ingredient already exists.")
         return
     cn = _prompt_non_empty("Chinese name: ")
@@ -116,31 +111,23 @@ def _add_meat_ingredient() -> None:
     )
     kind = MeatKind[kind_raw]
 
-    entry_line = f'    "{name}": MeatIngredient(MeatKind.{kind.name}, "{cn}"),\n'
-    _insert_into_dict(
-        Path(__file__).with_name("ingredients_meat.py"),
-        "INGREDIENT_MEAT",
-        entry_line,
-    )
+    path = append_ingredient(name, cn, kind.value)
     INGREDIENT_MEAT[name] = MeatIngredient(kind, cn)
-    print(f"Added meat ingredient: {cn} ({name})")
+    refresh_registry()
+    print(f"Added meat ingredient: {cn} ({name}) to {path}")
 
 
 def _add_veg_ingredient() -> None:
-    """Interactively add a veg ingredient to the source list."""
+    """Interactively add a veg ingredient to the user catalog."""
     name = _prompt_non_empty("New veg ingredient (english): ")
-    if name in INGREDIENT_VEGATABLE:
+    if name in registry():
         print("Ingredient already exists.")
         return
     cn = _prompt_non_empty("Chinese name: ")
-    entry_line = f'\n    "{name}": VegatableIngredient("{cn}"),\n'
-    _insert_into_dict(
-        Path(__file__).with_name("ingredients_vegatable.py"),
-        "INGREDIENT_VEGATABLE",
-        entry_line,
-    )
+    path = append_ingredient(name, cn, VEG_KIND)
     INGREDIENT_VEGATABLE[name] = VegatableIngredient(cn)
-    print(f"Added veg ingredient: {cn} ({name})")
+    refresh_registry()
+    print(f"Added veg ingredient: {cn} ({name}) to {path}")
 
 
 def _prompt_ingredients() -> list[str]:
@@ -158,20 +145,18 @@ def _prompt_ingredients() -> list[str]:
         else:
             print("Invalid choice. Use 'm', 'v', or Enter.")
 
-    meat_cn = {name: item.cn for name, item in INGREDIENT_MEAT.items()}
-    veg_cn = {name: item.cn for name, item in INGREDIENT_VEGATABLE.items()}
-
+    ingredients = registry()
     selected = []
     selected.extend(
         select_from(
-            meat_cn,
+            ingredients.meat_cn,
             "Select meat ingredients:",
             finish_on_trailing_space=True,
         )
     )
     selected.extend(
         select_from(
-            veg_cn,
+            ingredients.veg_cn,
             "Select veg ingredients:",
             finish_on_trailing_space=True,
         )
@@ -186,36 +171,49 @@ def main() -> int:
     args = parser.parse_args()
 
     recipes_path = Path(args.recipes)
-    recipes = load_recipes(recipes_path)
-    existing_names = {recipe.name for recipe in recipes}
-
-    name = _prompt_unique_name(existing_names)
-    ingredients = _prompt_ingredients()
-    if not ingredients:
-        print("No ingredients provided. Aborting.")
-        return 1
-    prep_time = _prompt_int("Prep time (minutes): ")
-    cook_time = _prompt_int("Cook time (minutes): ")
-    if "辣" in name:
-        spicy = True
+    stack = ExitStack()
+    if is_sqlite_path(recipes_path):
+        from .sqlite_store import SqliteRecipeStore
+
+        store = stack.enter_context(SqliteRecipeStore(recipes_path))
+        existing_names = store.recipe_names()
+        add_recipe = store.add_recipe
     else:
-        spicy = _prompt_bool("Is this dish spicy? (y/N): ")
-
-    has_meat = any(ingredient in INGREDIENT_MEAT for ingredient in ingredients)
-    recipe = Recipe(
-        name=name,
-        ingredients=tuple(ingredients),
-        prep_time=prep_time,
-        cook_time=cook_time,
-        has_meat=has_meat,
-        spicy=spicy,
-    )
+        existing_names = load_recipe_names(recipes_path)
+        add_recipe = partial(append_recipe, recipes_path)
+
+    with stack:
+        name = _prompt_unique_name(existing_names)
+        ingredients = _prompt_ingredients()
+        if not ingredients:
+            print("No ingredients provided. Aborting.")
+            return 1
+        prep_time = _prompt_int("Prep time (minutes): ")
+        cook_time = _prompt_int("Cook time (minutes): ")
+        if "辣" in name:
+            spicy = True
+        else:
+            spicy = _prompt_bool("Is this dish spicy? (y/N): ")
+
+        meat_cn = registry().meat_cn
+        has_meat = any(ingredient in meat_cn for ingredient in ingredients)
+        recipe = Recipe(
+            name=name,
+            ingredients=tuple(ingredients),
+            prep_time=prep_time,
+            cook_time=cook_time,
+            has_meat=has_meat,
+            spicy=spicy,
+        )
 
-    recipes.append(recipe)
-    save_recipes(recipes_path, recipes)
+        try:
+            add_recipe(recipe)
+        except ValueError as exc:
+            print(exc)
+            return 1
 
-    print(f"Added recipe: {name}")
-    return 0
+        print(f"Added recipe: {name}")
+        return 0
 
 
 if __name__ == "__main__":
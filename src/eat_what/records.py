@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+"""Plain-data views of plans for machine-readable output.
+
+`plan_record` turns a `PlanResult` into JSON-ready dicts (plan totals, the
+recipes with their fields, and the aggregated shopping list);
+`write_plans` streams records as one JSON array (`json`) or one object per
+line (`ndjson`, flushed after every plan) for `eat-what --format`.
+"""
+
+import json
+from typing import Iterable, Mapping, TextIO
+
+from .planner import PlanResult
+from .shopping import Quantity, ShoppingItem, ShoppingList
+from .storage import Recipe
+
+RECORD_FORMATS = ("json", "ndjson")
+
+
+def recipe_record(recipe: Recipe) -> dict:
+    """Return the fields of one planned dish."""
+    return {
+        "name": recipe.name,
+        "ingredients": list(recipe.ingredients),
+        "prep_time": recipe.prep_time,
+        "cook_time": recipe.cook_time,
+        "total_time": recipe.total_time,
+        "has_meat": recipe.has_meat,
+        "spicy": recipe.spicy,
+    }
+
+
+def shopping_records(items: Iterable[ShoppingItem]) -> list[dict]:
+    """Return shopping-list lines as plain data."""
+    return [
+        {
+            "ingredient": item.ingredient,
+            "cn": item.cn,
+            "kind": item.kind,
+            "count": item.count,
+            "quantity": item.quantity,
+            "unit": item.unit,
+        }
+        for item in items
+    ]
+
+
+def plan_record(
+    result: PlanResult,
+    *,
+    index: int | None = None,
+    portions: Mapping[str, Quantity] | None = None,
+    pantry: Mapping[str, Quantity] | None = None,
+) -> dict:
+    """Return a plan with its dishes and shopping list as plain data."""
+    record: dict = {} if index is None else {"index": index}
+    record["total_time"] = result.total_time
+    record["ingredient_overlap"] = result.ingredient_overlap
+    record["recipes"] = [recipe_record(recipe) for recipe in result.recipes]
+    shopping = ShoppingList.from_plans([result], portions=portions, pantry=pantry)
+    record["shopping_list"] = shopping_records(shopping.items())
+    return record
+
+
+def write_plans(
+    results: Iterable[PlanResult],
+    stream: TextIO,
+    fmt: str,
+    *,
+    portions: Mapping[str, Quantity] | None = None,
+    pantry: Mapping[str, Quantity] | None = None,
+    combined: ShoppingList | None = None,
+) -> int:
+    """Write plans as records in `fmt` and return how many were written.
+
+    With `combined`, every plan is also added to that list, and a last
+    record `{"plans": N, "shopping_list": [...]}` holds the merged list.
+    """
+    if fmt not in RECORD_FORMATS:
+        raise ValueError(
+            f"Unknown record format: {fmt}. Choose from {RECORD_FORMATS}."
+        )
+    written = 0
+    lines = 0
+    if fmt == "json":
+        stream.write("[")
+
+    def emit(record: dict) -> None:
+        nonlocal lines
+        line = json.dumps(record, ensure_ascii=False)
+        if fmt == "json":
+            stream.write(f"{',' if lines else ''}\n{line}")
+        else:
+            stream.write(f"{line}\n")
+            stream.flush()
+        lines += 1
+
+    for written, result in enumerate(results, start=1):
+        if combined is not None:
+            combined.add_plan(result)
+        emit(plan_record(result, index=written, portions=portions, pantry=pantry))
+    if combined is not None:
+        emit({"plans": written, "shopping_list": shopping_records(combined.items())})
+    if fmt == "json":
+        stream.write("\n]\n")
+    stream.flush()
+    return written
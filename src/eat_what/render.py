@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+"""Buffered output sink for the CLIs.
+
+`Renderer` collects lines in memory and hands them to the stream in a single
+`write` per flush instead of one `print()` per line. It flushes when asked,
+on context exit, and whenever the buffer grows past a threshold: the first
+chunk is kept small so long menus start showing right away, later chunks
+use `flush_at` characters. With
+`color=False`, `paint` leaves text uncolored so the output can be piped into
+files and other tools; by default color follows whether the stream is a
+terminal.
+"""
+
+import sys
+from typing import Sequence, TextIO
+
+from .text_format import color_code, iter_columns
+
+COLOR_RESET = "\x1b[0m"
+
+
+class Renderer:
+    """Line buffer that writes to a text stream in large chunks."""
+    def __init__(
+        self,
+        stream: TextIO | None = None,
+        *,
+        color: bool | None = None,
+        flush_at: int = 1 << 16,
+        first_flush_at: int = 1 << 12,
+    ) -> None:
+        self._stream = sys.stdout if stream is None else stream
+        if color is None:
+            isatty = getattr(self._stream, "isatty", None)
+            color = bool(isatty and isatty())
+        self.color = color
+        self._flush_at = flush_at
+        self._threshold = first_flush_at
+        self._lines: list[str] = []
+        self._size = 0
+
+    def __enter__(self) -> Renderer:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.flush()
+
+    def paint(self, text: str, color: str) -> str:
+        """Wrap text in an ANSI color, unless color is off."""
+        return color_code(text, color, COLOR_RESET) if self.color else text
+
+    def line(self, text: str = "") -> None:
+        """Queue one line of output."""
+        self._lines.append(text)
+        self._size += len(text) + 1
+        if self._size >= self._threshold:
+            self.flush()
+
+    def columns(self, items: Sequence[str], per_line: int) -> None:
+        """Queue items as rows of equal-width columns."""
+        for row in iter_columns(items, per_line):
+            self.line(row)
+
+    def flush(self) -> None:
+        """Write queued lines in one call and flush the stream."""
+        if self._lines:
+            self._lines.append("")
+            self._stream.write("\n".join(self._lines))
+            self._lines.clear()
+            self._size = 0
+            self._threshold = self._flush_at
+        self._stream.flush()
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+"""Multi-week planning with a no-repeat window.
+
+`RollingPlanner` plans one week at a time from a mutable copy of the
+planner's candidate pool. Dishes used in the last `no_repeat_weeks` weeks
+are taken out of the pool and put back once they leave the window; both
+steps touch only the dishes that changed, using swap-removal lists keyed by
+each dish's position in the pool, instead of re-filtering the catalog every
+week. Any source's pool works, including snapshot pools whose rows are
+rebuilt on every read. Meat-kind usage per week is kept as
+rotation history.
+"""
+
+from collections import Counter, deque
+import logging
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+from .ingredients import registry
+from .ingredients_meat import MEAT_KIND_BITS, MeatKind
+from .planner import PlanPool, PlanResult, WeeklyPlanner
+from .storage import Recipe
+
+if TYPE_CHECKING:
+    from .local_search import LocalSearch
+
+logger = logging.getLogger(__name__)
+
+_FISH_BIT = MEAT_KIND_BITS[MeatKind.FISH]
+
+
+class _RecipeList(list):
+    """Pool partition with O(1) removal by moving the last item into the gap.
+
+    Items are keyed by their position in the rolling pool's handle table, so
+    removal never relies on a source handing out the same object twice.
+    """
+    def __init__(self, handles: list, keys: Iterable[int] = ()) -> None:
+        self._handles = handles
+        self._keys = list(keys)
+        super().__init__(handles[key] for key in self._keys)
+        self._positions = {key: idx for idx, key in enumerate(self._keys)}
+
+    def add(self, key: int) -> None:
+        if key not in self._positions:
+            self._positions[key] = len(self)
+            self._keys.append(key)
+            self.append(self._handles[key])
+
+    def discard(self, key: int) -> None:
+        idx = self._positions.pop(key, None)
+        if idx is None:
+            return
+        last = self.pop()
+        last_key = self._keys.pop()
+        if last_key != key:
+            self[idx] = last
+            self._keys[idx] = last_key
+            self._positions[last_key] = idx
+
+
+class _HandleTable:
+    """The base pool's items, read once and numbered.
+
+    Snapshot partitions build a new row object on every read, so the table
+    keeps the handles it read; their position is the key every rolling
+    structure uses, and `resolve` still goes through the base pool.
+    """
+    def __init__(self, base: PlanPool) -> None:
+        self.base = base
+        self.handles: list = []
+        self.roles: list[tuple[str, ...]] = []
+        # Only for translating handles read from this table back to keys.
+        self.keys: dict[int, int] = {}
+        for handle in base.spicy:
+            self._add(handle, ("spicy",))
+        for handle in base.meat:
+            fish = handle.meat_mask & _FISH_BIT
+            self._add(handle, ("meat", "fish") if fish else ("meat",))
+        for handle in base.veg:
+            self._add(handle, ("veg",))
+
+    def _add(self, handle: object, roles: tuple[str, ...]) -> None:
+        if id(handle) not in self.keys:
+            self.keys[id(handle)] = len(self.handles)
+            self.handles.append(handle)
+            self.roles.append(roles)
+
+
+class _RollingPool(PlanPool):
+    """Mutable copy of a `PlanPool` supporting incremental add/remove by key.
+
+    `resolve` delegates to the base pool and records the keys of the
+    resolved items in `last_keys`.
+    """
+    def __init__(self, table: _HandleTable) -> None:
+        self._table = table
+        handles = table.handles
+        for role in ("spicy", "meat", "fish", "veg"):
+            keys = (key for key, roles in enumerate(table.roles) if role in roles)
+            setattr(self, role, _RecipeList(handles, keys))
+        self._remaining: dict[int, _RecipeList] = {}
+        self.last_keys: list[int] = []
+
+    def remaining_meat(self, mask: int) -> list[Recipe]:
+        remaining = self._remaining.get(mask)
+        if remaining is None:
+            handles = self._table.handles
+            remaining = _RecipeList(
+                handles,
+                (key for key in self.meat._keys if not handles[key].meat_mask & mask),
+            )
+            self._remaining[mask] = remaining
+        return remaining
+
+    def resolve(self, items: list) -> list[Recipe]:
+        keys = self._table.keys
+        self.last_keys = [keys[id(item)] for item in items]
+        return self._table.base.resolve(items)
+
+    def discard(self, key: int) -> None:
+        """Take a handle out of every partition it belongs to."""
+        self.version += 1
+        for role in self._table.roles[key]:
+            getattr(self, role).discard(key)
+        for remaining in self._remaining.values():
+            remaining.discard(key)
+
+    def restore(self, key: int) -> None:
+        """Put a handle back into its partitions."""
+        self.version += 1
+        roles = self._table.roles[key]
+        for role in roles:
+            getattr(self, role).add(key)
+        if "meat" in roles:
+            meat_mask = self._table.handles[key].meat_mask
+            for mask, remaining in self._remaining.items():
+                if not meat_mask & mask:
+                    remaining.add(key)
+
+
+class RollingPlanner:
+    """Plan consecutive weeks without repeating recent dishes."""
+    def __init__(
+        self,
+        planner: WeeklyPlanner,
+        *,
+        no_repeat_weeks: int = 1,
+        max_total_time_per_dish: int | None = None,
+    ) -> None:
+        if no_repeat_weeks < 0:
+            raise ValueError("no_repeat_weeks must be non-negative.")
+        self._planner = planner
+        self._no_repeat_weeks = no_repeat_weeks
+        self._max_total_time_per_dish = max_total_time_per_dish
+        self._table = _HandleTable(planner._pool(max_total_time_per_dish))
+        self._pool = _RollingPool(self._table)
+        self._full_pool: _RollingPool | None = None
+        self._window: deque[tuple[tuple[int, ...], tuple[str, ...]]] = deque()
+        self._in_window: Counter = Counter()
+        self.kind_history: list[Counter] = []
+
+    @property
+    def recent_dishes(self) -> list[tuple[str, ...]]:
+        """Dish names of the weeks currently blocked, oldest first."""
+        return [names for _, names in self._window]
+
+    @property
+    def kind_counts(self) -> Counter:
+        """Meat-kind usage summed over all planned weeks."""
+        total: Counter = Counter()
+        for week in self.kind_history:
+            total.update(week)
+        return total
+
+    def next_week(
+        self,
+        *,
+        max_weekly_time: int | None = None,
+        max_overlap: int = 6,
+        veg_dishes: int = 3,
+        spicy_dishes: int = 0,
+        max_attempts: int = 200,
+        engine: str = "random",
+        local_search: LocalSearch | None = None,
+    ) -> PlanResult:
+        """Plan the next week and advance the no-repeat window."""
+        self._planner._validate(veg_dishes, spicy_dishes, engine)
+        options = dict(
+            max_total_time_per_dish=self._max_total_time_per_dish,
+            max_weekly_time=max_weekly_time,
+            max_overlap=max_overlap,
+            veg_dishes=veg_dishes,
+            spicy_dishes=spicy_dishes,
+            max_attempts=max_attempts,
+            engine=engine,
+            local_search=local_search,
+        )
+        pool = self._pool
+        try:
+            result = self._planner._plan_from_pool(pool, **options)
+        except ValueError:
+            result = None
+        if result is None:
+            logger.warning(
+                "Not enough unused dishes for a %s-week no-repeat window; "
+                "planning this week from the full pool.",
+                self._no_repeat_weeks,
+            )
+            if self._full_pool is None:
+                self._full_pool = _RollingPool(self._table)
+            pool = self._full_pool
+            result = self._planner._plan_from_pool(pool, **options)
+            if result is None:
+                raise ValueError("No meat recipes available to plan.")
+
+        self._advance(pool.last_keys, result.recipes)
+        return result
+
+    def _advance(self, keys: list[int], recipes: tuple[Recipe, ...]) -> None:
+        """Block this week's dishes and release the week leaving the window."""
+        week = {}
+        for key, recipe in zip(keys, recipes):
+            week.setdefault(key, recipe)
+        kinds = registry().kinds
+        self.kind_history.append(
+            Counter(
+                kind for recipe in week.values() for kind in kinds(recipe.meat_mask)
+            )
+        )
+        if self._no_repeat_weeks == 0:
+            return
+
+        self._window.append(
+            (tuple(week), tuple(recipe.name for recipe in week.values()))
+        )
+        for key in week:
+            if self._in_window[key] == 0:
+                self._pool.discard(key)
+            self._in_window[key] += 1
+
+        if len(self._window) > self._no_repeat_weeks:
+            for key in self._window.popleft()[0]:
+                self._in_window[key] -= 1
+                if self._in_window[key] == 0:
+                    del self._in_window[key]
+                    self._pool.restore(key)
+
+
+def plan_weeks(
+    planner: WeeklyPlanner,
+    weeks: int,
+    *,
+    no_repeat_weeks: int = 1,
+    max_total_time_per_dish: int | None = None,
+    **plan_options: object,
+) -> Iterator[PlanResult]:
+    """Yield `weeks` consecutive plans with a rolling no-repeat window."""
+    if weeks < 0:
+        raise ValueError("weeks must be non-negative.")
+    rolling = RollingPlanner(
+        planner,
+        no_repeat_weeks=no_repeat_weeks,
+        max_total_time_per_dish=max_total_time_per_dish,
+    )
+    for _ in range(weeks):
+        yield rolling.next_week(**plan_options)
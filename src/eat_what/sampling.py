@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+"""Weighted sampling over fixed weight vectors.
+
+`WeightedSampler` draws indices of a weight vector:
+
+- with replacement from a Vose alias table: O(n) to build, O(1) per draw;
+- without replacement from a Fenwick (binary indexed) tree of the weights:
+  O(n) to build, O(log n) per draw. Each draw takes its weight out of the
+  tree for the rest of the call; the touched nodes are restored exactly
+  afterwards, so one tree serves every call.
+
+Both tables are built on first use. `load_ratings` reads per-recipe weights
+from a `name,rating` CSV.
+"""
+
+import csv
+import logging
+import math
+from pathlib import Path
+import random
+from typing import Mapping, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+def check_weights(weights: Mapping[str, float]) -> dict[str, float]:
+    """Return `weights` as a dict of floats; raise ValueError unless all are
+    positive and finite."""
+    checked = {}
+    for name, weight in weights.items():
+        weight = float(weight)
+        if not (weight > 0 and math.isfinite(weight)):
+            raise ValueError(f"Recipe weight must be positive: {name} = {weight}")
+        checked[name] = weight
+    return checked
+
+
+def load_ratings(path: str | Path) -> dict[str, float]:
+    """Read recipe ratings (`name,rating`) to use as sampling weights.
+
+    Ratings are relative: a dish rated 4 is drawn twice as often as one
+    rated 2; recipes not listed weigh 1. Invalid or non-positive rows are
+    logged and skipped; a repeated name keeps its last rating.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Ratings file not found: {path}")
+    ratings: dict[str, float] = {}
+    with path.open(newline="", encoding="utf-8-sig") as handle:
+        reader = csv.DictReader(handle, restval="")
+        missing = {"name", "rating"} - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"Missing columns in {path}: {sorted(missing)}")
+        for idx, row in enumerate(reader):
+            name = str(row["name"]).strip()
+            try:
+                if not name:
+                    raise ValueError("Missing recipe name")
+                rating = float(str(row["rating"]).strip())
+                check_weights({name: rating})
+            except ValueError as exc:
+                logger.warning("Invalid rating row at index %s: %s", idx, exc)
+                continue
+            ratings[name] = rating
+    return ratings
+
+
+class WeightedSampler:
+    """Draws indices 0..n-1 with probability proportional to their weights."""
+    __slots__ = ("_weights", "_total", "_prob", "_alias", "_tree", "_step")
+
+    def __init__(self, weights: Sequence[float]) -> None:
+        self._weights = [float(weight) for weight in weights]
+        self._total = math.fsum(self._weights)
+        self._prob: list[float] | None = None
+        self._alias: list[int] | None = None
+        self._tree: list[float] | None = None
+        self._step = 0
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    def _build_alias(self) -> None:
+        n = len(self._weights)
+        scaled = [weight * n / self._total for weight in self._weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [idx for idx, p in enumerate(scaled) if p < 1.0]
+        large = [idx for idx, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large[-1]
+            prob[less] = scaled[less]
+            alias[less] = more
+            scaled[more] += scaled[less] - 1.0
+            if scaled[more] < 1.0:
+                small.append(large.pop())
+        # Leftovers are 1 up to rounding.
+        self._prob = prob
+        self._alias = alias
+
+    def _build_tree(self) -> None:
+        n = len(self._weights)
+        tree = [0.0] + self._weights
+        for idx in range(1, n + 1):
+            parent = idx + (idx & -idx)
+            if parent <= n:
+                tree[parent] += tree[idx]
+        self._tree = tree
+        self._step = 1 << (n.bit_length() - 1) if n else 0
+
+    def choices(self, rng: random.Random, k: int) -> list[int]:
+        """Draw `k` indices with replacement, O(1) each."""
+        if self._prob is None:
+            self._build_alias()
+        prob = self._prob
+        alias = self._alias
+        n = len(prob)
+        rand = rng.random
+        drawn = []
+        for _ in range(k):
+            # One uniform picks the column (integer part) and the coin
+            # (fractional part).
+            u = rand() * n
+            idx = int(u)
+            if idx == n:
+                idx -= 1
+            drawn.append(idx if u - idx < prob[idx] else alias[idx])
+        return drawn
+
+    def sample(self, rng: random.Random, k: int) -> list[int]:
+        """Draw `k` distinct indices, O(log n) each."""
+        n = len(self._weights)
+        if not 0 <= k <= n:
+            raise ValueError("Sample larger than population or is negative")
+        if self._tree is None:
+            self._build_tree()
+        tree = self._tree
+        weights = self._weights
+        rand = rng.random
+        total = self._total
+        drawn: list[int] = []
+        saved: list[tuple[int, float]] = []
+        for _ in range(k):
+            while True:
+                target = rand() * total
+                pos = 0
+                step = self._step
+                while step:
+                    nxt = pos + step
+                    if nxt <= n and tree[nxt] <= target:
+                        pos = nxt
+                        target -= tree[nxt]
+                    step >>= 1
+                # Rounding can land past the end or on a drawn index.
+                if pos < n and pos not in drawn:
+                    break
+            drawn.append(pos)
+            weight = weights[pos]
+            total -= weight
+            node = pos + 1
+            while node <= n:
+                saved.append((node, tree[node]))
+                tree[node] -= weight
+                node += node & -node
+        for node, value in reversed(saved):
+            tree[node] = value
+        return drawn
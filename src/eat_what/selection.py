@@ -2,34 +2,36 @@ from __future__ import annotations
 
 """Shared interactive selection utilities for CLI flows."""
 
-from .text_format import color_code, display_width, ljust_display
+from typing import Mapping
+
+from .render import Renderer
 
 COLOR_GREEN = "\x1b[32m"
-COLOR_RESET = "\x1b[0m"
 
 
 def select_from(
-    items: dict[str, str],
+    items: Mapping[str, str],
     title: str,
     *,
     finish_on_trailing_space: bool = True,
+    color: bool | None = None,
 ) -> list[str]:
-    """Display numbered options and return selected english keys."""
+    """Display numbered options and return selected english keys.
+
+    `color=None` colors the numbers only when stdout is a terminal.
+    """
     names = sorted(items)
     if not names:
         return []
 
-    print(title)
-    per_line = 3
-    formatted = [
-        f"{color_code(str(idx), COLOR_GREEN, COLOR_RESET)}. {items[name]} ({name})"
-        for idx, name in enumerate(names, start=1)
-    ]
-    col_width = max(display_width(text) for text in formatted)
-    for start in range(0, len(formatted), per_line):
-        row = formatted[start : start + per_line]
-        padded = [ljust_display(text, col_width) for text in row]
-        print("   ".join(padded))
+    # Buffered, and flushed before the first prompt.
+    with Renderer(color=color) as out:
+        out.line(title)
+        formatted = [
+            f"{out.paint(str(idx), COLOR_GREEN)}. {items[name]} ({name})"
+            for idx, name in enumerate(names, start=1)
+        ]
+        out.columns(formatted, per_line=3)
 
     chosen: list[str] = []
     chosen_set: set[str] = set()
@@ -0,0 +1,474 @@
+from __future__ import annotations
+
+"""Resident planner server (`eat-what serve`).
+
+Keeps the recipe catalog, its ingredient index and a planner with warm
+pools in memory, and answers JSON requests over localhost HTTP or a Unix
+socket (plain HTTP/1.1 with keep-alive, stdlib `asyncio` only):
+
+- `GET /plan`: plans as `records.plan_record` dicts; query parameters
+  mirror the `eat-what` options and defaults (`max_time`, `max_weekly_time`,
+  `max_overlap`, `veg_dishes`, `spicy_dishes`, `max_attempts`, `engine`,
+  `local_search`, `local_search_time`, `count`, `distinct`);
+- `GET /pick?ingredient=tofu,egg&missing=1`: recipes covered by the
+  ingredients, plus near misses;
+- `GET /shopping?recipe=红烧肉,麻婆豆腐`: totals and shopping list for dishes;
+- `GET /stats`: request counts and latency percentiles per endpoint.
+
+Requests are handled in the loop's default thread pool, so a slow plan
+(e.g. `engine=exact`) does not stall other connections; planning itself is
+serialized because a planner's RNG and samplers are not thread-safe.
+Unexpected errors are logged and answered with a 500 JSON body. The
+recipes file is polled for size/mtime changes and reloaded in a worker
+thread; requests keep using the previous catalog until the new one is
+swapped in.
+"""
+
+import argparse
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from http import HTTPStatus
+import json
+import logging
+from pathlib import Path
+import signal
+import sys
+import threading
+import time
+from typing import Callable
+from urllib.parse import parse_qs, urlsplit
+
+from .ingredient_index import IngredientIndex
+from .local_search import LocalSearch
+from .planner import DEFAULT_MAX_WEEKLY_TIME, PlanResult, WeeklyPlanner
+from .records import plan_record, recipe_record
+from .storage import Recipe, default_recipes_path, load_recipes
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 90, 99)
+# Latency samples kept per endpoint for the percentile report.
+LATENCY_WINDOW = 10_000
+_MAX_HEADER_LINES = 100
+
+
+class RequestError(Exception):
+    """Client error mapped to an HTTP status."""
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass(frozen=True)
+class _Catalog:
+    """Everything derived from one version of the recipes file."""
+    recipes: tuple[Recipe, ...]
+    planner: WeeklyPlanner
+    index: IngredientIndex
+    by_name: dict[str, Recipe]
+
+
+def percentiles(samples: list[float], points=PERCENTILES) -> dict[str, float]:
+    """Return nearest-rank percentiles of `samples` keyed "p50", "p90", ..."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return {
+        f"p{point}": ordered[min(last, max(0, -(-point * len(ordered) // 100) - 1))]
+        for point in points
+    }
+
+
+def _int_param(query: dict[str, list[str]], name: str, default: int | None):
+    values = query.get(name)
+    if not values:
+        return default
+    try:
+        return int(values[-1])
+    except ValueError:
+        raise RequestError(
+            HTTPStatus.BAD_REQUEST, f"{name} must be an integer."
+        ) from None
+
+
+def _float_param(query: dict[str, list[str]], name: str, default: float | None):
+    values = query.get(name)
+    if not values:
+        return default
+    try:
+        return float(values[-1])
+    except ValueError:
+        raise RequestError(
+            HTTPStatus.BAD_REQUEST, f"{name} must be a number."
+        ) from None
+
+
+def _list_param(query: dict[str, list[str]], name: str) -> list[str]:
+    """Return a repeated and/or comma-separated parameter as a list."""
+    return [
+        item.strip()
+        for value in query.get(name, ())
+        for item in value.split(",")
+        if item.strip()
+    ]
+
+
+class PlannerService:
+    """Warm catalog state and the request handlers, independent of transport."""
+    def __init__(self, recipes_path: str | Path, *, seed: int | None = None) -> None:
+        self.path = Path(recipes_path)
+        self.reloads = 0
+        self._seed = seed
+        self._stamp: tuple[int, int] | None = None
+        self._catalog: _Catalog | None = None
+        self._latencies: dict[str, deque] = {}
+        self._counts: dict[str, int] = {}
+        # Handlers run in worker threads: one plan at a time, and counters
+        # updated under a lock.
+        self._plan_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._routes: dict[str, Callable[[dict], dict]] = {
+            "/plan": self.plan,
+            "/pick": self.pick,
+            "/shopping": self.shopping,
+            "/stats": lambda query: self.stats(),
+        }
+        if not self.reload():
+            raise FileNotFoundError(f"Recipes file not found: {self.path}")
+
+    def _file_stamp(self) -> tuple[int, int] | None:
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload(self) -> bool:
+        """Reload the catalog if the file changed; return True if swapped."""
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return False
+        try:
+            recipes = load_recipes(self.path)
+        except (OSError, ValueError) as exc:
+            logger.warning("Keeping previous catalog; reload failed: %s", exc)
+            return False
+        planner = WeeklyPlanner(recipes, seed=self._seed)
+        if recipes:
+            planner._pool(None)  # warm the default partitions
+        self._catalog = _Catalog(
+            recipes=tuple(recipes),
+            planner=planner,
+            index=IngredientIndex(recipes),
+            by_name={recipe.name: recipe for recipe in recipes},
+        )
+        self._stamp = stamp
+        self.reloads += 1
+        logger.info("Loaded %d recipes from %s", len(recipes), self.path)
+        return True
+
+    def handle(self, method: str, target: str) -> tuple[HTTPStatus, dict]:
+        """Route one request and return (status, JSON body)."""
+        url = urlsplit(target)
+        route = self._routes.get(url.path)
+        if route is None:
+            return HTTPStatus.NOT_FOUND, {"error": f"Unknown path: {url.path}"}
+        if method != "GET":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Only GET is supported."}
+        start = time.perf_counter()
+        try:
+            status, body = HTTPStatus.OK, route(parse_qs(url.query))
+        except RequestError as exc:
+            status, body = exc.status, {"error": str(exc)}
+        except ValueError as exc:
+            status, body = HTTPStatus.UNPROCESSABLE_ENTITY, {"error": str(exc)}
+        except Exception as exc:
+            logger.exception("Error handling %s %s", method, target)
+            status, body = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(exc)}
+        self._record(url.path, time.perf_counter() - start)
+        return status, body
+
+    def _record(self, endpoint: str, seconds: float) -> None:
+        with self._stats_lock:
+            samples = self._latencies.get(endpoint)
+            if samples is None:
+                samples = self._latencies[endpoint] = deque(maxlen=LATENCY_WINDOW)
+            samples.append(seconds)
+            self._counts[endpoint] = self._counts.get(endpoint, 0) + 1
+
+    def plan(self, query: dict[str, list[str]]) -> dict:
+        """Plan `count` weeks with the `eat-what` options from the query."""
+        catalog = self._catalog
+        count = _int_param(query, "count", 1)
+        if count < 1:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "count must be positive.")
+        engine = query.get("engine", ["random"])[-1]
+        moves = _int_param(query, "local_search", 0)
+        time_limit = _float_param(query, "local_search_time", None)
+        try:
+            local_search = (
+                LocalSearch(moves=moves, time_limit_s=time_limit)
+                if moves > 0
+                else None
+            )
+        except ValueError as exc:
+            raise RequestError(HTTPStatus.BAD_REQUEST, str(exc)) from None
+        options = dict(
+            max_total_time_per_dish=_int_param(query, "max_time", None),
+            max_weekly_time=_int_param(
+                query, "max_weekly_time", DEFAULT_MAX_WEEKLY_TIME
+            ),
+            max_overlap=_int_param(query, "max_overlap", 6),
+            veg_dishes=_int_param(query, "veg_dishes", 3),
+            spicy_dishes=_int_param(query, "spicy_dishes", 0),
+            max_attempts=_int_param(query, "max_attempts", 200),
+            engine=engine,
+            local_search=local_search,
+        )
+        distinct = query.get("distinct", ["0"])[-1].lower() in {"1", "true", "yes"}
+        with self._plan_lock:
+            plans = catalog.planner.plan_many(count, distinct=distinct, **options)
+            return {
+                "plans": [
+                    plan_record(result, index=idx)
+                    for idx, result in enumerate(plans, start=1)
+                ]
+            }
+
+    def pick(self, query: dict[str, list[str]]) -> dict:
+        """List recipes covered by the ingredients, and near misses."""
+        catalog = self._catalog
+        ingredients = _list_param(query, "ingredient")
+        if not ingredients:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "ingredient is required.")
+        missing = _int_param(query, "missing", 0)
+        body: dict = {
+            "covered": [
+                recipe_record(recipe) for recipe in catalog.index.covered_by(ingredients)
+            ]
+        }
+        if missing > 0:
+            body["near"] = [
+                {"recipe": recipe_record(recipe), "missing": list(absent)}
+                for recipe, absent in catalog.index.missing_at_most(
+                    ingredients, missing
+                )
+                if absent
+            ]
+        return body
+
+    def shopping(self, query: dict[str, list[str]]) -> dict:
+        """Return totals and the shopping list for the named dishes."""
+        catalog = self._catalog
+        names = _list_param(query, "recipe")
+        if not names:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "recipe is required.")
+        unknown = [name for name in names if name not in catalog.by_name]
+        if unknown:
+            raise RequestError(
+                HTTPStatus.NOT_FOUND, f"Unknown recipe(s): {', '.join(unknown)}"
+            )
+        recipes = tuple(catalog.by_name[name] for name in names)
+        result = PlanResult(
+            recipes=recipes,
+            total_time=sum(recipe.total_time for recipe in recipes),
+            ingredient_overlap=WeeklyPlanner._ingredient_meat_overlap(recipes),
+        )
+        return plan_record(result)
+
+    def stats(self) -> dict:
+        """Return catalog info, request counts and latency percentiles (ms)."""
+        with self._stats_lock:
+            endpoints = {
+                endpoint: (self._counts[endpoint], list(samples))
+                for endpoint, samples in self._latencies.items()
+            }
+        return {
+            "recipes": len(self._catalog.recipes),
+            "reloads": self.reloads,
+            "endpoints": {
+                endpoint: {
+                    "requests": count,
+                    **{
+                        name: round(value * 1000, 3)
+                        for name, value in percentiles(samples).items()
+                    },
+                }
+                for endpoint, (count, samples) in endpoints.items()
+            },
+        }
+
+
+async def _read_request(reader: asyncio.StreamReader) -> tuple[str, str, bool] | None:
+    """Read one request head; return (method, target, keep_alive) or None at EOF."""
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    try:
+        method, target, version = request_line.decode("latin-1").split()
+    except ValueError:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Malformed request line.") from None
+    keep_alive = version == "HTTP/1.1"
+    length = 0
+    for _ in range(_MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == "connection":
+            keep_alive = value == "keep-alive" or (keep_alive and value != "close")
+        elif name == "content-length":
+            if not value.isdigit():
+                raise RequestError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length.")
+            length = int(value)
+    else:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Too many headers.")
+    if length:
+        await reader.readexactly(length)  # bodies are ignored
+    return method, target, keep_alive
+
+
+def _response(status: HTTPStatus, body: dict, keep_alive: bool) -> bytes:
+    payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + payload
+
+
+async def _serve_connection(
+    service: PlannerService,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+) -> None:
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except RequestError as exc:
+                writer.write(_response(exc.status, {"error": str(exc)}, False))
+                break
+            if request is None:
+                break
+            method, target, keep_alive = request
+            status, body = await loop.run_in_executor(
+                None, service.handle, method, target
+            )
+            writer.write(_response(status, body, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _watch(service: PlannerService, interval: float) -> None:
+    """Poll the recipes file and reload it off the event loop."""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        await loop.run_in_executor(None, service.reload)
+
+
+async def serve(
+    service: PlannerService,
+    *,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    unix_path: str | None = None,
+    reload_interval: float = 1.0,
+    ready: Callable[[asyncio.AbstractServer], None] | None = None,
+) -> None:
+    """Serve `service` until cancelled or sent SIGINT/SIGTERM."""
+    def handler(reader, writer):
+        return _serve_connection(service, reader, writer)
+
+    if unix_path is not None:
+        server = await asyncio.start_unix_server(handler, path=unix_path)
+    else:
+        server = await asyncio.start_server(handler, host=host, port=port)
+    loop = asyncio.get_running_loop()
+    serving = asyncio.ensure_future(server.serve_forever())
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, serving.cancel)
+        except (NotImplementedError, RuntimeError):
+            pass  # no signal support (e.g. Windows or a non-main thread)
+    watcher = asyncio.ensure_future(_watch(service, reload_interval))
+    if ready is not None:
+        ready(server)
+    try:
+        async with server:
+            await serving
+    except asyncio.CancelledError:
+        pass
+    finally:
+        watcher.cancel()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(signum)
+        if unix_path is not None:
+            Path(unix_path).unlink(missing_ok=True)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for `eat-what serve`."""
+    parser = argparse.ArgumentParser(
+        prog="eat-what serve",
+        description="Serve plans, picks and shopping lists from a warm catalog.",
+    )
+    parser.add_argument(
+        "--recipes",
+        default=default_recipes_path(),
+        help="Path to recipes CSV or SQLite store (.db).",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="HTTP bind address.")
+    parser.add_argument("--port", type=int, default=8765, help="HTTP port.")
+    parser.add_argument(
+        "--unix", help="Listen on this Unix socket path instead of HTTP/TCP."
+    )
+    parser.add_argument(
+        "--reload-interval",
+        type=float,
+        default=1.0,
+        help="Seconds between checks of the recipes file for changes.",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Random seed.")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point for `eat-what serve`."""
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    service = PlannerService(args.recipes, seed=args.seed)
+
+    def ready(server: asyncio.AbstractServer) -> None:
+        where = args.unix or "http://{}:{}".format(
+            *server.sockets[0].getsockname()[:2]
+        )
+        logger.info("Serving %d recipes on %s", len(service._catalog.recipes), where)
+
+    try:
+        asyncio.run(
+            serve(
+                service,
+                host=args.host,
+                port=args.port,
+                unix_path=args.unix,
+                reload_interval=args.reload_interval,
+                ready=ready,
+            )
+        )
+    finally:
+        json.dump(service.stats(), sys.stderr, ensure_ascii=False, indent=2)
+        sys.stderr.write("\n")
+    return 0
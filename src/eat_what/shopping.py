@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+"""Shopping lists aggregated over plans, with quantities and a pantry.
+
+Every dish needs one portion of each ingredient it lists. A portions table
+gives the amount and unit of one portion per ingredient (default: 1 份).
+`ShoppingList` first counts dishes across any number of plans, then
+expands each distinct recipe's ingredient vector once, so merging many
+plans (one per household, say) costs a pass over their dishes plus one
+pass per distinct recipe. A pantry inventory is subtracted from the
+totals, matching units only.
+
+Portions and pantry files share one CSV format: `ingredient,quantity,unit`
+(unit optional, defaults to 份; repeated rows with the same unit add up).
+"""
+
+from collections import Counter
+import csv
+from functools import lru_cache
+import logging
+from pathlib import Path
+from typing import Iterable, Mapping, NamedTuple
+
+from .ingredients import registry
+from .planner import PlanResult
+from .storage import Recipe
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_UNIT = "份"
+
+
+class Quantity(NamedTuple):
+    """An amount in a unit."""
+    amount: float
+    unit: str = DEFAULT_UNIT
+
+
+ONE_PORTION = Quantity(1)
+
+
+class ShoppingItem(NamedTuple):
+    """One line of a shopping list.
+
+    `count` is the number of dish portions that use the ingredient; `quantity`
+    is what is left to buy, in `unit`, after the pantry.
+    """
+    ingredient: str
+    cn: str | None
+    kind: str | None
+    count: int
+    quantity: float
+    unit: str
+
+
+# Bounded so a long-running server that reloads catalogs does not keep
+# every ingredient tuple it has ever seen.
+@lru_cache(maxsize=4096)
+def _ingredient_vector(ingredients: tuple[str, ...]) -> tuple[tuple[str, int], ...]:
+    """Return (ingredient, portions per dish) pairs, in first-listed order."""
+    return tuple(Counter(ingredients).items())
+
+
+def load_quantities(path: str | Path) -> dict[str, Quantity]:
+    """Read a portions or pantry CSV (`ingredient,quantity[,unit]`).
+
+    Invalid rows are logged and skipped; an ingredient listed in two units
+    keeps the first.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Quantities file not found: {path}")
+    quantities: dict[str, Quantity] = {}
+    with path.open(newline="", encoding="utf-8-sig") as handle:
+        reader = csv.DictReader(handle, restval="")
+        missing = {"ingredient", "quantity"} - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"Missing columns in {path}: {sorted(missing)}")
+        for idx, row in enumerate(reader):
+            name = str(row["ingredient"]).strip()
+            unit = str(row.get("unit") or "").strip() or DEFAULT_UNIT
+            try:
+                if not name:
+                    raise ValueError("Missing ingredient name")
+                amount = float(str(row["quantity"]).strip())
+            except ValueError as exc:
+                logger.warning("Invalid quantity row at index %s: %s", idx, exc)
+                continue
+            known = quantities.get(name)
+            if known is None:
+                quantities[name] = Quantity(amount, unit)
+            elif known.unit == unit:
+                quantities[name] = Quantity(known.amount + amount, unit)
+            else:
+                logger.warning(
+                    "Ignoring %s %s of %s: already listed in %s.",
+                    amount, unit, name, known.unit,
+                )
+    return quantities
+
+
+class ShoppingList:
+    """Ingredient totals over any number of dishes and plans."""
+    def __init__(self, portions: Mapping[str, Quantity] | None = None) -> None:
+        self._portions = {} if portions is None else portions
+        # Dishes are counted by object identity (recipes hash slowly);
+        # `_recipes` keeps each counted recipe alive.
+        self._dishes: Counter = Counter()
+        self._recipes: dict[int, Recipe] = {}
+        self._pantry: dict[str, Quantity] = {}
+
+    @classmethod
+    def from_plans(
+        cls,
+        results: Iterable[PlanResult],
+        *,
+        portions: Mapping[str, Quantity] | None = None,
+        pantry: Mapping[str, Quantity] | None = None,
+    ) -> ShoppingList:
+        """Build the merged list of several plans."""
+        shopping = cls(portions)
+        for result in results:
+            shopping.add_plan(result)
+        if pantry:
+            shopping.subtract(pantry)
+        return shopping
+
+    def add(self, recipes: Iterable[Recipe], times: int = 1) -> None:
+        """Count every dish of `recipes`, `times` times (e.g. households)."""
+        recipes = list(recipes)
+        self._recipes.update(zip(map(id, recipes), recipes))
+        if times == 1:
+            self._dishes.update(map(id, recipes))
+        else:
+            for recipe in recipes:
+                self._dishes[id(recipe)] += times
+
+    def add_plan(self, result: PlanResult, times: int = 1) -> None:
+        """Add all dishes of a plan."""
+        self.add(result.recipes, times)
+
+    def subtract(self, pantry: Mapping[str, Quantity]) -> None:
+        """Take pantry stock off the totals (adds up over calls)."""
+        for name, stock in pantry.items():
+            known = self._pantry.get(name)
+            if known is not None and known.unit == stock.unit:
+                stock = Quantity(known.amount + stock.amount, stock.unit)
+            self._pantry[name] = stock
+
+    def counts(self) -> Counter:
+        """Return ingredient -> portions needed, before the pantry."""
+        counts: Counter = Counter()
+        recipes = self._recipes
+        for key, dishes in self._dishes.items():
+            ingredients = recipes[key].ingredients
+            if dishes == 1:
+                counts.update(ingredients)
+                continue
+            for ingredient, portions in _ingredient_vector(ingredients):
+                counts[ingredient] += portions * dishes
+        return counts
+
+    def items(self) -> list[ShoppingItem]:
+        """Return what to buy, most needed first (ties in first-seen order).
+
+        Ingredients the pantry fully covers are left out; stock in a unit
+        other than the portion's unit is ignored with a warning.
+        """
+        table = registry().labels
+        unknown = (None, None)
+        portions = self._portions
+        pantry = self._pantry
+        items = []
+        append = items.append
+        for ingredient, count in self.counts().most_common():
+            cn, kind = table.get(ingredient, unknown)
+            if not (portions or pantry):
+                append(ShoppingItem(ingredient, cn, kind, count, count, DEFAULT_UNIT))
+                continue
+            portion = portions.get(ingredient, ONE_PORTION)
+            quantity = count * portion.amount
+            stock = pantry.get(ingredient)
+            if stock is not None:
+                if stock.unit == portion.unit:
+                    quantity -= stock.amount
+                else:
+                    logger.warning(
+                        "Pantry lists %s in %s, recipes need %s; not subtracted.",
+                        ingredient, stock.unit, portion.unit,
+                    )
+            if quantity > 0:
+                append(ShoppingItem(ingredient, cn, kind, count, quantity, portion.unit))
+        return items
@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+"""Memory-mapped columnar recipe snapshots.
+
+A snapshot is a binary image of a recipe catalog that processes can `mmap`
+and share instead of each parsing the CSV and holding its own `Recipe`
+objects. After a fixed header, every column is a native-endian array
+aligned to 8 bytes:
+
+- `prep_time`, `cook_time`, `total_time` (int32) and `flags` (uint8:
+  has_meat, spicy, fish);
+- `meat_mask` / `meat_count` (uint32), the derived fields `Recipe` keeps;
+- `ingredient_offsets` (uint32, n + 1) into `ingredient_ids` (uint32), which
+  index the ingredient name table;
+- UTF-8 blobs with offset arrays for recipe and ingredient names.
+
+Columns are exposed as `memoryview`s over the mapping (no copies). The
+planner samples straight from them through `plan_pool`, whose partitions
+are `array`s of row indices (4 bytes per recipe): a `SnapshotRow` is built
+only for a row that is read, e.g. a drawn dish, and full `Recipe`s only on
+request.
+"""
+
+from array import array
+import mmap
+import os
+from pathlib import Path
+import struct
+import sys
+import tempfile
+from typing import Iterable, Iterator, Sequence
+
+from .ingredients_meat import MEAT_KIND_BITS, MeatKind
+from .planner import PlanPool
+from .storage import Recipe
+
+SNAPSHOT_MAGIC = b"EWSNAP\x00\x00"
+SNAPSHOT_FORMAT = 1
+# magic, byte-order marker, format, recipes, ingredients, ingredient ids,
+# recipe-name bytes, ingredient-name bytes.
+_HEADER = struct.Struct("=8sIIIIIII")
+_BYTE_ORDER_MARK = 0x01020304
+
+FLAG_HAS_MEAT = 1
+FLAG_SPICY = 2
+FLAG_FISH = 4
+
+_FISH_BIT = MEAT_KIND_BITS[MeatKind.FISH]
+
+
+def _layout(
+    count: int, ingredients: int, ids: int, name_bytes: int, ingredient_bytes: int
+) -> list[tuple[str, str, int]]:
+    """Return (column, typecode, length) for every section, in file order."""
+    return [
+        ("prep_time", "i", count),
+        ("cook_time", "i", count),
+        ("total_time", "i", count),
+        ("meat_mask", "I", count),
+        ("meat_count", "I", count),
+        ("flags", "B", count),
+        ("ingredient_offsets", "I", count + 1),
+        ("ingredient_ids", "I", ids),
+        ("name_offsets", "I", count + 1),
+        ("names", "B", name_bytes),
+        ("ingredient_name_offsets", "I", ingredients + 1),
+        ("ingredient_names", "B", ingredient_bytes),
+    ]
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _string_table(values: Iterable[str]) -> tuple[array, bytes]:
+    """Return (offsets, blob) for a list of strings."""
+    offsets = array("I", [0])
+    chunks: list[bytes] = []
+    end = 0
+    for value in values:
+        data = value.encode("utf-8")
+        chunks.append(data)
+        end += len(data)
+        offsets.append(end)
+    return offsets, b"".join(chunks)
+
+
+def write_snapshot(path: str | Path, recipes: Iterable[Recipe]) -> Path:
+    """Write `recipes` (e.g. from `load_recipes`) as a snapshot file.
+
+    The file is written to a temporary name and renamed into place, so
+    readers never map a partial snapshot.
+    """
+    path = Path(path)
+    columns = {
+        name: array(code)
+        for name, code, _ in _layout(0, 0, 0, 0, 0)
+        if name not in {"names", "ingredient_names"}
+    }
+    columns["ingredient_offsets"].append(0)
+    ingredient_ids: dict[str, int] = {}
+    names: list[str] = []
+    for recipe in recipes:
+        names.append(recipe.name)
+        columns["prep_time"].append(recipe.prep_time)
+        columns["cook_time"].append(recipe.cook_time)
+        columns["total_time"].append(recipe.total_time)
+        columns["meat_mask"].append(recipe.meat_mask)
+        columns["meat_count"].append(recipe.meat_count)
+        columns["flags"].append(
+            (FLAG_HAS_MEAT if recipe.has_meat else 0)
+            | (FLAG_SPICY if recipe.spicy else 0)
+            | (FLAG_FISH if recipe.meat_mask & _FISH_BIT else 0)
+        )
+        ids = columns["ingredient_ids"]
+        for ingredient in recipe.ingredients:
+            ids.append(ingredient_ids.setdefault(ingredient, len(ingredient_ids)))
+        columns["ingredient_offsets"].append(len(ids))
+    columns["name_offsets"], name_blob = _string_table(names)
+    columns["ingredient_name_offsets"], ingredient_blob = _string_table(
+        ingredient_ids
+    )
+
+    counts = (
+        len(names),
+        len(ingredient_ids),
+        len(columns["ingredient_ids"]),
+        len(name_blob),
+        len(ingredient_blob),
+    )
+    blobs = {"names": name_blob, "ingredient_names": ingredient_blob}
+    fd, tmp_name = tempfile.mkstemp(prefix=path.name, suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(
+                _HEADER.pack(SNAPSHOT_MAGIC, _BYTE_ORDER_MARK, SNAPSHOT_FORMAT, *counts)
+            )
+            offset = _HEADER.size
+            for name, _, _ in _layout(*counts):
+                handle.write(b"\x00" * (_align(offset) - offset))
+                data = blobs[name] if name in blobs else columns[name].tobytes()
+                handle.write(data)
+                offset = _align(offset) + len(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+    return path
+
+
+class SnapshotRow:
+    """What the random engine reads from a recipe, by snapshot row index."""
+    __slots__ = ("index", "total_time", "meat_mask", "meat_count")
+
+    def __init__(
+        self, index: int, total_time: int, meat_mask: int, meat_count: int
+    ) -> None:
+        self.index = index
+        self.total_time = total_time
+        self.meat_mask = meat_mask
+        self.meat_count = meat_count
+
+
+class _RowIndices(Sequence):
+    """One pool partition: snapshot row indices, read as `SnapshotRow`s."""
+    __slots__ = ("_snapshot", "indices")
+
+    def __init__(self, snapshot: RecipeSnapshot, indices: array) -> None:
+        self._snapshot = snapshot
+        self.indices = indices
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return [self._snapshot.row(index) for index in self.indices[pos]]
+        return self._snapshot.row(self.indices[pos])
+
+    def __iter__(self) -> Iterator[SnapshotRow]:
+        row = self._snapshot.row
+        return (row(index) for index in self.indices)
+
+
+class _SnapshotPlanPool(PlanPool):
+    """`PlanPool` whose partitions are row-index arrays over snapshot columns."""
+    def __init__(
+        self,
+        snapshot: RecipeSnapshot,
+        max_total_time_per_dish: int | None,
+    ) -> None:
+        spicy, meat, fish, veg = (array("I") for _ in range(4))
+        limit = max_total_time_per_dish
+        for index, (total_time, flags) in enumerate(
+            zip(snapshot.total_time, snapshot.flags)
+        ):
+            if limit is not None and total_time > limit:
+                continue
+            if flags & FLAG_SPICY:
+                spicy.append(index)
+            elif not flags & FLAG_HAS_MEAT:
+                veg.append(index)
+            else:
+                meat.append(index)
+                if flags & FLAG_FISH:
+                    fish.append(index)
+        self.spicy = _RowIndices(snapshot, spicy)
+        self.meat = _RowIndices(snapshot, meat)
+        self.fish = _RowIndices(snapshot, fish)
+        self.veg = _RowIndices(snapshot, veg)
+        self._remaining = {}
+        self._snapshot = snapshot
+
+    def remaining_meat(self, mask: int) -> _RowIndices:
+        remaining = self._remaining.get(mask)
+        if remaining is None:
+            masks = self._snapshot.meat_mask
+            remaining = _RowIndices(
+                self._snapshot,
+                array("I", (i for i in self.meat.indices if not masks[i] & mask)),
+            )
+            self._remaining[mask] = remaining
+        return remaining
+
+    def resolve(self, items: list[SnapshotRow]) -> list[Recipe]:
+        return [self._snapshot.recipe(row.index) for row in items]
+
+
+class RecipeSnapshot:
+    """Read-only, memory-mapped view of a snapshot file.
+
+    Column attributes (`prep_time`, `cook_time`, `total_time`, `flags`,
+    `meat_mask`, `meat_count`) are `memoryview`s indexed by row.
+    """
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._views = self._map_columns()
+        except BaseException:
+            self._mmap.close()
+            raise
+        self._ingredient_table: list[str] | None = None
+
+    def _map_columns(self) -> dict[str, memoryview]:
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError(f"Not a recipe snapshot: {self.path}")
+        magic, mark, version, *counts = _HEADER.unpack_from(self._mmap)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"Not a recipe snapshot: {self.path}")
+        if mark != _BYTE_ORDER_MARK or version != SNAPSHOT_FORMAT:
+            raise ValueError(
+                f"Snapshot {self.path} was written for another platform or "
+                f"format; rebuild it with write_snapshot."
+            )
+        layout = _layout(*counts)
+        offset = _HEADER.size
+        for _, code, length in layout:
+            offset = _align(offset) + length * struct.calcsize(code)
+        if offset > len(self._mmap):
+            raise ValueError(f"Truncated recipe snapshot: {self.path}")
+
+        views: dict[str, memoryview] = {}
+        offset = _HEADER.size
+        with memoryview(self._mmap) as buffer:
+            for name, code, length in layout:
+                start = _align(offset)
+                offset = start + length * struct.calcsize(code)
+                views[name] = buffer[start:offset].cast(code)
+                setattr(self, name, views[name])
+        self._count = counts[0]
+        return views
+
+    def __enter__(self) -> RecipeSnapshot:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the column views and unmap the file."""
+        for view in self._views.values():
+            view.release()
+        self._views.clear()
+        self._mmap.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _string(self, offsets: memoryview, blob: memoryview, index: int) -> str:
+        return bytes(blob[offsets[index] : offsets[index + 1]]).decode("utf-8")
+
+    def name(self, index: int) -> str:
+        """Return the name of recipe `index`."""
+        return self._string(self.name_offsets, self.names, index)
+
+    def ingredients(self, index: int) -> tuple[str, ...]:
+        """Return the ingredients of recipe `index`."""
+        if self._ingredient_table is None:
+            offsets = self.ingredient_name_offsets
+            self._ingredient_table = [
+                sys.intern(self._string(offsets, self.ingredient_names, idx))
+                for idx in range(len(offsets) - 1)
+            ]
+        table = self._ingredient_table
+        offsets = self.ingredient_offsets
+        ids = self.ingredient_ids[offsets[index] : offsets[index + 1]]
+        return tuple(table[idx] for idx in ids)
+
+    def row(self, index: int) -> SnapshotRow:
+        """Return the planner fields of recipe `index`."""
+        return SnapshotRow(
+            index, self.total_time[index], self.meat_mask[index], self.meat_count[index]
+        )
+
+    def recipe(self, index: int) -> Recipe:
+        """Build the `Recipe` for row `index`."""
+        flags = self.flags[index]
+        return Recipe._from_cache_row(
+            (
+                self.name(index),
+                self.ingredients(index),
+                self.prep_time[index],
+                self.cook_time[index],
+                bool(flags & FLAG_HAS_MEAT),
+                bool(flags & FLAG_SPICY),
+                self.meat_mask[index],
+                self.meat_count[index],
+            )
+        )
+
+    def recipes(self) -> list[Recipe]:
+        """Build every recipe, in snapshot order."""
+        return [self.recipe(index) for index in range(self._count)]
+
+    def plan_pool(self, max_total_time_per_dish: int | None) -> PlanPool:
+        """Return a planner pool over the snapshot's rows (see
+        `WeeklyPlanner.from_source`)."""
+        return _SnapshotPlanPool(self, max_total_time_per_dish)
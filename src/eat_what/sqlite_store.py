@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+"""SQLite-backed recipe store.
+
+An alternative to `recipes.csv` for large catalogs. Recipes and ingredients
+live in normalized tables with indexes on the columns the planner and the
+picker filter by, so those filters run as SQL queries instead of Python
+scans over the whole catalog:
+
+- `plan_pool` builds the planner's meat/fish/veg/spicy partitions per time
+  limit, and remaining-meat lists with a meat-kind bitmask test;
+- `covered_by` / `missing_at_most` answer ingredient lookups through the
+  ingredient index (same interface as `IngredientIndex`).
+
+`meat_mask` and `ingredients.meat_kind` are derived from the ingredient
+catalogs, so the store records the registry's `meat_digest` they were
+computed with and recomputes both (in SQL, from the ingredient join) when
+the catalogs change, like the CSV cache does.
+
+`import_csv` / `export_csv` convert to and from the CSV format.
+"""
+
+from pathlib import Path
+import sqlite3
+import sys
+from typing import Iterable
+
+from .ingredients import registry
+from .ingredients_meat import MEAT_KIND_BITS, MeatKind
+from .planner import PlanPool
+from .storage import Recipe, iter_recipes, save_recipes
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipes (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    prep_time INTEGER NOT NULL,
+    cook_time INTEGER NOT NULL,
+    total_time INTEGER NOT NULL,
+    has_meat INTEGER NOT NULL,
+    spicy INTEGER NOT NULL,
+    meat_mask INTEGER NOT NULL,
+    ingredient_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ingredients (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    meat_kind TEXT
+);
+CREATE TABLE IF NOT EXISTS recipe_ingredients (
+    recipe_id INTEGER NOT NULL REFERENCES recipes(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    ingredient_id INTEGER NOT NULL REFERENCES ingredients(id),
+    PRIMARY KEY (recipe_id, position)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_recipes_role
+    ON recipes(spicy, has_meat, total_time);
+CREATE INDEX IF NOT EXISTS idx_recipes_total_time ON recipes(total_time);
+CREATE INDEX IF NOT EXISTS idx_recipes_ingredient_count
+    ON recipes(ingredient_count);
+CREATE INDEX IF NOT EXISTS idx_ingredients_meat_kind ON ingredients(meat_kind);
+CREATE INDEX IF NOT EXISTS idx_recipe_ingredients_ingredient
+    ON recipe_ingredients(ingredient_id, recipe_id);
+"""
+
+
+class _SqlitePlanPool(PlanPool):
+    """Plan pool whose partitions come from indexed queries."""
+    def __init__(self, store: SqliteRecipeStore, max_total_time: int | None) -> None:
+        self._store = store
+        self._time_clause = "" if max_total_time is None else " AND total_time <= ?"
+        self._time_params: tuple = () if max_total_time is None else (max_total_time,)
+        fish_bit = MEAT_KIND_BITS[MeatKind.FISH]
+        self.spicy = self._query("spicy = 1")
+        self.meat = self._query("spicy = 0 AND has_meat = 1")
+        self.fish = self._query(f"spicy = 0 AND has_meat = 1 AND meat_mask & {fish_bit}")
+        self.veg = self._query("spicy = 0 AND has_meat = 0")
+        self._remaining = {}
+
+    def _query(self, where: str, params: tuple = ()) -> list[Recipe]:
+        return self._store._select(where + self._time_clause, params + self._time_params)
+
+    def remaining_meat(self, mask: int) -> list[Recipe]:
+        remaining = self._remaining.get(mask)
+        if remaining is None:
+            remaining = self._query(
+                "spicy = 0 AND has_meat = 1 AND meat_mask & ? = 0", (mask,)
+            )
+            self._remaining[mask] = remaining
+        return remaining
+
+
+class SqliteRecipeStore:
+    """Recipe catalog stored in a SQLite database file."""
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.executescript(_SCHEMA)
+        # One Recipe object per row, so partitions share identities.
+        self._loaded: dict[int, Recipe] = {}
+        self._sync_meat_kinds()
+
+    def __enter__(self) -> SqliteRecipeStore:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM recipes").fetchone()[0]
+
+    def _sync_meat_kinds(self) -> None:
+        """Recompute the meat-kind columns if the catalogs changed since."""
+        table = registry()
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'meat_digest'"
+        ).fetchone()
+        if row is not None and row[0] == table.meat_digest:
+            return
+        kinds = []
+        for (name,) in self._conn.execute("SELECT name FROM ingredients").fetchall():
+            info = table.get(name)
+            kinds.append((info.kind if info is not None and info.is_meat else None, name))
+        bits = " ".join(
+            f"WHEN '{kind.value}' THEN {bit}" for kind, bit in MEAT_KIND_BITS.items()
+        )
+        with self._conn:
+            self._conn.executemany(
+                "UPDATE ingredients SET meat_kind = ? WHERE name = ?", kinds
+            )
+            # Kind bits are distinct powers of two, so SUM(DISTINCT) is an OR.
+            self._conn.execute(
+                "UPDATE recipes SET meat_mask = (SELECT COALESCE(SUM(DISTINCT"
+                f" CASE i.meat_kind {bits} END), 0) FROM recipe_ingredients ri"
+                " JOIN ingredients i ON i.id = ri.ingredient_id"
+                " WHERE ri.recipe_id = recipes.id)"
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('meat_digest', ?)",
+                (table.meat_digest,),
+            )
+        self._loaded.clear()
+
+    def _ingredient_id(self, name: str) -> int:
+        """Return the id of an ingredient, inserting it if needed."""
+        row = self._conn.execute(
+            "SELECT id FROM ingredients WHERE name = ?", (name,)
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        info = registry().get(name)
+        cursor = self._conn.execute(
+            "INSERT INTO ingredients (name, meat_kind) VALUES (?, ?)",
+            (name, info.kind if info is not None and info.is_meat else None),
+        )
+        return cursor.lastrowid
+
+    def _insert(self, recipe: Recipe, *, skip_duplicate: bool = False) -> bool:
+        """Insert one recipe inside the current transaction.
+
+        Returns False if `skip_duplicate` is set and the name already exists.
+        """
+        verb = "INSERT OR IGNORE" if skip_duplicate else "INSERT"
+        cursor = self._conn.execute(
+            f"{verb} INTO recipes (name, prep_time, cook_time, total_time, has_meat,"
+            " spicy, meat_mask, ingredient_count) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                recipe.name,
+                recipe.prep_time,
+                recipe.cook_time,
+                recipe.total_time,
+                int(recipe.has_meat),
+                int(recipe.spicy),
+                recipe.meat_mask,
+                len(set(recipe.ingredients)),
+            ),
+        )
+        if cursor.rowcount == 0:
+            return False
+        self._conn.executemany(
+            "INSERT INTO recipe_ingredients (recipe_id, position, ingredient_id)"
+            " VALUES (?, ?, ?)",
+            [
+                (cursor.lastrowid, position, self._ingredient_id(name))
+                for position, name in enumerate(recipe.ingredients)
+            ],
+        )
+        return True
+
+    def add_recipe(self, recipe: Recipe) -> None:
+        """Add a recipe; raises ValueError if the name already exists."""
+        self._sync_meat_kinds()
+        try:
+            with self._conn:
+                self._insert(recipe)
+        except sqlite3.IntegrityError as exc:
+            raise ValueError(f"Recipe name already exists: {recipe.name}") from exc
+
+    def add_recipes(self, recipes: Iterable[Recipe]) -> int:
+        """Add recipes in one transaction, skipping duplicate names."""
+        self._sync_meat_kinds()
+        with self._conn:
+            return sum(self._insert(recipe, skip_duplicate=True) for recipe in recipes)
+
+    def recipe_names(self) -> set[str]:
+        """Return all recipe names."""
+        return {row[0] for row in self._conn.execute("SELECT name FROM recipes")}
+
+    def _select_rows(
+        self, where: str = "1", params: tuple = ()
+    ) -> list[tuple[int, Recipe]]:
+        """Return (row id, recipe) pairs matching a WHERE clause, by id."""
+        ingredients: dict[int, list[str]] = {}
+        names: dict[str, str] = {}
+        for recipe_id, name in self._conn.execute(
+            "SELECT ri.recipe_id, i.name FROM recipe_ingredients ri"
+            " JOIN ingredients i ON i.id = ri.ingredient_id"
+            f" WHERE ri.recipe_id IN (SELECT id FROM recipes WHERE {where})"
+            " ORDER BY ri.recipe_id, ri.position",
+            params,
+        ):
+            ingredients.setdefault(recipe_id, []).append(
+                names.setdefault(name, sys.intern(name))
+            )
+
+        rows: list[tuple[int, Recipe]] = []
+        for recipe_id, name, prep_time, cook_time, has_meat, spicy in self._conn.execute(
+            "SELECT id, name, prep_time, cook_time, has_meat, spicy FROM recipes"
+            f" WHERE {where} ORDER BY id",
+            params,
+        ):
+            recipe = self._loaded.get(recipe_id)
+            if recipe is None:
+                recipe = Recipe(
+                    name=name,
+                    ingredients=tuple(ingredients.get(recipe_id, ())),
+                    prep_time=prep_time,
+                    cook_time=cook_time,
+                    has_meat=bool(has_meat),
+                    spicy=bool(spicy),
+                )
+                self._loaded[recipe_id] = recipe
+            rows.append((recipe_id, recipe))
+        return rows
+
+    def _select(self, where: str = "1", params: tuple = ()) -> list[Recipe]:
+        """Return recipes matching a WHERE clause on the recipes table."""
+        return [recipe for _, recipe in self._select_rows(where, params)]
+
+    def recipes(self) -> list[Recipe]:
+        """Return every recipe in insertion order."""
+        return self._select()
+
+    def plan_pool(self, max_total_time_per_dish: int | None) -> PlanPool:
+        """Return planner partitions for a per-dish time limit, via SQL."""
+        self._sync_meat_kinds()
+        return _SqlitePlanPool(self, max_total_time_per_dish)
+
+    def missing_at_most(
+        self, ingredients: Iterable[str], max_missing: int
+    ) -> list[tuple[Recipe, tuple[str, ...]]]:
+        """Return (recipe, missing ingredients) pairs, fewest missing first.
+
+        Same contract as `IngredientIndex.missing_at_most`.
+        """
+        if max_missing < 0:
+            raise ValueError("max_missing must be non-negative.")
+        selected = sorted(set(ingredients))
+        marks = ",".join("?" * len(selected)) or "NULL"
+        candidates = (
+            "SELECT r.id AS recipe_id,"
+            " r.ingredient_count - COUNT(DISTINCT ri.ingredient_id) AS missing"
+            " FROM recipe_ingredients ri JOIN recipes r ON r.id = ri.recipe_id"
+            " WHERE ri.ingredient_id IN"
+            f" (SELECT id FROM ingredients WHERE name IN ({marks}))"
+            " GROUP BY r.id HAVING missing <= ?"
+            " UNION ALL SELECT id, 0 FROM recipes WHERE ingredient_count = 0"
+        )
+        params = (*selected, max_missing)
+        missing_by_id = dict(self._conn.execute(candidates, params))
+        if not missing_by_id:
+            return []
+
+        rows = self._select_rows(
+            f"id IN (SELECT recipe_id FROM ({candidates}))", params
+        )
+        rows.sort(key=lambda row: (missing_by_id[row[0]], row[0]))
+        chosen = set(selected)
+        return [
+            (
+                recipe,
+                tuple(dict.fromkeys(i for i in recipe.ingredients if i not in chosen)),
+            )
+            for _, recipe in rows
+        ]
+
+    def covered_by(self, ingredients: Iterable[str]) -> list[Recipe]:
+        """Return recipes whose ingredients are all in `ingredients`."""
+        return [recipe for recipe, _ in self.missing_at_most(ingredients, 0)]
+
+    def import_csv(self, csv_path: str | Path) -> int:
+        """Add recipes from a CSV file; returns how many were new."""
+        return self.add_recipes(iter_recipes(csv_path))
+
+    def export_csv(self, csv_path: str | Path) -> int:
+        """Write all recipes to a CSV file; returns how many were written."""
+        recipes = self.recipes()
+        save_recipes(csv_path, recipes)
+        return len(recipes)
+
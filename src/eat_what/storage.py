@@ -2,31 +2,89 @@ from __future__ import annotations
 
 """CSV storage helpers for recipes."""
 
-from dataclasses import dataclass
+from contextlib import contextmanager
+import csv
+from dataclasses import dataclass, field, fields
+import io
 import logging
+import os
 from pathlib import Path
-from typing import Iterable
+import sys
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
 
-import pandas as pd
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+from .cache import load_cached, store_cached
+from .ingredients import registry
+from .ingredients_meat import meat_signature
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Slotted records drop the per-instance __dict__ (dataclass slots need 3.10).
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class Recipe:
-    """Immutable recipe record."""
+    """Immutable recipe record.
+
+    Loaders intern ingredient names and share identical ingredient tuples, so
+    large catalogs store each distinct name once.
+    """
     name: str
     ingredients: tuple[str, ...]
     prep_time: int
     cook_time: int
     has_meat: bool
     spicy: bool = False
+    # Derived once per record so the planner's hot loop is integer math.
+    meat_mask: int = field(init=False, repr=False, compare=False)
+    meat_count: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        mask, count = meat_signature(self.ingredients)
+        object.__setattr__(self, "meat_mask", mask)
+        object.__setattr__(self, "meat_count", count)
 
     @property
     def total_time(self) -> int:
         """Total minutes required for the recipe."""
         return self.prep_time + self.cook_time
 
+    def _cache_row(self) -> tuple:
+        """Return all field values, derived ones included, as a plain tuple."""
+        return tuple(getattr(self, name) for name in _RECIPE_FIELDS)
+
+    @classmethod
+    def _from_cache_row(cls, row: tuple) -> Recipe:
+        """Rebuild a recipe from `_cache_row` without recomputing fields."""
+        # Unrolled on purpose: this runs once per recipe on every cached load.
+        name, ingredients, prep_time, cook_time, has_meat, spicy, mask, count = row
+        recipe = object.__new__(cls)
+        setattr_ = object.__setattr__
+        setattr_(recipe, "name", name)
+        setattr_(recipe, "ingredients", ingredients)
+        setattr_(recipe, "prep_time", prep_time)
+        setattr_(recipe, "cook_time", cook_time)
+        setattr_(recipe, "has_meat", has_meat)
+        setattr_(recipe, "spicy", spicy)
+        setattr_(recipe, "meat_mask", mask)
+        setattr_(recipe, "meat_count", count)
+        return recipe
+
+    def __reduce__(self) -> tuple:
+        """Pickle as a plain row so derived fields are not recomputed."""
+        return (Recipe._from_cache_row, (self._cache_row(),))
+
+
+_RECIPE_FIELDS = tuple(item.name for item in fields(Recipe))
+
 
 REQUIRED_COLUMNS = {
     "name",
@@ -35,6 +93,8 @@ REQUIRED_COLUMNS = {
     "cook_time",
     "has_meat",
 }
+# Bump when the cached payload changes shape or content (v2: interned names).
+_RECIPES_CACHE_VERSION = 2
 OUTPUT_COLUMNS = (
     "cook_time",
     "has_meat",
@@ -45,6 +105,14 @@ OUTPUT_COLUMNS = (
 )
 
 
+SQLITE_SUFFIXES = {".db", ".sqlite", ".sqlite3"}
+
+
+def is_sqlite_path(path: str | Path) -> bool:
+    """Return True if `path` names a SQLite recipe store (see sqlite_store.py)."""
+    return Path(path).suffix.lower() in SQLITE_SUFFIXES
+
+
 def default_recipes_path() -> Path:
     """Return the default recipes.csv path relative to package/source layout."""
     package_data_path = Path(__file__).resolve().with_name("data") / "recipes.csv"
@@ -64,6 +132,32 @@ def _split_list(value: str) -> tuple[str, ...]:
     return tuple(items)
 
 
+class _IngredientInterner:
+    """Share ingredient strings and identical ingredient tuples while loading."""
+
+    def __init__(self) -> None:
+        self._tuples: dict[tuple[str, ...], tuple[str, ...]] = {}
+
+    def __call__(self, ingredients: tuple[str, ...]) -> tuple[str, ...]:
+        shared = self._tuples.get(ingredients)
+        if shared is None:
+            shared = tuple(sys.intern(item) for item in ingredients)
+            self._tuples[shared] = shared
+        return shared
+
+
+def _parse_int(value: object) -> int:
+    """Parse a CSV integer, accepting integral floats such as "15.0"."""
+    text = str(value).strip()
+    try:
+        return int(text)
+    except ValueError:
+        number = float(text)
+        if not number.is_integer():
+            raise ValueError(f"Invalid integer value: {value}") from None
+        return int(number)
+
+
 def _parse_bool(value: object) -> bool:
     """Parse CSV boolean-like values in a predictable way."""
     if isinstance(value, bool):
@@ -79,51 +173,242 @@ def _parse_bool(value: object) -> bool:
     raise ValueError(f"Invalid boolean value: {value}")
 
 
-def load_recipes(path: str | Path) -> list[Recipe]:
-    """Load recipes from a CSV file, with minimal format validation"""
+def _read_recipes(
+    path: Path, on_invalid: Callable[[int, Exception], None]
+) -> Iterator[Recipe]:
+    """Yield valid recipes from a CSV file, reporting invalid rows."""
+    with path.open(newline="", encoding="utf-8-sig") as handle:
+        reader = csv.DictReader(handle, restval="")
+        columns = set(reader.fieldnames or ())
+        missing = REQUIRED_COLUMNS - columns
+        if missing:
+            raise ValueError(f"Missing columns in recipes file: {sorted(missing)}")
+        has_spicy = "spicy" in columns
+        intern_ingredients = _IngredientInterner()
+
+        for idx, row in enumerate(reader):
+            try:
+                name = str(row["name"]).strip()
+                if not name:
+                    raise ValueError("Missing recipe name")
+                yield Recipe(
+                    name=name,
+                    ingredients=intern_ingredients(
+                        _split_list(str(row["ingredients"]).strip())
+                    ),
+                    prep_time=_parse_int(row["prep_time"]),
+                    cook_time=_parse_int(row["cook_time"]),
+                    has_meat=_parse_bool(row["has_meat"]),
+                    spicy=_parse_bool(row["spicy"]) if has_spicy else False,
+                )
+            except Exception as exc:
+                on_invalid(idx, exc)
+                continue
+
+
+def _warn_invalid_row(idx: int, exc: object) -> None:
+    """Log a skipped recipe row."""
+    logger.warning("Invalid recipe row at index %s: %s", idx, exc)
+
+
+def iter_recipes(path: str | Path) -> Iterator[Recipe]:
+    """Stream recipes from a CSV file row by row.
+
+    Invalid rows are logged and skipped. A missing file raises immediately;
+    missing required columns raise once iteration starts.
+    """
     path = Path(path)
     if not path.exists():
         raise FileNotFoundError(f"Recipes file not found: {path}")
+    return _read_recipes(path, _warn_invalid_row)
 
-    df = pd.read_csv(path)
-    missing = REQUIRED_COLUMNS - set(df.columns)
-    if missing:
-        raise ValueError(f"Missing columns in recipes file: {sorted(missing)}")
 
-    recipes: list[Recipe] = []
-    for idx, row in df.iterrows():
-        try:
-            recipes.append(
-                Recipe(
-                    name=str(row["name"]).strip(),
-                    ingredients=_split_list(str(row["ingredients"]).strip()),
-                    prep_time=int(row["prep_time"]),
-                    cook_time=int(row["cook_time"]),
-                    has_meat=_parse_bool(row["has_meat"]),
-                    spicy=_parse_bool(row["spicy"]) if "spicy" in df.columns else False,
-                )
-            )
-        except Exception as exc:
-            logger.warning("Invalid recipe row at index %s: %s", idx, exc)
-            continue
+def _recipes_cache_key() -> str:
+    """Identify the ingredient metadata the cached derived fields depend on."""
+    return f"recipes-v{_RECIPES_CACHE_VERSION}:{registry().meat_digest}"
+
+
+def _compile_recipes(path: Path) -> dict:
+    """Parse a CSV file into the marshal-able payload stored in the cache."""
+    invalid: list[tuple[int, str]] = []
+
+    def record(idx: int, exc: Exception) -> None:
+        _warn_invalid_row(idx, exc)
+        invalid.append((idx, str(exc)))
+
+    rows = [recipe._cache_row() for recipe in _read_recipes(path, record)]
+    return {"rows": rows, "invalid": invalid}
+
 
-    return recipes
+def load_recipes(path: str | Path, *, use_cache: bool = True) -> list[Recipe]:
+    """Load recipes from a CSV file, with minimal format validation.
+
+    SQLite stores (`.db`, `.sqlite`, `.sqlite3`) are read through
+    `SqliteRecipeStore` instead.
+
+    With `use_cache`, validated recipes and their derived fields are kept in
+    a compiled cache next to the CSV (see `cache.py`), so repeated loads skip
+    parsing until the file changes. Warnings for invalid rows are replayed
+    from the cache.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Recipes file not found: {path}")
+    if is_sqlite_path(path):
+        from .sqlite_store import SqliteRecipeStore
+
+        with SqliteRecipeStore(path) as store:
+            return store.recipes()
+    if not use_cache:
+        return list(iter_recipes(path))
+
+    compiled = {"built": False}
+
+    def build() -> dict:
+        compiled["built"] = True
+        return _compile_recipes(path)
+
+    payload = load_cached(path, build, key=_recipes_cache_key())
+    if not compiled["built"]:
+        for idx, message in payload["invalid"]:
+            _warn_invalid_row(idx, message)
+    return [Recipe._from_cache_row(row) for row in payload["rows"]]
+
+
+def _recipe_row(recipe: Recipe) -> dict[str, object]:
+    """Return the CSV row for a recipe."""
+    return {
+        "name": recipe.name,
+        "ingredients": ";".join(recipe.ingredients),
+        "prep_time": recipe.prep_time,
+        "cook_time": recipe.cook_time,
+        "has_meat": recipe.has_meat,
+        "spicy": recipe.spicy,
+    }
 
 
 def save_recipes(path: str | Path, recipes: Iterable[Recipe]) -> None:
     """Write recipes to a CSV file."""
-    rows = []
-    for recipe in recipes:
-        rows.append(
-            {
-                "name": recipe.name,
-                "ingredients": ";".join(recipe.ingredients),
-                "prep_time": recipe.prep_time,
-                "cook_time": recipe.cook_time,
-                "has_meat": recipe.has_meat,
-                "spicy": recipe.spicy,
-            }
+    with Path(path).open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=OUTPUT_COLUMNS, lineterminator="\n")
+        writer.writeheader()
+        for recipe in recipes:
+            writer.writerow(_recipe_row(recipe))
+
+
+_NAMES_CACHE_KEY = "recipe-names-v1"
+
+
+def load_recipe_names(path: str | Path, *, use_cache: bool = True) -> set[str]:
+    """Return the recipe names in a CSV file without validating other fields.
+
+    With `use_cache`, the names come from a name index kept next to the CSV
+    (`.<name>.names.cache`), which `append_recipe` extends in place, so
+    checking a new name does not rescan the catalog.
+    """
+    path = Path(path)
+    if not path.exists():
+        return set()
+    if use_cache:
+        return set(
+            load_cached(
+                path,
+                lambda: sorted(_scan_recipe_names(path)),
+                key=_NAMES_CACHE_KEY,
+                tag="names",
+            )
+        )
+    return _scan_recipe_names(path)
+
+
+def _scan_recipe_names(path: Path) -> set[str]:
+    """Read the name column of a CSV file."""
+    with path.open(newline="", encoding="utf-8-sig") as handle:
+        reader = csv.reader(handle)
+        header = next(reader, [])
+        if "name" not in header:
+            raise ValueError("Missing columns in recipes file: ['name']")
+        column = header.index("name")
+        return {
+            row[column].strip()
+            for row in reader
+            if len(row) > column and row[column].strip()
+        }
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    """Hold an exclusive lock on a sidecar `.<name>.lock` file (POSIX only)."""
+    if fcntl is None:
+        yield
+        return
+    lock_path = path.with_name(f".{path.name}.lock")
+    with lock_path.open("a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def append_recipe(path: str | Path, recipe: Recipe) -> None:
+    """Append one recipe row to a CSV file without rewriting existing rows.
+
+    The row follows the file's own column order and is added with a single
+    `O_APPEND` write, like `catalog.append_ingredient`; existing rows
+    (including rows `load_recipes` would skip) are never touched. Writers
+    are serialized with a file lock; the name is checked for uniqueness
+    against the name index (see `load_recipe_names`) while the lock is
+    held, and the index is extended with the new name afterwards.
+    """
+    path = Path(path)
+    with _locked(path):
+        names = load_recipe_names(path)
+        if recipe.name in names:
+            raise ValueError(f"Recipe name already exists: {recipe.name}")
+
+        header = list(OUTPUT_COLUMNS)
+        prefix = ""
+        new_file = not path.exists() or path.stat().st_size == 0
+        if not new_file:
+            with path.open(newline="", encoding="utf-8-sig") as handle:
+                header = next(csv.reader(handle))
+            with path.open("rb") as handle:
+                handle.seek(-1, os.SEEK_END)
+                prefix = "" if handle.read(1) in (b"\n", b"\r") else "\n"
+        if recipe.spicy and "spicy" not in header:
+            logger.warning(
+                "Recipes file has no spicy column; %s is stored as not spicy.",
+                recipe.name,
+            )
+
+        row = io.StringIO(prefix)
+        row.seek(len(prefix))
+        writer = csv.DictWriter(
+            row, fieldnames=header, extrasaction="ignore", lineterminator="\n"
         )
+        if new_file:
+            writer.writeheader()
+        writer.writerow(_recipe_row(recipe))
+
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, row.getvalue().encode("utf-8"))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        names.add(recipe.name)
+        store_cached(path, sorted(names), key=_NAMES_CACHE_KEY, tag="names")
+
+
+def recipes_to_dataframe(recipes: Iterable[Recipe]) -> pd.DataFrame:
+    """Return recipes as a pandas DataFrame (requires the `pandas` extra)."""
+    try:
+        import pandas as pd
+    except ImportError as exc:
+        raise ImportError(
+            "recipes_to_dataframe requires pandas: pip install 'eat-what[pandas]'"
+        ) from exc
 
-    df = pd.DataFrame(rows, columns=OUTPUT_COLUMNS)
-    df.to_csv(path, index=False)
+    rows = [_recipe_row(recipe) for recipe in recipes]
+    return pd.DataFrame(rows, columns=OUTPUT_COLUMNS)
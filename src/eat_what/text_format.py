@@ -4,30 +4,66 @@ from __future__ import annotations
 
 import re
 import unicodedata
+from typing import Iterator, Sequence
 
 ANSI_PATTERN = re.compile(r"\x1b\[[0-9;]*m")
 
 
+class _WidthTable(dict):
+    """Character -> column width, filled from `unicodedata` on first use."""
+    def __missing__(self, ch: str) -> int:
+        width = 2 if unicodedata.east_asian_width(ch) in {"W", "F"} else 1
+        self[ch] = width
+        return width
+
+
+# Looked up with dict.__getitem__, so cached characters cost no Python call.
+_CHAR_WIDTHS = _WidthTable()
+
+
 def display_width(text: str) -> int:
     """Return the display width, accounting for ANSI codes and CJK width."""
-    plain = ANSI_PATTERN.sub("", text)
-    width = 0
-    for ch in plain:
-        if unicodedata.east_asian_width(ch) in {"W", "F"}:
-            width += 2
-        else:
-            width += 1
-    return width
-
-
-def ljust_display(text: str, width: int) -> str:
-    """Pad text to a display width (CJK and ANSI aware)."""
-    pad = width - display_width(text)
+    if "\x1b" in text:
+        text = ANSI_PATTERN.sub("", text)
+    if text.isascii():
+        return len(text)
+    return sum(map(_CHAR_WIDTHS.__getitem__, text))
+
+
+def ljust_display(text: str, width: int, text_width: int | None = None) -> str:
+    """Pad text to a display width (CJK and ANSI aware).
+
+    Pass `text_width` when the caller already measured `text`.
+    """
+    if text_width is None:
+        text_width = display_width(text)
+    pad = width - text_width
     if pad <= 0:
         return text
     return text + (" " * pad)
 
 
+def iter_columns(
+    items: Sequence[str], per_line: int, separator: str = "   "
+) -> Iterator[str]:
+    """Yield rows of `per_line` equal-width columns.
+
+    Each item is measured once, up front (the column width needs all of
+    them); padding and joining happen row by row as rows are consumed.
+    """
+    if not items:
+        return
+    widths = [display_width(item) for item in items]
+    col_width = max(widths)
+    for start in range(0, len(items), per_line):
+        yield separator.join(
+            ljust_display(item, col_width, width)
+            for item, width in zip(
+                items[start : start + per_line], widths[start : start + per_line]
+            )
+        )
+
+
 def color_code(text: str, color: str, reset: str = "\x1b[0m") -> str:
     """Wrap text in ANSI color codes."""
     return f"{color}{text}{reset}"
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+"""NumPy batch evaluator behind the "vectorized" search engine.
+
+Same search as the "random" engine, but candidates are drawn and scored a
+batch at a time instead of one Python loop iteration each:
+
+- meat recipes of a pool become aligned `total_time` / `meat_mask` /
+  `meat_count` arrays (cached per pool until its partitions change);
+- a batch is a (K, days) array of row indices: one fish row per candidate
+  when the pool has fish, the rest drawn without replacement from the rows
+  sharing no meat kind with it;
+- total time is a gather-and-sum, meat overlap is `sum(meat_count)` minus
+  the popcount of the OR-ed masks, both along the candidate axis;
+- the first feasible candidate of a batch wins, else the fastest one seen.
+
+With recipe weights, fish rows are drawn by binary search over cumulative
+weights, and the rest either by the smallest exponential keys scaled by
+weight (small partitions) or by cumulative-weight draws that drop repeated
+rows (large partitions, where a set's probability is then proportional to
+the product of its weights).
+
+Requires the `numpy` extra.
+"""
+
+import operator
+from typing import TYPE_CHECKING, Callable, Mapping
+import random
+import weakref
+
+from .ingredients_meat import MEAT_KIND_BITS, MeatKind
+from .storage import Recipe
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from .planner import PlanPool, PlanStats
+
+BATCH_SIZE = 4096
+# With more rows than this per pick, repeats are rare: sample with
+# replacement and drop candidates that drew a row twice, instead of
+# partitioning a full row of random keys per candidate.
+_KEYS_ROWS_PER_PICK = 16
+
+_FISH_BIT = MEAT_KIND_BITS[MeatKind.FISH]
+_KIND_BITS = tuple(MEAT_KIND_BITS.values())
+
+_tables: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as exc:
+        raise ImportError(
+            "The vectorized engine requires numpy: pip install 'eat-what[numpy]'"
+        ) from exc
+    return numpy
+
+
+class _MeatTable:
+    """Column arrays for a pool's meat partition."""
+    def __init__(self, pool: PlanPool) -> None:
+        np = _numpy()
+        meat = pool.meat
+        self.recipes = list(meat)
+        self.times = np.fromiter((r.total_time for r in meat), np.int64, len(meat))
+        self.masks = np.fromiter((r.meat_mask for r in meat), np.int64, len(meat))
+        self.counts = np.fromiter((r.meat_count for r in meat), np.int64, len(meat))
+        self.fish = np.flatnonzero(self.masks & _FISH_BIT)
+        self._remaining: dict[int, np.ndarray] = {}
+        self._weights: tuple[Mapping[str, float], np.ndarray] | None = None
+
+    def weights(
+        self, weights: Mapping[str, float], key: Callable[[Recipe], object]
+    ) -> np.ndarray:
+        """Row weights under a weights mapping (cached for that mapping)."""
+        if self._weights is None or self._weights[0] is not weights:
+            get = weights.get
+            row_weights = _numpy().fromiter(
+                (get(key(r), 1.0) for r in self.recipes), float, len(self.recipes)
+            )
+            self._weights = (weights, row_weights)
+        return self._weights[1]
+
+    def remaining(self, mask: int) -> np.ndarray:
+        """Row indices sharing no meat kind with `mask` (memoized)."""
+        rows = self._remaining.get(mask)
+        if rows is None:
+            rows = self._remaining[mask] = _numpy().flatnonzero(
+                (self.masks & mask) == 0
+            )
+        return rows
+
+
+def _table(pool: PlanPool) -> _MeatTable:
+    cached = _tables.get(pool)
+    if cached is None or cached[0] != pool.version:
+        cached = _tables[pool] = (pool.version, _MeatTable(pool))
+    return cached[1]
+
+
+def _weighted_draw(
+    gen: np.random.Generator, weights: np.ndarray, shape: int | tuple
+) -> np.ndarray:
+    """Draw positions with probability proportional to `weights`."""
+    np = _numpy()
+    cumulative = np.cumsum(weights)
+    drawn = np.searchsorted(cumulative, gen.random(shape) * cumulative[-1], "right")
+    return np.minimum(drawn, len(weights) - 1)
+
+
+def _sample_rows(
+    gen: np.random.Generator,
+    rows: np.ndarray,
+    size: int,
+    picks: int,
+    weights: np.ndarray | None = None,
+) -> np.ndarray:
+    """Draw `size` sets of `picks` distinct entries of `rows`, uniformly or
+    by the per-entry `weights`.
+
+    Returns fewer sets when the with-replacement path drops repeats.
+    """
+    np = _numpy()
+    if picks == 0:
+        return np.empty((size, 0), np.int64)
+    if len(rows) <= _KEYS_ROWS_PER_PICK * picks:
+        if weights is None:
+            keys = gen.random((size, len(rows)))
+        else:
+            keys = gen.exponential(size=(size, len(rows))) / weights
+        chosen = np.argpartition(keys, picks - 1, axis=1)[:, :picks]
+    elif weights is not None:
+        chosen = _weighted_draw(gen, weights, (size, picks))
+        ordered = np.sort(chosen, axis=1)
+        chosen = chosen[(ordered[:, 1:] != ordered[:, :-1]).all(axis=1)]
+    else:
+        chosen = gen.integers(0, len(rows), (size, picks))
+        ordered = np.sort(chosen, axis=1)
+        chosen = chosen[(ordered[:, 1:] != ordered[:, :-1]).all(axis=1)]
+    return rows[chosen]
+
+
+def _draw_batch(
+    gen: np.random.Generator,
+    table: _MeatTable,
+    size: int,
+    meat_target: int,
+    weights: np.ndarray | None = None,
+) -> np.ndarray:
+    """Return a (<= size, meat_target) array of candidate row indices.
+
+    `weights` are per-row sampling weights (None: uniform).
+    """
+    np = _numpy()
+    all_rows = np.arange(len(table.recipes))
+    if not len(table.fish):
+        if len(all_rows) < meat_target:
+            return np.empty((0, meat_target), np.int64)
+        return _sample_rows(gen, all_rows, size, meat_target, weights)
+
+    if weights is None:
+        fish = table.fish[gen.integers(0, len(table.fish), size)]
+    else:
+        fish = table.fish[_weighted_draw(gen, weights[table.fish], size)]
+    fish_masks = table.masks[fish]
+    batches = []
+    for mask in np.unique(fish_masks):
+        heads = fish[fish_masks == mask]
+        rest_rows = table.remaining(int(mask))
+        if len(rest_rows) < meat_target - 1:
+            continue
+        rest = _sample_rows(
+            gen,
+            rest_rows,
+            len(heads),
+            meat_target - 1,
+            None if weights is None else weights[rest_rows],
+        )
+        batches.append(np.column_stack((heads[: len(rest)], rest)))
+    if not batches:
+        return np.empty((0, meat_target), np.int64)
+    return np.concatenate(batches)
+
+
+def _popcount(np, masks: np.ndarray) -> np.ndarray:
+    bits = np.zeros(len(masks), np.int64)
+    for bit in _KIND_BITS:
+        bits += (masks & bit) != 0
+    return bits
+
+
+def find_vectorized_meat_plan(
+    pool: PlanPool,
+    rng: random.Random,
+    *,
+    meat_target: int,
+    max_weekly_time: int | None,
+    max_overlap: int,
+    max_attempts: int,
+    batch_size: int = BATCH_SIZE,
+    stats: PlanStats | None = None,
+    weights: Mapping[str, float] | None = None,
+    weight_key: Callable[[Recipe], object] = operator.attrgetter("name"),
+) -> tuple[list[Recipe], int, int] | None:
+    """Score `max_attempts` random meat plans in batches; see module docstring.
+
+    Draws come from a NumPy generator seeded by `rng`, so results are
+    reproducible under the planner seed (but differ from the "random" engine).
+    `stats.attempts` counts scored candidates; draws dropped before scoring
+    (repeated rows, a fish dish with too few compatible rows) are not
+    counted. `weights` (keyed by `weight_key(recipe)`, default 1) make
+    the draws weighted.
+    """
+    np = _numpy()
+    table = _table(pool)
+    row_weights = None if weights is None else table.weights(weights, weight_key)
+    gen = np.random.default_rng(rng.getrandbits(64))
+
+    best: tuple[np.ndarray, int, int] | None = None
+    remaining = max_attempts
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        remaining -= size
+        candidates = _draw_batch(gen, table, size, meat_target, row_weights)
+        if stats is not None:
+            stats.attempts += len(candidates)
+        if not len(candidates):
+            continue
+        totals = table.times[candidates].sum(axis=1)
+        masks = np.bitwise_or.reduce(table.masks[candidates], axis=1)
+        overlaps = table.counts[candidates].sum(axis=1) - _popcount(np, masks)
+
+        in_time = (
+            np.ones(len(candidates), bool)
+            if max_weekly_time is None
+            else totals <= max_weekly_time
+        )
+        feasible = np.flatnonzero(in_time & (overlaps <= max_overlap))
+        if stats is not None:
+            stats.rejected_time += len(candidates) - int(in_time.sum())
+            stats.rejected_overlap += int(in_time.sum()) - len(feasible)
+        if len(feasible):
+            idx = feasible[0]
+            best = (candidates[idx], totals[idx], overlaps[idx])
+            break
+        timed = np.flatnonzero(in_time)
+        if len(timed):
+            idx = timed[np.argmin(totals[timed])]
+            if best is None or totals[idx] < best[1]:
+                best = (candidates[idx], totals[idx], overlaps[idx])
+
+    if best is None:
+        return None
+    rows, total_time, overlap = best
+    selection = [table.recipes[row] for row in rows.tolist()]
+    rng.shuffle(selection)
+    return selection, int(total_time), int(overlap)
@@ -0,0 +1,91 @@
+import os
+from pathlib import Path
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from eat_what import recipe_cli
+from eat_what.catalog import (
+    append_ingredient,
+    builtin_catalog_path,
+    catalog_entries,
+    load_catalog,
+)
+from eat_what.ingredients import refresh_registry, registry
+from eat_what.ingredients_meat import INGREDIENT_MEAT
+from eat_what.ingredients_vegatable import INGREDIENT_VEGATABLE
+
+
+class CatalogTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.user_path = Path(tmp.name) / "ingredients.jsonl"
+        env = patch.dict(os.environ, {"EAT_WHAT_INGREDIENTS": str(self.user_path)})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_builtin_catalog_feeds_the_ingredient_dicts(self) -> None:
+        builtin = {
+            name: (cn, kind) for name, cn, kind in load_catalog(builtin_catalog_path())
+        }
+        self.assertEqual(builtin["salmon"], (INGREDIENT_MEAT["salmon"].cn, "fish"))
+        self.assertEqual(builtin["tofu"], (INGREDIENT_VEGATABLE["tofu"].cn, "veg"))
+        # Nothing is written next to the packaged catalog.
+        self.assertEqual(
+            [path.name for path in builtin_catalog_path().parent.iterdir()],
+            ["ingredients.jsonl"],
+        )
+
+    def test_user_catalog_extends_and_overrides_builtin(self) -> None:
+        # Scenario: the user file renames salmon, adds eel and has two bad
+        # lines (unknown kind, broken JSON) that are skipped with a warning.
+        self.user_path.write_text(
+            '{"name": "salmon", "cn": "鲑鱼", "kind": "fish"}\n'
+            '{"name": "eel", "cn": "鳗鱼", "kind": "fish"}\n'
+            '{"name": "tofu skin", "cn": "腐竹", "kind": "bean"}\n'
+            "{not json\n",
+            encoding="utf-8",
+        )
+        with self.assertLogs("eat_what.catalog", "WARNING") as logs:
+            entries = catalog_entries()
+
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(entries["salmon"], ("鲑鱼", "fish"))
+        self.assertEqual(entries["eel"], ("鳗鱼", "fish"))
+        self.assertNotIn("tofu skin", entries)
+
+    def test_append_adds_lines_and_rejects_duplicates(self) -> None:
+        # No trailing newline: the appended line must still start on its own.
+        self.user_path.write_text(
+            '{"name": "eel", "cn": "鳗鱼", "kind": "fish"}', encoding="utf-8"
+        )
+        path = append_ingredient("okra", "秋葵", "veg")
+
+        self.assertEqual(path, self.user_path)
+        self.assertEqual(
+            load_catalog(path), [("eel", "鳗鱼", "fish"), ("okra", "秋葵", "veg")]
+        )
+        with self.assertRaisesRegex(ValueError, "already exists"):
+            append_ingredient("okra", "秋葵", "veg")
+        with self.assertRaisesRegex(ValueError, "Unknown kind"):
+            append_ingredient("tofu skin", "腐竹", "bean")
+
+    def test_recipe_cli_adds_to_user_catalog_not_package(self) -> None:
+        # Scenario: adding a veg ingredient interactively writes the user
+        # catalog, leaves the packaged files alone and refreshes the registry.
+        builtin = builtin_catalog_path().read_bytes()
+        self.addCleanup(refresh_registry)
+        self.addCleanup(INGREDIENT_VEGATABLE.pop, "okra", None)
+        with patch("builtins.input", side_effect=["okra", "秋葵"]), patch(
+            "builtins.print"
+        ):
+            recipe_cli._add_veg_ingredient()
+
+        self.assertEqual(load_catalog(self.user_path), [("okra", "秋葵", "veg")])
+        self.assertEqual(builtin_catalog_path().read_bytes(), builtin)
+        self.assertEqual(registry().veg_cn["okra"], "秋葵")
+
+
+if __name__ == "__main__":
+    unittest.main()
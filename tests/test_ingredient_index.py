@@ -0,0 +1,62 @@
+import unittest
+
+from eat_what.ingredient_index import IngredientIndex
+from eat_what.storage import Recipe
+
+
+def _recipe(name: str, *ingredients: str) -> Recipe:
+    return Recipe(
+        name=name,
+        ingredients=ingredients,
+        prep_time=5,
+        cook_time=10,
+        has_meat=False,
+        spicy=False,
+    )
+
+
+class IngredientIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.index = IngredientIndex(
+            [
+                _recipe("tofu_soup", "tofu", "spinach"),
+                _recipe("plain_tofu", "tofu"),
+                _recipe("stew", "beef brisket", "potato", "onion"),
+                _recipe("cabbage", "cabbage"),
+            ]
+        )
+
+    def test_covered_by_matches_subset_scan(self) -> None:
+        # Same answer as scanning every recipe with all(ing in selected).
+        selected = {"tofu", "spinach", "potato"}
+        expected = [
+            recipe
+            for recipe in self.index.recipes
+            if all(ing in selected for ing in recipe.ingredients)
+        ]
+
+        self.assertEqual(self.index.covered_by(selected), expected)
+        self.assertEqual(
+            [r.name for r in self.index.covered_by(selected)],
+            ["tofu_soup", "plain_tofu"],
+        )
+
+    def test_missing_at_most_ranks_by_missing_count(self) -> None:
+        # "stew" misses one ingredient with potato+beef selected; tofu dishes
+        # do not use any selected ingredient and are not considered.
+        results = self.index.missing_at_most({"potato", "beef brisket"}, 1)
+
+        self.assertEqual(
+            [(recipe.name, missing) for recipe, missing in results],
+            [("stew", ("onion",))],
+        )
+
+        results = self.index.missing_at_most({"tofu"}, 1)
+        self.assertEqual(
+            [(recipe.name, missing) for recipe, missing in results],
+            [("plain_tofu", ()), ("tofu_soup", ("spinach",))],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
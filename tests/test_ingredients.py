@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import patch
+
+from eat_what.ingredients import IngredientRegistry, refresh_registry, registry
+from eat_what.ingredients_meat import (
+    INGREDIENT_MEAT,
+    MEAT_KIND_BITS,
+    MeatIngredient,
+    MeatKind,
+)
+from eat_what.ingredients_vegatable import INGREDIENT_VEGATABLE, VegatableIngredient
+
+
+class IngredientRegistryTests(unittest.TestCase):
+    def test_entries_match_source_dictionaries(self) -> None:
+        # Scenario: every dictionary entry gets a dense id, its CN name and
+        # kind; meat comes first, fish carries the fish flag.
+        reg = registry()
+        self.assertEqual([info.id for info in reg.entries], list(range(len(reg))))
+        self.assertEqual(set(reg.meat_cn), set(INGREDIENT_MEAT))
+        self.assertEqual(set(reg.veg_cn) | set(reg.meat_cn), set(reg.labels))
+
+        salmon = reg["salmon"]
+        self.assertEqual(salmon.cn, INGREDIENT_MEAT["salmon"].cn)
+        self.assertEqual(salmon.kind, "fish")
+        self.assertTrue(salmon.is_meat and salmon.is_fish and not salmon.is_veg)
+        self.assertIn("salmon", reg.fish_names)
+        self.assertIn("salmon", reg.kind_groups[MeatKind.FISH])
+        self.assertEqual(reg.labels["salmon"], (salmon.cn, "fish"))
+        self.assertIsNone(reg.get("no such thing"))
+
+    def test_ids_and_mask_decoding(self) -> None:
+        reg = registry()
+        self.assertEqual(reg.ids(["salmon", "no such thing"]), (reg["salmon"].id,))
+        mask = MEAT_KIND_BITS[MeatKind.PORK] | MEAT_KIND_BITS[MeatKind.FISH]
+        self.assertEqual(reg.kinds(mask), (MeatKind.PORK, MeatKind.FISH))
+        self.assertEqual(reg.kinds(0), ())
+
+    def test_refresh_picks_up_added_ingredients(self) -> None:
+        # Scenario: eat-what-recipe adds ingredients at runtime; the old
+        # registry is a snapshot, the refreshed one sees them.
+        old = registry()
+        meat = dict(INGREDIENT_MEAT, eel=MeatIngredient(MeatKind.FISH, "鳗鱼"))
+        veg = dict(INGREDIENT_VEGATABLE, okra=VegatableIngredient("秋葵"))
+        with patch.dict(INGREDIENT_MEAT, meat), patch.dict(INGREDIENT_VEGATABLE, veg):
+            new = refresh_registry()
+            self.assertIsNot(new, old)
+            self.assertIs(registry(), new)
+            self.assertNotIn("eel", old)
+            self.assertTrue(new["eel"].is_fish)
+            self.assertEqual(new.veg_cn["okra"], "秋葵")
+            self.assertNotEqual(new.meat_digest, old.meat_digest)
+        refresh_registry()
+        self.assertNotIn("eel", registry())
+        self.assertEqual(registry().meat_digest, old.meat_digest)
+
+    def test_registry_is_read_only(self) -> None:
+        reg = IngredientRegistry()
+        with self.assertRaises(TypeError):
+            reg.meat_cn["tofu"] = "豆腐"  # type: ignore[index]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,73 @@
+import tempfile
 import unittest
+from pathlib import Path
+from unittest.mock import patch
 
-from eat_what.planner import find_remaining_meat
+from eat_what import parallel
+from eat_what.ingredients_meat import MEAT_KIND_BITS, MeatKind
+from eat_what.local_search import LocalSearch
+from eat_what.planner import PlanResult, WeeklyPlanner, find_remaining_meat
+from eat_what.rolling import plan_weeks
+from eat_what.snapshot import RecipeSnapshot, write_snapshot
 from eat_what.storage import Recipe
 
+try:
+    import numpy
+except ImportError:  # optional extra
+    numpy = None
+
+
+def _meat_recipe(name: str, ingredient: str, total_time: int) -> Recipe:
+    return Recipe(
+        name=name,
+        ingredients=(ingredient,),
+        prep_time=0,
+        cook_time=total_time,
+        has_meat=True,
+        spicy=False,
+    )
+
+
+def _fast_dish_catalog() -> list[Recipe]:
+    # Many slow dishes and exactly one fast dish per meat kind, so only
+    # one combination fits a tight weekly budget.
+    recipes = [
+        _meat_recipe(f"slow_{kind}_{idx}", ingredient, 120)
+        for idx in range(50)
+        for kind, ingredient in (
+            ("pork", "pork belly"),
+            ("beef", "beef brisket"),
+            ("chicken", "chicken thigh"),
+        )
+    ]
+    recipes += [
+        _meat_recipe("fast_pork", "pork belly", 10),
+        _meat_recipe("fast_beef", "beef brisket", 10),
+        _meat_recipe("fast_chicken", "chicken thigh", 10),
+    ]
+    return recipes
+
+
+def _four_kind_catalog() -> list[Recipe]:
+    kinds = ["pork belly", "beef brisket", "chicken thigh", "lamb chops"]
+    return [
+        _meat_recipe(f"dish_{idx}", kinds[idx % len(kinds)], 10 + idx)
+        for idx in range(12)
+    ]
+
+
+def _pork_heavy_catalog() -> list[Recipe]:
+    # Mostly pork: a plan with no repeated meat kind needs the single
+    # beef and chicken dishes next to the fish, which sampling rarely
+    # draws together.
+    recipes = [_meat_recipe(f"pork_{idx}", "pork belly", 10) for idx in range(60)]
+    recipes += [
+        _meat_recipe("beef", "beef brisket", 30),
+        _meat_recipe("chicken", "chicken thigh", 30),
+        _meat_recipe("fish", "salmon", 20),
+    ]
+    return recipes
+
 
 class FindRemainingMeatTests(unittest.TestCase):
     def test_excludes_recipes_with_same_meat_kind(self) -> None:
@@ -83,5 +148,406 @@ class FindRemainingMeatTests(unittest.TestCase):
         self.assertEqual([recipe.name for recipe in remaining], ["dish_a", "dish_b"])
 
 
+class MeatOverlapTests(unittest.TestCase):
+    def test_overlap_counts_repeated_kinds_from_precomputed_masks(self) -> None:
+        # Pork appears three times (two recipes, one with two pork cuts),
+        # beef once, and the veg-only ingredient is ignored.
+        recipes = [
+            Recipe("a", ("pork belly", "pork ribs"), 5, 5, True),
+            Recipe("b", ("meatball", "beef brisket", "scallion"), 5, 5, True),
+        ]
+
+        self.assertEqual(recipes[0].meat_count, 2)
+        self.assertEqual(recipes[1].meat_count, 2)
+        self.assertEqual(WeeklyPlanner._ingredient_meat_overlap(recipes), 2)
+
+
+class ExactEngineTests(unittest.TestCase):
+    def test_exact_engine_finds_plan_random_engine_misses(self) -> None:
+        # Random sampling almost never draws the three fast dishes together.
+        with self.assertRaises(ValueError):
+            WeeklyPlanner(_fast_dish_catalog(), days=3, seed=1).plan(
+                max_weekly_time=30, veg_dishes=0, max_attempts=50
+            )
+
+        result = WeeklyPlanner(_fast_dish_catalog(), days=3, seed=1).plan(
+            max_weekly_time=30, veg_dishes=0, engine="exact"
+        )
+
+        self.assertEqual(
+            sorted(recipe.name for recipe in result.recipes),
+            ["fast_beef", "fast_chicken", "fast_pork"],
+        )
+        self.assertEqual(result.total_time, 30)
+        self.assertEqual(result.ingredient_overlap, 0)
+
+    def test_exact_engine_forces_fish_and_is_reproducible(self) -> None:
+        # Fish must be included and the other dishes must avoid the fish kind.
+        recipes = _fast_dish_catalog() + [_meat_recipe("fish", "salmon", 20)]
+        plans = [
+            WeeklyPlanner(recipes, days=3, seed=7).plan(
+                max_weekly_time=200, max_overlap=0, veg_dishes=0, engine="exact"
+            )
+            for _ in range(2)
+        ]
+
+        self.assertIn("fish", [recipe.name for recipe in plans[0].recipes])
+        self.assertLessEqual(plans[0].total_time, 200)
+        self.assertEqual(plans[0].ingredient_overlap, 0)
+        self.assertEqual(plans[0], plans[1])
+
+    def test_exact_engine_raises_when_infeasible(self) -> None:
+        # Three dishes cannot fit in 20 minutes at 10 minutes minimum each.
+        with self.assertRaises(ValueError):
+            WeeklyPlanner(_fast_dish_catalog(), days=3, seed=1).plan(
+                max_weekly_time=20, veg_dishes=0, engine="exact"
+            )
+
+
+@unittest.skipIf(numpy is None, "numpy extra not installed")
+class VectorizedEngineTests(unittest.TestCase):
+    def test_batch_scores_match_python_scoring_and_force_fish(self) -> None:
+        # Reported time/overlap must equal a per-recipe recomputation.
+        recipes = _fast_dish_catalog() + [_meat_recipe("fish", "salmon", 20)]
+        plans = [
+            WeeklyPlanner(recipes, days=3, seed=3).plan(
+                max_weekly_time=200,
+                max_overlap=0,
+                veg_dishes=0,
+                max_attempts=5000,
+                engine="vectorized",
+            )
+            for _ in range(2)
+        ]
+
+        result = plans[0]
+        self.assertIn("fish", [recipe.name for recipe in result.recipes])
+        self.assertEqual(result.total_time, sum(r.total_time for r in result.recipes))
+        self.assertEqual(
+            result.ingredient_overlap,
+            WeeklyPlanner._ingredient_meat_overlap(result.recipes),
+        )
+        self.assertLessEqual(result.total_time, 200)
+        self.assertEqual(result.ingredient_overlap, 0)
+        self.assertEqual(plans[0], plans[1])
+
+    def test_rolling_pool_changes_rebuild_batch_tables(self) -> None:
+        # Six dishes, three per week: week two must use the other three.
+        weeks = list(
+            plan_weeks(
+                WeeklyPlanner(_four_kind_catalog()[:6], days=3, seed=2),
+                2,
+                no_repeat_weeks=1,
+                veg_dishes=0,
+                engine="vectorized",
+            )
+        )
+
+        first = {recipe.name for recipe in weeks[0].recipes}
+        second = {recipe.name for recipe in weeks[1].recipes}
+        self.assertFalse(first & second)
+
+
+class PlanManyTests(unittest.TestCase):
+    def test_plan_many_yields_distinct_plans_lazily(self) -> None:
+        planner = WeeklyPlanner(_four_kind_catalog(), days=3, seed=5)
+
+        plans = planner.plan_many(10, distinct=True, veg_dishes=0)
+
+        # A generator: nothing is planned until iteration starts.
+        self.assertFalse(isinstance(plans, list))
+        dish_sets = [frozenset(r.name for r in plan.recipes) for plan in plans]
+        self.assertEqual(len(dish_sets), 10)
+        self.assertEqual(len(set(dish_sets)), 10)
+
+    def test_plan_many_is_reproducible_and_matches_plan(self) -> None:
+        recipes = _four_kind_catalog()
+        first = list(WeeklyPlanner(recipes, days=3, seed=5).plan_many(3, veg_dishes=0))
+        second = list(WeeklyPlanner(recipes, days=3, seed=5).plan_many(3, veg_dishes=0))
+        single = WeeklyPlanner(recipes, days=3, seed=5).plan(veg_dishes=0)
+
+        self.assertEqual(first, second)
+        self.assertEqual(first[0], single)
+
+    def test_distinct_raises_when_catalog_is_exhausted(self) -> None:
+        # Only C(3, 3) = 1 distinct plan exists for three dishes.
+        planner = WeeklyPlanner(_four_kind_catalog()[:3], days=3, seed=5)
+
+        with self.assertRaises(ValueError):
+            list(planner.plan_many(2, distinct=True, veg_dishes=0, max_attempts=20))
+
+
+class PlanStatsTests(unittest.TestCase):
+    def test_random_engine_counts_rejections_and_fallback(self) -> None:
+        # A zero-overlap plan needs the 120-minute pork dish and breaks the
+        # 100-minute cap; plans without pork repeat beef or chicken. Every
+        # attempt is rejected for time or overlap, none can be ruled out
+        # up front, and the fastest in-time draw is the fallback.
+        recipes = [_meat_recipe(f"pork_{idx}", "pork belly", 120) for idx in range(5)]
+        recipes += [_meat_recipe(f"beef_{idx}", "beef brisket", 10) for idx in range(5)]
+        recipes += [
+            _meat_recipe(f"chicken_{idx}", "chicken thigh", 10) for idx in range(5)
+        ]
+        planner = WeeklyPlanner(recipes, days=3, seed=2)
+
+        result = planner.plan(
+            max_weekly_time=100, max_overlap=0, veg_dishes=0, max_attempts=50
+        )
+
+        stats = result.stats
+        self.assertIs(stats, planner.last_stats)
+        self.assertEqual(stats.engine, "random")
+        self.assertEqual(stats.attempts, 50)
+        self.assertGreater(stats.rejected_time, 0)
+        self.assertGreater(stats.rejected_overlap, 0)
+        self.assertEqual(stats.rejected_time + stats.rejected_overlap, 50)
+        self.assertTrue(stats.fallback)
+        self.assertEqual(stats.bound_time, 30)
+        self.assertGreater(stats.search_s, 0)
+
+    def test_stop_at_first_feasible_and_pool_reuse(self) -> None:
+        # Disjoint kinds: the first draw is feasible. The second plan reuses
+        # the cached pool, so it reports no filter/partition time.
+        planner = WeeklyPlanner(_four_kind_catalog(), days=3, seed=3)
+        first = planner.plan(veg_dishes=0, max_overlap=6)
+        second = planner.plan(veg_dishes=0, max_overlap=6)
+
+        self.assertEqual(first.stats.attempts, 1)
+        self.assertFalse(first.stats.fallback)
+        self.assertGreater(first.stats.partition_s, 0)
+        self.assertEqual(second.stats.partition_s, 0)
+        # Stats are diagnostics, not part of plan equality.
+        self.assertEqual(
+            first,
+            PlanResult(first.recipes, first.total_time, first.ingredient_overlap),
+        )
+
+
+class PlanBoundsTests(unittest.TestCase):
+    def test_time_infeasible_plan_fails_before_sampling(self) -> None:
+        # The three fastest dishes take 30 minutes: no plan fits 20, and
+        # the search never starts.
+        planner = WeeklyPlanner(_fast_dish_catalog(), days=3, seed=1)
+        with self.assertRaisesRegex(ValueError, "3 fastest meat dishes take 30 min"):
+            planner.plan(max_weekly_time=20, veg_dishes=0, max_attempts=30)
+
+        self.assertEqual(planner.last_stats.attempts, 0)
+        self.assertEqual(planner.last_stats.bound_time, 30)
+
+    def test_too_few_dishes_next_to_fish_fails_up_front(self) -> None:
+        # One fish dish forces fish, leaving one other meat dish for two slots.
+        recipes = [
+            _meat_recipe("fish", "salmon", 20),
+            _meat_recipe("pork", "pork belly", 20),
+        ]
+        with self.assertRaisesRegex(ValueError, "only 1 meat dishes without fish"):
+            WeeklyPlanner(recipes, days=3, seed=1).plan(veg_dishes=0)
+
+    def test_overlap_infeasible_search_stops_at_time_bound(self) -> None:
+        # Three dishes from two kinds always repeat one, so max_overlap=0 is
+        # unreachable; the search stops once it draws the fastest plan.
+        recipes = [_meat_recipe(f"pork_{idx}", "pork belly", 120) for idx in range(5)]
+        recipes += [_meat_recipe(f"beef_{idx}", "beef brisket", 10) for idx in range(5)]
+        result = WeeklyPlanner(recipes, days=3, seed=2).plan(
+            max_overlap=0, veg_dishes=0, max_attempts=10_000
+        )
+
+        self.assertEqual(result.stats.bound_overlap, 1)
+        self.assertTrue(result.stats.fallback)
+        self.assertEqual(result.total_time, 30)
+        self.assertLess(result.stats.attempts, 10_000)
+
+    def test_slow_fish_pick_is_pruned_before_drawing_the_rest(self) -> None:
+        # The slow fish dish plus the two fastest others already exceeds the
+        # cap, so each draw of it is rejected for time right away.
+        recipes = _four_kind_catalog() + [
+            _meat_recipe("fish_slow", "salmon", 100),
+            _meat_recipe("fish_fast", "salmon", 10),
+        ]
+        planner = WeeklyPlanner(recipes, days=3, seed=4)
+        for _ in range(20):
+            result = planner.plan(max_weekly_time=100, veg_dishes=0)
+            names = [recipe.name for recipe in result.recipes]
+            self.assertIn("fish_fast", names)
+            self.assertEqual(result.stats.rejected_time, result.stats.attempts - 1)
+
+
+class WeightedSamplingTests(unittest.TestCase):
+    def test_weighted_dishes_are_drawn_more_often(self) -> None:
+        # dish_0 weighs 50, the rest 1: it should be in most plans, and the
+        # partition samplers are built once and reused across plan() calls.
+        planner = WeeklyPlanner(
+            _four_kind_catalog(), days=3, seed=4, weights={"dish_0": 50}
+        )
+        plans = [planner.plan(veg_dishes=0) for _ in range(200)]
+
+        chosen = sum("dish_0" in [r.name for r in plan.recipes] for plan in plans)
+        self.assertGreater(chosen, 150)
+        (pool,) = planner._pools.values()
+        _, samplers = planner._samplers[pool]
+        self.assertEqual(len(samplers), 1)
+
+    def test_weighted_plans_are_reproducible_and_validated(self) -> None:
+        recipes = _fast_dish_catalog() + [_meat_recipe("fish", "salmon", 20)]
+        weights = {"fast_pork": 3.0, "fish": 2.0}
+        plans = [
+            WeeklyPlanner(recipes, days=3, seed=9, weights=weights).plan(veg_dishes=0)
+            for _ in range(2)
+        ]
+
+        self.assertEqual(plans[0], plans[1])
+        self.assertIn("fish", [recipe.name for recipe in plans[0].recipes])
+        with self.assertRaisesRegex(ValueError, "must be positive"):
+            WeeklyPlanner(recipes, weights={"fish": 0})
+
+    @unittest.skipIf(numpy is None, "numpy extra not installed")
+    def test_vectorized_engine_uses_weights(self) -> None:
+        planner = WeeklyPlanner(
+            _four_kind_catalog(), days=3, seed=4, weights={"dish_0": 50}
+        )
+        plans = [
+            planner.plan(veg_dishes=0, engine="vectorized", max_attempts=1)
+            for _ in range(100)
+        ]
+
+        chosen = sum("dish_0" in [r.name for r in plan.recipes] for plan in plans)
+        self.assertGreater(chosen, 75)
+
+
+class LocalSearchTests(unittest.TestCase):
+    def test_rejects_non_positive_time_budget(self) -> None:
+        # `--local-search-time 0` used to divide by zero mid-search.
+        for limit in (0, -1.0):
+            with self.assertRaises(ValueError):
+                LocalSearch(moves=1000, time_limit_s=limit)
+        self.assertEqual(LocalSearch(time_limit_s=0.5).time_limit_s, 0.5)
+
+    def test_swap_moves_repair_a_near_miss(self) -> None:
+        options = dict(max_overlap=0, veg_dishes=0, max_attempts=5)
+        sampled = WeeklyPlanner(_pork_heavy_catalog(), days=4, seed=2).plan(**options)
+        self.assertTrue(sampled.stats.fallback)
+
+        planner = WeeklyPlanner(_pork_heavy_catalog(), days=4, seed=2)
+        result = planner.plan(local_search=LocalSearch(moves=3000), **options)
+
+        # Incrementally kept time/overlap must match a recomputation.
+        self.assertEqual(result.ingredient_overlap, 0)
+        self.assertEqual(result.total_time, sum(r.total_time for r in result.recipes))
+        self.assertEqual(
+            result.ingredient_overlap,
+            WeeklyPlanner._ingredient_meat_overlap(result.recipes),
+        )
+        self.assertEqual(
+            sorted(r.name for r in result.recipes if not r.name.startswith("pork")),
+            ["beef", "chicken", "fish"],
+        )
+        self.assertEqual(result.stats.moves, 3000)
+        self.assertGreater(result.stats.accepted_moves, 0)
+
+    def test_starts_from_fastest_dishes_when_no_sample_fits(self) -> None:
+        options = dict(max_weekly_time=30, veg_dishes=0, max_attempts=50)
+        with self.assertRaises(ValueError):
+            WeeklyPlanner(_fast_dish_catalog(), days=3, seed=1).plan(**options)
+
+        result = WeeklyPlanner(_fast_dish_catalog(), days=3, seed=1).plan(
+            local_search=LocalSearch(moves=100), **options
+        )
+
+        self.assertEqual(result.total_time, 30)
+
+    def test_objective_can_trade_time_for_variety(self) -> None:
+        # Without a max_overlap to meet, the default objective only wants
+        # the fastest plan (all pork); weighting overlap prefers variety.
+        options = dict(max_overlap=6, veg_dishes=0, max_attempts=1)
+        fast = WeeklyPlanner(_pork_heavy_catalog(), days=4, seed=3).plan(
+            local_search=LocalSearch(moves=3000), **options
+        )
+        varied = WeeklyPlanner(_pork_heavy_catalog(), days=4, seed=3).plan(
+            local_search=LocalSearch(moves=3000, overlap_weight=50), **options
+        )
+
+        self.assertLess(fast.total_time, varied.total_time)
+        self.assertLess(varied.ingredient_overlap, fast.ingredient_overlap)
+
+    def test_keeps_one_fish_dish_sharing_no_kind(self) -> None:
+        # Fast fish dishes that also use pork or shrimp tempt the annealer
+        # to add a second fish dish or a dish sharing the fish's kinds.
+        recipes = _pork_heavy_catalog() + [
+            _meat_recipe(f"shrimp_{idx}", "shrimp", 5) for idx in range(10)
+        ]
+        for idx, extra in enumerate(("pork belly", "shrimp", "beef brisket") * 4):
+            recipes.append(
+                Recipe(
+                    name=f"fish_{idx}",
+                    ingredients=("salmon", extra),
+                    prep_time=0,
+                    cook_time=1 + idx,
+                    has_meat=True,
+                    spicy=False,
+                )
+            )
+        fish_bit = MEAT_KIND_BITS[MeatKind.FISH]
+
+        for seed in range(10):
+            result = WeeklyPlanner(recipes, days=4, seed=seed).plan(
+                local_search=LocalSearch(moves=2000), veg_dishes=0, max_attempts=5
+            )
+            fish = [r for r in result.recipes if r.meat_mask & fish_bit]
+            self.assertEqual(len(fish), 1)
+            for recipe in result.recipes:
+                if recipe is not fish[0]:
+                    self.assertFalse(recipe.meat_mask & fish[0].meat_mask)
+
+
+class ParallelSearchTests(unittest.TestCase):
+    def test_parallel_search_is_deterministic_under_seed(self) -> None:
+        # Two worker pools with the same planner seed reduce to the same plan.
+        recipes = _four_kind_catalog()
+        results = []
+        for _ in range(2):
+            with WeeklyPlanner(recipes, days=3, seed=11, workers=2) as planner:
+                results.append(
+                    planner.plan(
+                        max_weekly_time=60,
+                        max_overlap=0,
+                        veg_dishes=0,
+                        max_attempts=400,
+                    )
+                )
+
+        self.assertEqual(results[0], results[1])
+        self.assertLessEqual(results[0].total_time, 60)
+        self.assertEqual(results[0].ingredient_overlap, 0)
+
+    def test_worker_narrows_its_cached_pool_by_changed_rows(self) -> None:
+        # Run the worker side in-process: the snapshot pool is built once,
+        # and each chunk moves only the rows whose exclusion changed.
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = write_snapshot(Path(tmp.name) / "recipes.snap", _four_kind_catalog())
+        self.addCleanup(setattr, parallel, "_worker_planner", None)
+        parallel._init_worker(str(path), 3, None)
+        self.addCleanup(parallel._worker_planner._source.close)
+        self.addCleanup(parallel._worker_narrowed.clear)
+        built = []
+        plan_pool = RecipeSnapshot.plan_pool
+
+        def counting_plan_pool(snapshot, limit):
+            built.append(limit)
+            return plan_pool(snapshot, limit)
+
+        with patch.object(RecipeSnapshot, "plan_pool", counting_plan_pool):
+            for excluded in ((0, 1, 2), (1, 2, 3), ()):
+                result, _ = parallel._search_chunk(1, 20, None, None, 10, excluded)
+                pool, _, _ = parallel._worker_narrowed[None]
+                self.assertEqual(
+                    sorted(row.index for row in pool.meat),
+                    [idx for idx in range(12) if idx not in excluded],
+                )
+                self.assertFalse(set(result[0]) & set(excluded))
+
+        self.assertEqual(built, [None])
+
+
 if __name__ == "__main__":
     unittest.main()
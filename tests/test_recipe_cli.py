@@ -1,9 +1,11 @@
+import tempfile
 import unittest
 from pathlib import Path
 from types import SimpleNamespace
 from unittest.mock import Mock, patch
 
 from eat_what import recipe_cli
+from eat_what.sqlite_store import SqliteRecipeStore
 
 
 class RecipeCliSpicyInferenceTests(unittest.TestCase):
@@ -14,7 +16,7 @@ class RecipeCliSpicyInferenceTests(unittest.TestCase):
         parser.parse_args.return_value = SimpleNamespace(recipes="data/recipes.csv")
 
         with patch.object(recipe_cli, "build_parser", return_value=parser), patch.object(
-            recipe_cli, "load_recipes", return_value=[]
+            recipe_cli, "load_recipe_names", return_value=set()
         ), patch.object(
             recipe_cli, "_prompt_unique_name", return_value="辣子鸡"
         ), patch.object(
@@ -25,17 +27,17 @@ class RecipeCliSpicyInferenceTests(unittest.TestCase):
             recipe_cli,
             "_prompt_bool",
             side_effect=AssertionError("_prompt_bool should not be called"),
-        ), patch.object(recipe_cli, "save_recipes") as mock_save:
+        ), patch.object(recipe_cli, "append_recipe") as mock_append:
             exit_code = recipe_cli.main()
 
         # Validate saved recipe has spicy=True from name-based inference.
         self.assertEqual(exit_code, 0)
-        mock_save.assert_called_once()
-        saved_path, saved_recipes = mock_save.call_args.args
+        mock_append.assert_called_once()
+        saved_path, saved_recipe = mock_append.call_args.args
         self.assertEqual(saved_path, Path("data/recipes.csv"))
-        self.assertEqual(saved_recipes[-1].name, "辣子鸡")
-        self.assertTrue(saved_recipes[-1].spicy)
-        self.assertTrue(saved_recipes[-1].has_meat)
+        self.assertEqual(saved_recipe.name, "辣子鸡")
+        self.assertTrue(saved_recipe.spicy)
+        self.assertTrue(saved_recipe.has_meat)
 
     def test_name_without_lazi_uses_prompt_bool(self) -> None:
         # Scenario: name does not contain "辣", so CLI should fall back to
@@ -44,7 +46,7 @@ class RecipeCliSpicyInferenceTests(unittest.TestCase):
         parser.parse_args.return_value = SimpleNamespace(recipes="data/recipes.csv")
 
         with patch.object(recipe_cli, "build_parser", return_value=parser), patch.object(
-            recipe_cli, "load_recipes", return_value=[]
+            recipe_cli, "load_recipe_names", return_value=set()
         ), patch.object(
             recipe_cli, "_prompt_unique_name", return_value="清炒豆角"
         ), patch.object(
@@ -53,17 +55,48 @@ class RecipeCliSpicyInferenceTests(unittest.TestCase):
             recipe_cli, "_prompt_int", side_effect=[3, 8]
         ), patch.object(
             recipe_cli, "_prompt_bool", return_value=False
-        ) as mock_prompt_bool, patch.object(recipe_cli, "save_recipes") as mock_save:
+        ) as mock_prompt_bool, patch.object(recipe_cli, "append_recipe") as mock_append:
             exit_code = recipe_cli.main()
 
         # Validate the prompt path is used and saved spicy flag matches prompt output.
         self.assertEqual(exit_code, 0)
         mock_prompt_bool.assert_called_once_with("Is this dish spicy? (y/N): ")
-        saved_path, saved_recipes = mock_save.call_args.args
+        saved_path, saved_recipe = mock_append.call_args.args
         self.assertEqual(saved_path, Path("data/recipes.csv"))
-        self.assertEqual(saved_recipes[-1].name, "清炒豆角")
-        self.assertFalse(saved_recipes[-1].spicy)
-        self.assertFalse(saved_recipes[-1].has_meat)
+        self.assertEqual(saved_recipe.name, "清炒豆角")
+        self.assertFalse(saved_recipe.spicy)
+        self.assertFalse(saved_recipe.has_meat)
+
+    def test_sqlite_store_is_closed_after_adding(self) -> None:
+        # Scenario: recipes live in a SQLite store; the CLI adds the recipe
+        # and closes the store instead of leaving it to garbage collection.
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        db_path = Path(tmp.name) / "recipes.db"
+        parser = Mock()
+        parser.parse_args.return_value = SimpleNamespace(recipes=str(db_path))
+        closed = []
+        close = SqliteRecipeStore.close
+
+        def recording_close(store):
+            closed.append(store.path)
+            close(store)
+
+        with patch.object(recipe_cli, "build_parser", return_value=parser), patch.object(
+            recipe_cli, "_prompt_unique_name", return_value="清炒豆角"
+        ), patch.object(
+            recipe_cli, "_prompt_ingredients", return_value=["green beans"]
+        ), patch.object(
+            recipe_cli, "_prompt_int", side_effect=[3, 8]
+        ), patch.object(
+            recipe_cli, "_prompt_bool", return_value=False
+        ), patch.object(SqliteRecipeStore, "close", recording_close):
+            exit_code = recipe_cli.main()
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(closed, [db_path])
+        with SqliteRecipeStore(db_path) as store:
+            self.assertEqual(store.recipe_names(), {"清炒豆角"})
 
 
 class RecipeCliDuplicateNameTests(unittest.TestCase):
@@ -0,0 +1,63 @@
+import io
+import json
+import unittest
+
+from eat_what.planner import PlanResult
+from eat_what.records import plan_record, write_plans
+from eat_what.storage import Recipe
+
+
+def _plan() -> PlanResult:
+    recipes = (
+        Recipe("红烧鱼", ("salmon", "scallion"), 10, 30, True, False),
+        Recipe("葱油拌面", ("scallion", "noodles"), 5, 10, False, False),
+    )
+    return PlanResult(recipes, 55, 0)
+
+
+class PlanRecordTests(unittest.TestCase):
+    def test_record_has_dishes_and_aggregated_shopping_list(self) -> None:
+        record = plan_record(_plan(), index=1)
+
+        self.assertEqual(record["index"], 1)
+        self.assertEqual(record["total_time"], 55)
+        self.assertEqual(record["recipes"][0]["name"], "红烧鱼")
+        self.assertEqual(record["recipes"][0]["total_time"], 40)
+        self.assertEqual(
+            record["shopping_list"][0],
+            {
+                "ingredient": "scallion",
+                "cn": "大葱",
+                "kind": "veg",
+                "count": 2,
+                "quantity": 2,
+                "unit": "份",
+            },
+        )
+        salmon = next(
+            item for item in record["shopping_list"] if item["ingredient"] == "salmon"
+        )
+        self.assertEqual(salmon["kind"], "fish")
+        # Unknown ingredients keep their name without dictionary info.
+        noodles = next(
+            item for item in record["shopping_list"] if item["ingredient"] == "noodles"
+        )
+        self.assertIsNone(noodles["cn"])
+
+    def test_ndjson_writes_one_plan_per_line_and_json_one_array(self) -> None:
+        stream = io.StringIO()
+        self.assertEqual(write_plans([_plan(), _plan()], stream, "ndjson"), 2)
+        lines = stream.getvalue().splitlines()
+        self.assertEqual([json.loads(line)["index"] for line in lines], [1, 2])
+
+        stream = io.StringIO()
+        write_plans([_plan(), _plan()], stream, "json")
+        self.assertEqual(len(json.loads(stream.getvalue())), 2)
+
+        stream = io.StringIO()
+        write_plans([], stream, "json")
+        self.assertEqual(json.loads(stream.getvalue()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
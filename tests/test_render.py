@@ -0,0 +1,57 @@
+import io
+import unittest
+from unittest.mock import patch
+
+from eat_what.cli import print_plan
+from eat_what.planner import PlanResult
+from eat_what.render import Renderer
+from eat_what.selection import select_from
+from eat_what.storage import Recipe
+
+
+class _CountingStream(io.StringIO):
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text: str) -> int:
+        self.writes += 1
+        return super().write(text)
+
+
+class RendererTests(unittest.TestCase):
+    def test_lines_are_written_in_one_call_on_flush(self) -> None:
+        stream = _CountingStream()
+        with Renderer(stream, color=True) as out:
+            out.line("a")
+            out.columns(["x", "yy", "zzz"], per_line=2)
+            self.assertEqual(stream.getvalue(), "")
+
+        self.assertEqual(stream.writes, 1)
+        self.assertEqual(stream.getvalue(), "a\nx     yy \nzzz\n")
+
+    def test_first_chunk_flushes_early_then_buffers_larger(self) -> None:
+        stream = _CountingStream()
+        out = Renderer(stream, flush_at=100, first_flush_at=10)
+        for _ in range(20):
+            out.line("12345678")  # 9 characters with the newline
+
+        # One flush after 2 lines (18 chars), then one per 12 lines (108 chars).
+        self.assertEqual(stream.writes, 2)
+
+    def test_plain_mode_prints_plan_and_menu_without_ansi(self) -> None:
+        # Non-terminal streams default to plain output.
+        recipe = Recipe("红烧鱼", ("salmon", "scallion"), 10, 60, True, False)
+        stream = io.StringIO()
+        print_plan(PlanResult((recipe,), 70, 0), Renderer(stream))
+        with patch("sys.stdout", new=stream), patch("builtins.input", return_value=""):
+            select_from({"tofu": "豆腐"}, "Select:")
+
+        output = stream.getvalue()
+        self.assertNotIn("\x1b[", output)
+        self.assertIn("1. 红烧鱼 | 70 min | meat", output)
+        self.assertIn("1. 豆腐 (tofu)", output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from eat_what import cli
+from eat_what.planner import WeeklyPlanner
+from eat_what.rolling import RollingPlanner, plan_weeks
+from eat_what.snapshot import RecipeSnapshot, write_snapshot
+from eat_what.sqlite_store import SqliteRecipeStore
+from eat_what.storage import Recipe
+
+
+def _recipe(name: str, ingredient: str, has_meat: bool = True) -> Recipe:
+    return Recipe(
+        name=name,
+        ingredients=(ingredient,),
+        prep_time=5,
+        cook_time=10,
+        has_meat=has_meat,
+        spicy=False,
+    )
+
+
+def _catalog() -> list[Recipe]:
+    meats = ["pork belly", "beef brisket", "chicken thigh", "lamb chops"]
+    recipes = [_recipe(f"meat_{idx}", meats[idx % 4], True) for idx in range(9)]
+    recipes += [_recipe(f"veg_{idx}", "cabbage", False) for idx in range(4)]
+    return recipes
+
+
+class RollingPlannerTests(unittest.TestCase):
+    def test_dishes_do_not_repeat_inside_window(self) -> None:
+        # 9 meat dishes, 3 per week, 2-week window: weeks i and i+1, i+2 differ.
+        planner = WeeklyPlanner(_catalog(), days=3, seed=3)
+        weeks = [
+            {recipe.name for recipe in plan.recipes}
+            for plan in plan_weeks(
+                planner, 6, no_repeat_weeks=2, veg_dishes=1, max_overlap=10
+            )
+        ]
+
+        for idx, week in enumerate(weeks):
+            for later in weeks[idx + 1 : idx + 3]:
+                self.assertFalse(week & later)
+
+    def test_parallel_workers_respect_the_window(self) -> None:
+        # Workers plan from their own snapshot of the catalog; the window's
+        # dishes must still be kept out of their draws.
+        with WeeklyPlanner(_catalog(), days=3, seed=3, workers=2) as planner:
+            weeks = [
+                {recipe.name for recipe in plan.recipes if recipe.has_meat}
+                for plan in plan_weeks(
+                    planner, 6, no_repeat_weeks=2, veg_dishes=0, max_overlap=10
+                )
+            ]
+
+        for idx, week in enumerate(weeks):
+            for later in weeks[idx + 1 : idx + 3]:
+                self.assertFalse(week & later)
+
+    def test_window_holds_for_every_planner_source(self) -> None:
+        # Snapshot pools build a new row on every read and SQLite pools are
+        # query results; the window must block dishes for each of them.
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        snapshot = RecipeSnapshot(
+            write_snapshot(Path(tmp.name) / "recipes.snap", _catalog())
+        )
+        self.addCleanup(snapshot.close)
+        store = SqliteRecipeStore(Path(tmp.name) / "recipes.db")
+        self.addCleanup(store.close)
+        store.add_recipes(_catalog())
+        planners = {
+            "list": WeeklyPlanner(_catalog(), days=3, seed=3),
+            "snapshot": WeeklyPlanner.from_source(snapshot, days=3, seed=3),
+            "sqlite": WeeklyPlanner.from_source(store, days=3, seed=3),
+        }
+
+        for source, planner in planners.items():
+            rolling = RollingPlanner(planner, no_repeat_weeks=2)
+            weeks = []
+            for _ in range(6):
+                plan = rolling.next_week(veg_dishes=1, max_overlap=10)
+                self.assertTrue(all(isinstance(r, Recipe) for r in plan.recipes))
+                weeks.append({recipe.name for recipe in plan.recipes})
+            for idx, week in enumerate(weeks):
+                for later in weeks[idx + 1 : idx + 3]:
+                    self.assertFalse(week & later, source)
+            # 9 meat + 4 veg dishes, minus the 2 blocked weeks of 4 dishes.
+            self.assertEqual(len(rolling._pool.meat) + len(rolling._pool.veg), 5)
+
+    def test_cli_weeks_over_a_sqlite_store(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        db_path = Path(tmp.name) / "recipes.db"
+        meats = ["pork belly", "beef brisket", "chicken thigh", "lamb chops"]
+        with SqliteRecipeStore(db_path) as store:
+            # The CLI plans 7-day weeks.
+            store.add_recipes(
+                _recipe(f"meat_{idx}", meats[idx % 4]) for idx in range(16)
+            )
+        argv = [
+            "eat-what", "--recipes", str(db_path), "--weeks", "3", "--format",
+            "json", "--veg-dishes", "0", "--max-overlap", "10", "--seed", "3",
+        ]
+        out = io.StringIO()
+        with patch("sys.argv", argv), contextlib.redirect_stdout(out):
+            self.assertEqual(cli.main(), 0)
+
+        plans = json.loads(out.getvalue())
+        weeks = [{recipe["name"] for recipe in plan["recipes"]} for plan in plans]
+        self.assertEqual(len(weeks), 3)
+        self.assertFalse(weeks[0] & weeks[1] or weeks[1] & weeks[2])
+
+    def test_released_dishes_return_to_pool(self) -> None:
+        # After the window slides, the pool again holds every unblocked dish.
+        planner = WeeklyPlanner(_catalog(), days=3, seed=3)
+        rolling = RollingPlanner(planner, no_repeat_weeks=1)
+        for _ in range(4):
+            rolling.next_week(veg_dishes=1, max_overlap=10)
+
+        blocked = set(rolling.recent_dishes[-1])
+        pool_names = {recipe.name for recipe in rolling._pool.meat + rolling._pool.veg}
+        all_names = {recipe.name for recipe in _catalog()}
+        self.assertEqual(pool_names, all_names - blocked)
+        self.assertEqual(len(rolling.kind_history), 4)
+        self.assertEqual(sum(rolling.kind_counts.values()), 12)
+
+    def test_falls_back_to_full_pool_when_window_is_too_wide(self) -> None:
+        # 9 meat dishes cannot fill 4 weeks of 3 without repeats.
+        planner = WeeklyPlanner(_catalog(), days=3, seed=3)
+        with self.assertLogs("eat_what.rolling", level="WARNING"):
+            plans = list(
+                plan_weeks(planner, 4, no_repeat_weeks=3, veg_dishes=0, max_overlap=10)
+            )
+
+        self.assertEqual(len(plans), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+from collections import Counter
+from pathlib import Path
+import random
+import tempfile
+import unittest
+
+from eat_what.sampling import WeightedSampler, check_weights, load_ratings
+
+
+class WeightedSamplerTests(unittest.TestCase):
+    def test_alias_draws_follow_weights(self) -> None:
+        # Weights 1:2:7 over 20000 draws with replacement.
+        sampler = WeightedSampler([1, 2, 7])
+        counts = Counter(sampler.choices(random.Random(0), 20000))
+
+        for idx, share in enumerate((0.1, 0.2, 0.7)):
+            self.assertAlmostEqual(counts[idx] / 20000, share, delta=0.02)
+
+    def test_sample_draws_distinct_and_restores_the_tree(self) -> None:
+        # Without replacement: a heavy item is almost always taken, every
+        # draw is distinct, and repeated calls see the same weights.
+        sampler = WeightedSampler([1.0] * 9 + [50.0])
+        rng = random.Random(1)
+        sampler.sample(rng, 1)
+        tree = list(sampler._tree)
+        first = Counter()
+        for _ in range(2000):
+            drawn = sampler.sample(rng, 3)
+            self.assertEqual(len(set(drawn)), 3)
+            first[drawn[0]] += 1
+        self.assertGreater(first[9] / 2000, 0.8)
+        self.assertEqual(sorted(sampler.sample(rng, 10)), list(range(10)))
+        self.assertEqual(sampler._tree, tree)
+
+    def test_sample_rejects_oversized_draws(self) -> None:
+        with self.assertRaises(ValueError):
+            WeightedSampler([1, 1]).sample(random.Random(0), 3)
+
+    def test_weights_must_be_positive(self) -> None:
+        with self.assertRaisesRegex(ValueError, "must be positive"):
+            check_weights({"红烧肉": 0})
+
+
+class LoadRatingsTests(unittest.TestCase):
+    def test_reads_ratings_and_skips_bad_rows(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "ratings.csv"
+            path.write_text(
+                "name,rating\n红烧肉,5\n清炒豆角,2\n番茄炒蛋,meh\n白灼虾,-1\n",
+                encoding="utf-8",
+            )
+            with self.assertLogs("eat_what.sampling", "WARNING") as logs:
+                ratings = load_ratings(path)
+
+        self.assertEqual(ratings, {"红烧肉": 5.0, "清炒豆角": 2.0})
+        self.assertEqual(len(logs.records), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
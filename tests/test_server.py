@@ -0,0 +1,184 @@
+import asyncio
+from http import HTTPStatus
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from eat_what.local_search import LocalSearch
+from eat_what.planner import DEFAULT_MAX_WEEKLY_TIME, WeeklyPlanner
+from eat_what.server import PlannerService, percentiles, serve
+from eat_what.storage import default_recipes_path
+
+
+class PlannerServiceTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = Path(self._tmp.name) / "recipes.csv"
+        shutil.copy(default_recipes_path(), self.path)
+        self.service = PlannerService(self.path, seed=1)
+
+    def test_plan_pick_and_shopping_endpoints(self) -> None:
+        status, body = self.service.handle("GET", "/plan?count=2&veg_dishes=1")
+        self.assertEqual(status, HTTPStatus.OK)
+        self.assertEqual([plan["index"] for plan in body["plans"]], [1, 2])
+        self.assertEqual(len(body["plans"][0]["recipes"]), 8)
+
+        status, body = self.service.handle("GET", "/pick?ingredient=tofu,spinach")
+        self.assertIn("菠菜豆腐汤", [recipe["name"] for recipe in body["covered"]])
+
+        status, body = self.service.handle(
+            "GET", "/shopping?recipe=%E7%83%A4%E9%B8%A1%E8%85%BF"  # 烤鸡腿
+        )
+        self.assertEqual(status, HTTPStatus.OK)
+        self.assertEqual(body["shopping_list"][0]["ingredient"], "chicken drumstick")
+
+    def test_errors_map_to_http_statuses(self) -> None:
+        cases = {
+            "/plan?max_overlap=x": HTTPStatus.BAD_REQUEST,
+            "/plan?max_weekly_time=5": HTTPStatus.UNPROCESSABLE_ENTITY,
+            "/shopping?recipe=nope": HTTPStatus.NOT_FOUND,
+            "/missing": HTTPStatus.NOT_FOUND,
+        }
+        for target, expected in cases.items():
+            self.assertEqual(self.service.handle("GET", target)[0], expected, target)
+
+    def test_plan_uses_cli_defaults_and_local_search_options(self) -> None:
+        calls = []
+        plan_many = WeeklyPlanner.plan_many
+
+        def recording_plan_many(planner, count, **options):
+            calls.append(options)
+            return plan_many(planner, count, **options)
+
+        with patch.object(WeeklyPlanner, "plan_many", recording_plan_many):
+            self.service.handle("GET", "/plan")
+            self.service.handle(
+                "GET", "/plan?local_search=50&local_search_time=0.5&max_overlap=0"
+            )
+
+        self.assertEqual(calls[0]["max_weekly_time"], DEFAULT_MAX_WEEKLY_TIME)
+        self.assertIsNone(calls[0]["local_search"])
+        self.assertEqual(
+            calls[1]["local_search"], LocalSearch(moves=50, time_limit_s=0.5)
+        )
+        for target in (
+            "/plan?local_search=5&local_search_time=0",
+            "/plan?local_search_time=x",
+        ):
+            self.assertEqual(
+                self.service.handle("GET", target)[0], HTTPStatus.BAD_REQUEST, target
+            )
+
+    def test_unexpected_errors_map_to_500(self) -> None:
+        # e.g. engine=vectorized without numpy installed.
+        with patch.object(
+            WeeklyPlanner, "plan_many", side_effect=ImportError("No module named numpy")
+        ), self.assertLogs("eat_what.server", "ERROR"):
+            status, body = self.service.handle("GET", "/plan?engine=vectorized")
+
+        self.assertEqual(status, HTTPStatus.INTERNAL_SERVER_ERROR)
+        self.assertIn("numpy", body["error"])
+
+    def test_reload_swaps_catalog_only_when_file_changes(self) -> None:
+        self.assertFalse(self.service.reload())
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write("10,False,tofu,新菜,5,False\n")
+        stat = self.path.stat()
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+        self.assertTrue(self.service.reload())
+        self.assertEqual(self.service.stats()["recipes"], 26)
+        self.assertEqual(self.service.reloads, 2)
+
+    def test_stats_report_latency_percentiles(self) -> None:
+        for _ in range(3):
+            self.service.handle("GET", "/pick?ingredient=tofu")
+        stats = self.service.stats()["endpoints"]["/pick"]
+
+        self.assertEqual(stats["requests"], 3)
+        self.assertLessEqual(stats["p50"], stats["p99"])
+        self.assertEqual(
+            percentiles([4.0, 1.0, 3.0, 2.0]), {"p50": 2.0, "p90": 4.0, "p99": 4.0}
+        )
+
+    def test_http_round_trip_with_keep_alive(self) -> None:
+        async def scenario() -> list[bytes]:
+            ready = asyncio.get_running_loop().create_future()
+            task = asyncio.ensure_future(
+                serve(self.service, port=0, ready=ready.set_result)
+            )
+            server = await ready
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            bodies = []
+            for target in ("/stats", "/pick?ingredient=tofu"):
+                writer.write(f"GET {target} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+                head = await reader.readuntil(b"\r\n\r\n")
+                self.assertTrue(head.startswith(b"HTTP/1.1 200 OK"))
+                length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+                bodies.append(await reader.readexactly(length))
+            writer.close()
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            return bodies
+
+        bodies = asyncio.run(scenario())
+        self.assertEqual(json.loads(bodies[0])["recipes"], 25)
+        self.assertIn("covered", json.loads(bodies[1]))
+
+    def test_slow_plan_does_not_block_other_connections(self) -> None:
+        # Scenario: a plan blocks until released; /stats on a second
+        # connection still answers, and a bad Content-Length gets a 400.
+        release = threading.Event()
+        plan_many = WeeklyPlanner.plan_many
+
+        def slow_plan_many(planner, *args, **kwargs):
+            release.wait(5)
+            return plan_many(planner, *args, **kwargs)
+
+        async def request(port: int, head: str) -> bytes:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(head.encode())
+            response = await reader.read()
+            writer.close()
+            return response
+
+        async def scenario() -> list[bytes]:
+            ready = asyncio.get_running_loop().create_future()
+            task = asyncio.ensure_future(
+                serve(self.service, port=0, ready=ready.set_result)
+            )
+            server = await ready
+            port = server.sockets[0].getsockname()[1]
+            slow = asyncio.ensure_future(
+                request(port, "GET /plan HTTP/1.1\r\nConnection: close\r\n\r\n")
+            )
+            stats = await asyncio.wait_for(
+                request(port, "GET /stats HTTP/1.1\r\nConnection: close\r\n\r\n"),
+                timeout=5,
+            )
+            self.assertFalse(slow.done())
+            release.set()
+            bad = await request(
+                port, "GET /stats HTTP/1.1\r\nContent-Length: abc\r\n\r\n"
+            )
+            responses = [stats, await slow, bad]
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            return responses
+
+        with patch.object(WeeklyPlanner, "plan_many", slow_plan_many):
+            stats, plan, bad = asyncio.run(scenario())
+        self.assertTrue(stats.startswith(b"HTTP/1.1 200 OK"))
+        self.assertTrue(plan.startswith(b"HTTP/1.1 200 OK"))
+        self.assertTrue(bad.startswith(b"HTTP/1.1 400 Bad Request"))
+
+
+if __name__ == "__main__":
+    unittest.main()
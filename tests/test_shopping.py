@@ -0,0 +1,97 @@
+import io
+import json
+from pathlib import Path
+import tempfile
+import unittest
+
+from eat_what.planner import PlanResult
+from eat_what.records import write_plans
+from eat_what.shopping import Quantity, ShoppingList, load_quantities
+from eat_what.storage import Recipe
+
+FISH = Recipe("红烧鱼", ("salmon", "scallion"), 10, 30, True, False)
+NOODLES = Recipe("葱油拌面", ("scallion", "noodles"), 5, 10, False, False)
+
+
+def _plan(*recipes: Recipe) -> PlanResult:
+    return PlanResult(recipes, sum(r.total_time for r in recipes), 0)
+
+
+class ShoppingListTests(unittest.TestCase):
+    def test_merges_plans_and_households_in_one_list(self) -> None:
+        # Two plans, the second cooked by three households.
+        shopping = ShoppingList()
+        shopping.add_plan(_plan(FISH, NOODLES))
+        shopping.add_plan(_plan(FISH), times=3)
+
+        items = {item.ingredient: item for item in shopping.items()}
+        self.assertEqual(items["salmon"].count, 4)
+        self.assertEqual(items["scallion"].count, 5)
+        self.assertEqual(items["noodles"].count, 1)
+        self.assertEqual(items["salmon"].kind, "fish")
+        self.assertEqual(
+            [item.ingredient for item in shopping.items()],
+            ["scallion", "salmon", "noodles"],
+        )
+
+    def test_portions_and_pantry_in_matching_units(self) -> None:
+        # 300 g salmon per dish, 2 dishes, 250 g in stock; scallion stock in
+        # a different unit is not subtracted; noodles fully covered.
+        shopping = ShoppingList.from_plans(
+            [_plan(FISH, NOODLES), _plan(FISH)],
+            portions={"salmon": Quantity(300, "g")},
+            pantry={
+                "salmon": Quantity(250, "g"),
+                "scallion": Quantity(1, "把"),
+                "noodles": Quantity(2),
+            },
+        )
+
+        with self.assertLogs("eat_what.shopping", "WARNING"):
+            items = {item.ingredient: item for item in shopping.items()}
+        self.assertEqual((items["salmon"].quantity, items["salmon"].unit), (350, "g"))
+        self.assertEqual(items["scallion"].quantity, 3)
+        self.assertNotIn("noodles", items)
+
+    def test_repeated_ingredient_in_one_recipe_counts_twice(self) -> None:
+        recipe = Recipe("双葱", ("scallion", "scallion"), 1, 1, False, False)
+        shopping = ShoppingList()
+        shopping.add([recipe])
+
+        self.assertEqual(shopping.counts()["scallion"], 2)
+
+
+class LoadQuantitiesTests(unittest.TestCase):
+    def test_reads_units_defaults_and_skips_bad_rows(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "pantry.csv"
+            path.write_text(
+                "ingredient,quantity,unit\n"
+                "salmon,200,g\n"
+                "salmon,100,g\n"
+                "egg,6,\n"
+                "tofu,lots,块\n",
+                encoding="utf-8",
+            )
+            with self.assertLogs("eat_what.shopping", "WARNING"):
+                pantry = load_quantities(path)
+
+        self.assertEqual(pantry["salmon"], Quantity(300, "g"))
+        self.assertEqual(pantry["egg"], Quantity(6, "份"))
+        self.assertNotIn("tofu", pantry)
+
+    def test_combined_record_follows_the_plans(self) -> None:
+        stream = io.StringIO()
+        combined = ShoppingList()
+        write_plans(
+            [_plan(FISH), _plan(NOODLES)], stream, "ndjson", combined=combined
+        )
+
+        last = json.loads(stream.getvalue().splitlines()[-1])
+        self.assertEqual(last["plans"], 2)
+        self.assertEqual(last["shopping_list"][0]["ingredient"], "scallion")
+        self.assertEqual(last["shopping_list"][0]["count"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+from array import array
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from eat_what.planner import PlanPool, WeeklyPlanner
+from eat_what.snapshot import RecipeSnapshot, write_snapshot
+from eat_what.storage import default_recipes_path, load_recipes
+
+
+class RecipeSnapshotTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.recipes = load_recipes(default_recipes_path(), use_cache=False)
+        self.path = write_snapshot(Path(self._tmp.name) / "recipes.snap", self.recipes)
+        self.snapshot = RecipeSnapshot(self.path)
+        self.addCleanup(self.snapshot.close)
+
+    def test_round_trips_recipes_and_columns(self) -> None:
+        self.assertEqual(len(self.snapshot), len(self.recipes))
+        self.assertEqual(self.snapshot.recipes(), self.recipes)
+        self.assertEqual(
+            list(self.snapshot.total_time), [r.total_time for r in self.recipes]
+        )
+        self.assertEqual(
+            list(self.snapshot.meat_mask), [r.meat_mask for r in self.recipes]
+        )
+
+    def test_plan_pool_rows_match_in_memory_partitions(self) -> None:
+        # Rows point at the same recipes, in the same order, as PlanPool's lists.
+        for max_time in (None, 30):
+            expected = PlanPool(
+                r for r in self.recipes if max_time is None or r.total_time <= max_time
+            )
+            pool = self.snapshot.plan_pool(max_time)
+            for part in ("spicy", "meat", "fish", "veg"):
+                self.assertEqual(
+                    pool.resolve(getattr(pool, part)), getattr(expected, part)
+                )
+
+    def test_pool_keeps_row_indices_and_builds_rows_only_for_draws(self) -> None:
+        pool = self.snapshot.plan_pool(None)
+        for part in ("spicy", "meat", "fish", "veg"):
+            self.assertIsInstance(getattr(pool, part).indices, array)
+        mask = pool.meat[0].meat_mask
+        self.assertIsInstance(pool.remaining_meat(mask).indices, array)
+
+        built = []
+        row = self.snapshot.row
+        with patch.object(
+            self.snapshot, "row", side_effect=lambda idx: built.append(idx) or row(idx)
+        ):
+            WeeklyPlanner.from_source(self.snapshot, seed=5).plan(
+                veg_dishes=1, max_attempts=1
+            )
+        # One attempt: 7 meat dishes and 1 veg dish.
+        self.assertEqual(len(built), 8)
+
+    def test_planner_samples_same_plan_as_in_memory_catalog(self) -> None:
+        # Same seed and partition order, so the snapshot pools draw the same week.
+        from_snapshot = WeeklyPlanner.from_source(self.snapshot, seed=5).plan()
+        in_memory = WeeklyPlanner(self.recipes, seed=5).plan()
+
+        self.assertEqual(from_snapshot, in_memory)
+
+    def test_rejects_files_that_are_not_snapshots(self) -> None:
+        with self.assertRaises(ValueError):
+            RecipeSnapshot(default_recipes_path())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from eat_what.ingredient_index import IngredientIndex
+from eat_what.ingredients import refresh_registry
+from eat_what.ingredients_meat import (
+    INGREDIENT_MEAT,
+    MEAT_KIND_BITS,
+    MeatIngredient,
+    MeatKind,
+)
+from eat_what.planner import PlanPool, WeeklyPlanner
+from eat_what.sqlite_store import SqliteRecipeStore
+from eat_what.storage import default_recipes_path, load_recipes
+
+
+class SqliteRecipeStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.db_path = Path(self._tmp.name) / "recipes.db"
+        self.store = SqliteRecipeStore(self.db_path)
+        self.addCleanup(self.store.close)
+        self.csv_recipes = load_recipes(default_recipes_path(), use_cache=False)
+        self.store.import_csv(default_recipes_path())
+
+    def test_import_skips_existing_names_and_export_round_trips(self) -> None:
+        # Re-importing the same CSV adds nothing; exporting gives the same rows.
+        self.assertEqual(self.store.import_csv(default_recipes_path()), 0)
+        self.assertEqual(len(self.store), len(self.csv_recipes))
+
+        out = Path(self._tmp.name) / "out.csv"
+        self.store.export_csv(out)
+        self.assertEqual(load_recipes(out, use_cache=False), self.csv_recipes)
+        self.assertEqual(load_recipes(self.db_path), self.csv_recipes)
+
+    def test_add_recipe_rejects_duplicate_name(self) -> None:
+        with self.assertRaises(ValueError):
+            self.store.add_recipe(self.csv_recipes[0])
+
+    def test_ingredient_lookups_match_in_memory_index(self) -> None:
+        # Same results and order as IngredientIndex over the same recipes.
+        index = IngredientIndex(self.csv_recipes)
+        selected = ["tofu", "spinach", "pork belly", "potato", "egg"]
+
+        self.assertEqual(self.store.covered_by(selected), index.covered_by(selected))
+        self.assertEqual(
+            self.store.missing_at_most(selected, 2),
+            index.missing_at_most(selected, 2),
+        )
+
+    def test_plan_pool_partitions_match_in_memory_pool(self) -> None:
+        for max_time in (None, 30):
+            recipes = [
+                r
+                for r in self.csv_recipes
+                if max_time is None or r.total_time <= max_time
+            ]
+            expected = PlanPool(recipes)
+            pool = self.store.plan_pool(max_time)
+            for part in ("spicy", "meat", "fish", "veg"):
+                self.assertEqual(getattr(pool, part), getattr(expected, part))
+            mask = pool.meat[0].meat_mask
+            self.assertEqual(pool.remaining_meat(mask), expected.remaining_meat(mask))
+
+    def test_meat_kind_change_recomputes_stored_masks(self) -> None:
+        # Scenario: after import, "salmon" becomes a beef cut (as if edited
+        # in the user catalog). The SQL fish/remaining partitions must follow
+        # the masks recipes get on load, also after reopening the store.
+        salmon = INGREDIENT_MEAT["salmon"]
+        self.addCleanup(refresh_registry)
+        self.addCleanup(INGREDIENT_MEAT.__setitem__, "salmon", salmon)
+        INGREDIENT_MEAT["salmon"] = MeatIngredient(MeatKind.BEEF, salmon.cn)
+        refresh_registry()
+
+        recipes = load_recipes(default_recipes_path(), use_cache=False)
+        expected = PlanPool(recipes)
+        beef = MEAT_KIND_BITS[MeatKind.BEEF]
+        for store in (self.store, SqliteRecipeStore(self.db_path)):
+            pool = store.plan_pool(None)
+            self.assertEqual(pool.fish, expected.fish)
+            self.assertEqual(pool.remaining_meat(beef), expected.remaining_meat(beef))
+            if store is not self.store:
+                store.close()
+
+    def test_planner_from_store_builds_a_week(self) -> None:
+        planner = WeeklyPlanner.from_source(self.store, seed=1)
+        result = planner.plan(engine="exact")
+
+        self.assertIsNotNone(result)
+        names = {r.name for r in self.csv_recipes}
+        self.assertTrue(all(dish.name in names for dish in result.recipes))
+
+
+if __name__ == "__main__":
+    unittest.main()
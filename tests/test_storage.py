@@ -1,7 +1,22 @@
+import os
+import pickle
+import stat
+import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
-from eat_what.storage import default_recipes_path
+from eat_what import storage
+from eat_what.cache import cache_path_for
+from eat_what.storage import (
+    Recipe,
+    append_recipe,
+    default_recipes_path,
+    iter_recipes,
+    load_recipe_names,
+    load_recipes,
+    save_recipes,
+)
 
 
 class StorageDefaultsTests(unittest.TestCase):
@@ -13,5 +28,176 @@ class StorageDefaultsTests(unittest.TestCase):
         self.assertIn("data", Path(path).parts)
 
 
+class LoadRecipesTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = Path(self._tmp.name) / "recipes.csv"
+
+    def test_invalid_rows_are_skipped_with_warning(self) -> None:
+        # Row 1 has a non-numeric prep time and must be skipped; the rest load.
+        self.path.write_text(
+            "name,ingredients,prep_time,cook_time,has_meat\n"
+            "红烧肉,pork belly;ginger,15,60,True\n"
+            "坏菜,cabbage,abc,10,False\n"
+            "炒冬瓜,winter melon,8.0,15,no\n",
+            encoding="utf-8",
+        )
+
+        with self.assertLogs("eat_what.storage", level="WARNING") as logs:
+            recipes = load_recipes(self.path)
+
+        self.assertEqual([r.name for r in recipes], ["红烧肉", "炒冬瓜"])
+        self.assertEqual(recipes[0].ingredients, ("pork belly", "ginger"))
+        self.assertEqual(recipes[1].prep_time, 8)
+        self.assertFalse(recipes[1].has_meat)
+        # Spicy defaults to False when the column is absent.
+        self.assertFalse(any(r.spicy for r in recipes))
+        self.assertIn("index 1", logs.output[0])
+
+    def test_loaded_recipes_share_ingredient_objects(self) -> None:
+        # Identical ingredient lists and names are stored once per catalog.
+        self.path.write_text(
+            "name,ingredients,prep_time,cook_time,has_meat\n"
+            "a,pork belly;ginger,1,1,True\n"
+            "b,pork belly;ginger,1,1,True\n"
+            "c,ginger,1,1,False\n",
+            encoding="utf-8",
+        )
+
+        a, b, c = load_recipes(self.path, use_cache=False)
+
+        self.assertIs(a.ingredients, b.ingredients)
+        self.assertIs(a.ingredients[1], c.ingredients[0])
+        self.assertEqual(pickle.loads(pickle.dumps(a)).meat_mask, a.meat_mask)
+
+    def test_missing_required_column_raises(self) -> None:
+        self.path.write_text("name,ingredients\n红烧肉,pork belly\n", encoding="utf-8")
+
+        with self.assertRaises(ValueError):
+            next(iter_recipes(self.path))
+
+    def test_save_then_load_round_trips(self) -> None:
+        recipes = load_recipes(default_recipes_path())
+
+        save_recipes(self.path, recipes)
+
+        self.assertEqual(load_recipes(self.path), recipes)
+
+
+class AppendRecipeTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = Path(self._tmp.name) / "recipes.csv"
+        # Custom column order, an invalid row and no trailing newline.
+        self.path.write_text(
+            "name,ingredients,prep_time,cook_time,has_meat,spicy\n"
+            "坏菜,cabbage,abc,10,False,False\n"
+            "红烧肉,pork belly,15,60,True,False",
+            encoding="utf-8",
+        )
+        self.recipe = Recipe("麻婆豆腐", ("tofu", "pepper"), 5, 15, False, True)
+
+    def test_appends_row_in_file_column_order_and_keeps_invalid_rows(self) -> None:
+        append_recipe(self.path, self.recipe)
+
+        lines = self.path.read_text(encoding="utf-8").splitlines()
+        self.assertEqual(lines[1], "坏菜,cabbage,abc,10,False,False")
+        self.assertEqual(lines[3], "麻婆豆腐,tofu;pepper,5,15,False,True")
+        self.assertEqual(load_recipe_names(self.path), {"坏菜", "红烧肉", "麻婆豆腐"})
+
+    def test_duplicate_name_is_rejected_without_writing(self) -> None:
+        before = self.path.read_bytes()
+
+        with self.assertRaises(ValueError):
+            append_recipe(self.path, Recipe("红烧肉", ("pork belly",), 1, 1, True))
+
+        self.assertEqual(self.path.read_bytes(), before)
+
+    def test_appends_in_place_and_checks_names_against_the_index(self) -> None:
+        # Scenario: the first append builds the name index; later appends
+        # extend the same file and reuse the index instead of rescanning.
+        inode = self.path.stat().st_ino
+        append_recipe(self.path, self.recipe)
+        with patch.object(storage, "_scan_recipe_names", side_effect=AssertionError):
+            append_recipe(self.path, Recipe("清蒸鱼", ("salmon",), 5, 10, True))
+            with self.assertRaises(ValueError):
+                append_recipe(self.path, Recipe("麻婆豆腐", ("tofu",), 1, 1, False))
+
+        self.assertEqual(self.path.stat().st_ino, inode)
+        self.assertTrue(cache_path_for(self.path, "names").exists())
+        self.assertEqual(
+            load_recipe_names(self.path, use_cache=False),
+            {"坏菜", "红烧肉", "麻婆豆腐", "清蒸鱼"},
+        )
+
+    def test_name_index_follows_external_edits(self) -> None:
+        append_recipe(self.path, self.recipe)
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write("宫保鸡丁,chicken thigh,10,10,True,True\n")
+
+        with self.assertRaises(ValueError):
+            append_recipe(self.path, Recipe("宫保鸡丁", ("chicken thigh",), 1, 1, True))
+
+    def test_creates_missing_file_with_header(self) -> None:
+        path = Path(self._tmp.name) / "new.csv"
+
+        append_recipe(path, self.recipe)
+
+        self.assertEqual(load_recipes(path, use_cache=False), [self.recipe])
+
+
+class RecipeCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = Path(self._tmp.name) / "recipes.csv"
+        self.path.write_text(
+            "name,ingredients,prep_time,cook_time,has_meat\n"
+            "红烧肉,pork belly,15,60,True\n"
+            "坏菜,cabbage,abc,10,False\n",
+            encoding="utf-8",
+        )
+
+    def test_second_load_skips_parsing_and_replays_warnings(self) -> None:
+        first = load_recipes(self.path)
+        self.assertTrue(cache_path_for(self.path).exists())
+
+        with patch.object(
+            storage, "_compile_recipes", side_effect=AssertionError("parsed again")
+        ), self.assertLogs("eat_what.storage", level="WARNING") as logs:
+            second = load_recipes(self.path)
+
+        # Cached recipes keep their derived fields and the skipped row warning.
+        self.assertEqual(second, first)
+        self.assertEqual(second[0].meat_mask, first[0].meat_mask)
+        self.assertEqual(second[0].meat_count, 1)
+        self.assertIn("index 1", logs.output[0])
+
+    def test_cache_is_rebuilt_when_csv_changes(self) -> None:
+        load_recipes(self.path)
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write("炒冬瓜,winter melon,8,15,False\n")
+
+        recipes = load_recipes(self.path)
+
+        self.assertEqual([r.name for r in recipes], ["红烧肉", "炒冬瓜"])
+
+    @unittest.skipIf(os.name != "posix", "POSIX permission bits")
+    def test_cache_shares_the_source_permissions(self) -> None:
+        # A shared catalog's cache must be readable by whoever reads the CSV.
+        self.path.chmod(0o664)
+
+        load_recipes(self.path)
+
+        self.assertEqual(stat.S_IMODE(cache_path_for(self.path).stat().st_mode), 0o664)
+
+    def test_use_cache_false_does_not_write_cache(self) -> None:
+        load_recipes(self.path, use_cache=False)
+
+        self.assertFalse(cache_path_for(self.path).exists())
+
+
 if __name__ == "__main__":
     unittest.main()
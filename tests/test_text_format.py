@@ -0,0 +1,33 @@
+import unittest
+
+from eat_what.text_format import (
+    color_code,
+    display_width,
+    iter_columns,
+    ljust_display,
+)
+
+
+class DisplayWidthTests(unittest.TestCase):
+    def test_ascii_cjk_and_ansi_widths(self) -> None:
+        self.assertEqual(display_width("tofu x3"), 7)
+        self.assertEqual(display_width("豆腐 (tofu)"), 11)
+        self.assertEqual(display_width(color_code("豆腐", "\x1b[32m")), 4)
+        # Fullwidth forms count double, halfwidth katakana single.
+        self.assertEqual(display_width("ＡｱA"), 4)
+
+    def test_iter_columns_pads_to_widest_item(self) -> None:
+        # Same output as measuring and padding each item with ljust_display.
+        items = ["豆腐 x3", color_code("青椒", "\x1b[32m") + " x1", "egg x12", "鸡"]
+        width = max(display_width(item) for item in items)
+        expected = [
+            "   ".join(ljust_display(item, width) for item in items[:3]),
+            ljust_display(items[3], width),
+        ]
+
+        self.assertEqual(list(iter_columns(items, 3)), expected)
+        self.assertEqual(list(iter_columns([], 3)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()